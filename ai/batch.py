@@ -0,0 +1,142 @@
+import json
+import multiprocessing
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+
+from crew.checkpoint import OSA_RUNS_DIR, RunCheckpoint
+from tools.async_http import run_sync
+from tools.github_client import GH_REPO_NAME, github_call
+from tools.issue_store import Issue, IssueStore
+from tools.rate_limit import scheduler
+
+
+def select_issues(count: int, max_priority: int | None = None, label: str | None = None) -> list[Issue]:
+    """Syncs the backlog and returns the `count` most urgent open issues."""
+    store = IssueStore(GH_REPO_NAME)
+    with github_call("batch issue selection"):
+        run_sync(store.async_sync())
+    return store.query(max_priority=max_priority, label=label, limit=count)
+
+
+def share_rate_limits(workers: int) -> None:
+    """
+    Gives every worker process started after this its slice of the shared API
+    quota: the rate, the burst and the requests in flight, so N workers can
+    never send more at once than one process would.
+    """
+    for service in ("github", "notion"):
+        limits = scheduler.limits(service)
+        prefix = f"RATE_LIMIT_{service.upper()}_"
+        os.environ[prefix + "RPS"] = str(limits.rate / workers)
+        os.environ[prefix + "BURST"] = str(max(1, limits.burst // workers))
+        os.environ[prefix + "CONCURRENCY"] = str(max(1, limits.concurrency // workers))
+
+
+def run_issue(issue: dict, batch_dir: str) -> dict:
+    """
+    Runs one isolated crew for one issue inside a pool worker.
+    The worker gets its own working directory, checkpoint directory and
+    branch namespace, so parallel crews never touch each other's files or refs.
+    """
+    from crew import instrumentation, routing
+    from crew.dev_crew import DeveloperCrew
+    from tools.sandbox_pool import close_pool, resolve_project, set_project
+    from tools.tracing import tracer
+
+    issue = Issue(**issue)
+    issue_dir = Path(batch_dir) / f"issue-{issue.number}"
+    workspace = issue_dir / "workspace"
+    workspace.mkdir(parents=True, exist_ok=True)
+    # The workspace has no lockfile; sandboxes keep the project's environment.
+    set_project(resolve_project())
+    os.chdir(workspace)
+
+    instrumentation.install()
+    started = time.monotonic()
+    summary = {
+        "issue": issue.number,
+        "title": issue.title,
+        "branch_prefix": f"crew/{Path(batch_dir).name}/issue-{issue.number}-",
+    }
+    try:
+        crew = DeveloperCrew(issue=issue, branch_prefix=summary["branch_prefix"])
+        checkpoint = RunCheckpoint(issue_dir)
+        context = checkpoint.remember("retrieval_context", crew.build_retrieval_context, resume=True)
+        crew.add_retrieval_context(context)
+        pending = checkpoint.attach(crew.tasks, resume=True)
+        result = crew.crew(pending).kickoff() if pending else crew.tasks[-1].output
+        summary.update(status="success", result=str(result))
+    except Exception as e:
+        summary.update(status="failed", error=f"{type(e).__name__}: {e}")
+        traceback.print_exc()
+    finally:
+        # Workers are reused for issues in other workspaces; their sandbox workers would pile up.
+        close_pool()
+        routing.shutdown()
+    summary["seconds"] = round(time.monotonic() - started, 1)
+    tracer.export_jsonl(issue_dir / "trace.jsonl")
+    tracer.reset()  # workers can be reused for the next issue
+    return summary
+
+
+def create_batch_dir(batch_id: str | None = None) -> Path:
+    """
+    Creates the directory of a new batch with a unique name, or returns the one
+    of `batch_id` to resume it. Two new batches never share a directory.
+    """
+    if batch_id:
+        batch_dir = OSA_RUNS_DIR / batch_id
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        return batch_dir
+    batch_dir = OSA_RUNS_DIR / f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    batch_dir.mkdir(parents=True)
+    return batch_dir
+
+
+def run_batch(
+    count: int,
+    workers: int | None = None,
+    max_priority: int | None = None,
+    label: str | None = None,
+    batch_id: str | None = None,
+) -> list[dict]:
+    """
+    Runs one crew per backlog issue in a process pool and writes the
+    aggregated results to <batch dir>/summary.json.
+    Re-running with the same batch_id resumes every issue from its checkpoints.
+    """
+    issues = select_issues(count, max_priority, label)
+    if not issues:
+        print("No matching open issues.")
+        return []
+    workers = workers or min(len(issues), os.cpu_count() or 1)
+    batch_dir = create_batch_dir(batch_id)
+
+    share_rate_limits(workers)
+    print(f"Running {len(issues)} issues with {workers} workers in {batch_dir}")
+    results = []
+    # spawn gives every crew a fresh interpreter instead of a fork of this one's threads.
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(run_issue, asdict(issue), str(batch_dir)) for issue in issues]
+        for future in as_completed(futures):
+            summary = future.result()
+            print(f"#{summary['issue']} {summary['status']} in {summary['seconds']}s")
+            results.append(summary)
+
+    results.sort(key=lambda r: r["issue"])
+    (batch_dir / "summary.json").write_text(json.dumps(results, indent=2))
+    print_summary(results)
+    return results
+
+
+def print_summary(results: list[dict]) -> None:
+    succeeded = sum(r["status"] == "success" for r in results)
+    print(f"\nBatch summary: {succeeded}/{len(results)} issues succeeded")
+    for r in results:
+        detail = r.get("error") or r["branch_prefix"]
+        print(f"  #{r['issue']:<6} {r['status']:<8} {r['seconds']:>8}s  {detail}")
@@ -0,0 +1,631 @@
+import base64
+import hashlib
+import json
+import re
+import subprocess
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+PRIORITY_LABELS = ["priority: critical", "priority: high", "priority: medium", "priority: low"]
+# Tools the stub LLM calls once per agent turn, in this order, when the agent has them.
+SCRIPTED_ACTIONS = {
+    "GitHub List Project Issues Tool": {"limit": 20},
+    "GitHub List Files Tool": {"recursive": True},
+}
+
+
+@dataclass
+class FakeConfig:
+    """Size and speed of the fake services."""
+
+    latency_ms: float = 20  # added to every GitHub and Notion response
+    llm_latency_ms: float = 50
+    # Stub models that misbehave, to exercise the model routing: extra latency
+    # per model name, and models that always answer 503.
+    llm_model_latency_ms: dict = field(default_factory=lambda: {"osa-slow": 2000})
+    llm_failing_models: tuple = ("osa-down",)
+    files: int = 500  # files in the repository
+    file_size: int = 2048  # bytes per file
+    issues: int = 300  # issues in the backlog
+    ideas: int = 250  # rows in the Notion database
+    github_page_size: int = 100  # upper bound for per_page
+    notion_page_size: int = 100  # upper bound for page_size
+
+
+def _sha(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _blob_sha(content: str) -> str:
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeGitHub:
+    """
+    In-memory repository behind the subset of the GitHub REST API the tools use:
+    repository, contents, branches, refs, the Git data API, issues and pulls.
+    """
+
+    def __init__(self, config: FakeConfig, full_name: str, base: str):
+        self.config = config
+        self.full_name = full_name
+        self.base = base
+        self.lock = threading.Lock()
+        self.blobs: dict[str, str] = {}
+        self.trees: dict[str, dict[str, str]] = {}  # tree sha -> {path: blob sha}
+        self.commits: dict[str, dict] = {}
+        self.refs: dict[str, str] = {}  # "heads/main" -> commit sha
+        self.issues: list[dict] = []
+        self.pulls: list[dict] = []
+        self._clock = 1_700_000_000
+
+        files = {}
+        for i in range(config.files):
+            path = f"src/pkg{i % 20}/module_{i}.py"
+            line = f"def function_{i}():\n    return {i}\n"
+            files[path] = (line * (config.file_size // len(line) + 1))[: config.file_size]
+        self.refs["heads/main"] = self._commit("Initial commit", self._tree(files), [])
+        for number in range(1, config.issues + 1):
+            # Every fifth issue has no priority label.
+            labels = [PRIORITY_LABELS[number % len(PRIORITY_LABELS)]] if number % 5 else []
+            self._add_issue(f"Backlog item {number}", f"Description of backlog item {number}.", labels)
+
+    def export_git(self, path: Path) -> str:
+        """
+        Writes the files of main into a bare git repository at `path`, for tools
+        that fetch over git instead of the API, and returns its URL.
+        """
+        with self.lock:
+            tree = self.trees[self.commits[self.refs["heads/main"]]["tree"]]
+            files = {name: self.blobs[sha] for name, sha in tree.items()}
+        work = path.with_name(path.name + ".work")
+        for name, content in files.items():
+            (work / name).parent.mkdir(parents=True, exist_ok=True)
+            (work / name).write_text(content)
+        git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+        for command in (
+            ["init", "-q", "-b", "main"],
+            ["add", "-A"],
+            ["commit", "-q", "-m", "Initial commit"],
+            ["clone", "-q", "--bare", ".", str(path)],
+        ):
+            subprocess.run([*git, *command], cwd=work, check=True, capture_output=True)
+        return f"file://{path}"
+
+    def _timestamp(self) -> str:
+        self._clock += 60
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self._clock))
+
+    def _tree(self, files: dict[str, str]) -> str:
+        entries = {}
+        for path, content in files.items():
+            sha = _blob_sha(content)
+            self.blobs[sha] = content
+            entries[path] = sha
+        return self._store_tree(entries)
+
+    def _store_tree(self, entries: dict[str, str]) -> str:
+        sha = _sha(sorted(entries.items()))
+        self.trees[sha] = entries
+        return sha
+
+    def _commit(self, message: str, tree: str, parents: list[str]) -> str:
+        sha = _sha(message, tree, parents, self._timestamp())
+        self.commits[sha] = {"message": message, "tree": tree, "parents": parents}
+        return sha
+
+    def _add_issue(self, title: str, body: str, labels: list[str]) -> dict:
+        issue = {
+            "number": len(self.issues) + 1,
+            "title": title,
+            "body": body,
+            "state": "open",
+            "labels": [{"name": name} for name in labels],
+            "updated_at": self._timestamp(),
+        }
+        issue["url"] = f"{self.base}/repos/{self.full_name}/issues/{issue['number']}"
+        issue["html_url"] = f"https://github.com/{self.full_name}/issues/{issue['number']}"
+        self.issues.append(issue)
+        return issue
+
+    # JSON shapes
+
+    def _repo_json(self) -> dict:
+        owner, name = self.full_name.split("/")
+        return {
+            "id": 1,
+            "name": name,
+            "full_name": self.full_name,
+            "owner": {"login": owner},
+            "default_branch": "main",
+            "url": f"{self.base}/repos/{self.full_name}",
+        }
+
+    def _ref_json(self, ref: str) -> dict:
+        sha = self.refs[ref]
+        return {
+            "ref": f"refs/{ref}",
+            "url": f"{self.base}/repos/{self.full_name}/git/refs/{ref}",
+            "object": {"sha": sha, "type": "commit", "url": self._commit_url(sha)},
+        }
+
+    def _commit_url(self, sha: str) -> str:
+        return f"{self.base}/repos/{self.full_name}/git/commits/{sha}"
+
+    def _commit_json(self, sha: str) -> dict:
+        commit = self.commits[sha]
+        return {
+            "sha": sha,
+            "url": self._commit_url(sha),
+            "message": commit["message"],
+            "tree": {"sha": commit["tree"], "url": self._tree_url(commit["tree"])},
+            "parents": [{"sha": p, "url": self._commit_url(p)} for p in commit["parents"]],
+        }
+
+    def _tree_url(self, sha: str) -> str:
+        return f"{self.base}/repos/{self.full_name}/git/trees/{sha}"
+
+    def _tree_json(self, sha: str, recursive: bool) -> dict:
+        entries = self.trees[sha]
+        items = {}
+        for path, blob in entries.items():
+            parts = path.split("/")
+            for depth in range(1, len(parts)):
+                directory = "/".join(parts[:depth])
+                items.setdefault(directory, {"path": directory, "mode": "040000", "type": "tree", "sha": _sha(sha, directory)})
+            items[path] = {
+                "path": path,
+                "mode": "100644",
+                "type": "blob",
+                "sha": blob,
+                "size": len(self.blobs[blob]),
+            }
+        if not recursive:
+            items = {p: e for p, e in items.items() if "/" not in p}
+        return {"sha": sha, "url": self._tree_url(sha), "tree": sorted(items.values(), key=lambda e: e["path"]), "truncated": False}
+
+    def _content_json(self, path: str, blob: str, with_content: bool = True) -> dict:
+        data = {
+            "type": "file",
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": blob,
+            "size": len(self.blobs[blob]),
+            "url": f"{self.base}/repos/{self.full_name}/contents/{path}",
+        }
+        if with_content:
+            data["encoding"] = "base64"
+            data["content"] = base64.b64encode(self.blobs[blob].encode("utf-8")).decode("ascii")
+        return data
+
+    # Handlers return (status, JSON body or raw text[, extra headers])
+
+    def get_repo(self, request):
+        return 200, self._repo_json()
+
+    def get_branch(self, request, branch):
+        if f"heads/{branch}" not in self.refs:
+            return 404, {"message": "Branch not found"}
+        commit = self._commit_json(self.refs[f"heads/{branch}"])
+        return 200, {"name": branch, "commit": {**commit, "commit": commit}, "protected": False}
+
+    def get_ref(self, request, ref):
+        if ref not in self.refs:
+            return 404, {"message": "Not Found"}
+        return 200, self._ref_json(ref)
+
+    def create_ref(self, request):
+        ref = request.json["ref"].removeprefix("refs/")
+        if ref in self.refs:
+            return 422, {"message": "Reference already exists"}
+        self.refs[ref] = request.json["sha"]
+        return 201, self._ref_json(ref)
+
+    def update_ref(self, request, ref):
+        if ref not in self.refs:
+            return 422, {"message": "Reference does not exist"}
+        self.refs[ref] = request.json["sha"]
+        return 200, self._ref_json(ref)
+
+    def get_commit(self, request, sha):
+        if sha not in self.commits:
+            return 404, {"message": "Not Found"}
+        return 200, self._commit_json(sha)
+
+    def create_commit(self, request):
+        body = request.json
+        return 201, self._commit_json(self._commit(body["message"], body["tree"], body["parents"]))
+
+    def get_tree(self, request, sha):
+        sha = self.commits[sha]["tree"] if sha in self.commits else sha
+        if sha not in self.trees:
+            return 404, {"message": "Not Found"}
+        return 200, self._tree_json(sha, request.query.get("recursive") not in (None, "0", "false"))
+
+    def create_tree(self, request):
+        body = request.json
+        entries = dict(self.trees[body["base_tree"]]) if body.get("base_tree") else {}
+        for element in body["tree"]:
+            if element.get("content") is not None:
+                element["sha"] = _blob_sha(element["content"])
+                self.blobs[element["sha"]] = element["content"]
+            entries[element["path"]] = element["sha"]
+        return 201, self._tree_json(self._store_tree(entries), recursive=False)
+
+    def create_blob(self, request):
+        content = request.json["content"]
+        if request.json.get("encoding") == "base64":
+            content = base64.b64decode(content).decode("utf-8")
+        sha = _blob_sha(content)
+        self.blobs[sha] = content
+        return 201, {"sha": sha, "url": f"{self.base}/repos/{self.full_name}/git/blobs/{sha}"}
+
+    def get_contents(self, request, path):
+        ref = f"heads/{request.query.get('ref') or 'main'}"
+        if ref not in self.refs:
+            return 404, {"message": "No commit found for the ref"}
+        entries = self.trees[self.commits[self.refs[ref]]["tree"]]
+        path = path.strip("/")
+        if path in entries:
+            if "raw" in request.headers.get("Accept", ""):
+                return 200, self.blobs[entries[path]]
+            return 200, self._content_json(path, entries[path])
+        prefix = f"{path}/" if path else ""
+        children = {}
+        for file_path, blob in entries.items():
+            if not file_path.startswith(prefix):
+                continue
+            name, _, rest = file_path[len(prefix):].partition("/")
+            child = prefix + name
+            if rest:
+                children.setdefault(child, {"type": "dir", "name": name, "path": child, "sha": _sha(child)})
+            else:
+                children[child] = self._content_json(child, blob, with_content=False)
+        if not children:
+            return 404, {"message": "Not Found"}
+        return 200, sorted(children.values(), key=lambda c: c["path"])
+
+    def put_contents(self, request, path):
+        body = request.json
+        ref = f"heads/{body.get('branch') or 'main'}"
+        if ref not in self.refs:
+            return 404, {"message": "Branch not found"}
+        head = self.refs[ref]
+        entries = dict(self.trees[self.commits[head]["tree"]])
+        existed = path in entries
+        if existed and body.get("sha") != entries[path]:
+            return 409, {"message": f"{path} does not match {body.get('sha')}"}
+        content = base64.b64decode(body["content"]).decode("utf-8")
+        blob = _blob_sha(content)
+        self.blobs[blob] = content
+        entries[path] = blob
+        commit = self._commit(body["message"], self._store_tree(entries), [head])
+        self.refs[ref] = commit
+        return (200 if existed else 201), {
+            "content": self._content_json(path, blob, with_content=False),
+            "commit": self._commit_json(commit),
+        }
+
+    def list_issues(self, request):
+        query = request.query
+        issues = self.issues
+        if query.get("state", "open") != "all":
+            issues = [i for i in issues if i["state"] == query.get("state", "open")]
+        if query.get("since"):
+            issues = [i for i in issues if i["updated_at"] >= query["since"]]
+        issues = sorted(issues, key=lambda i: i["updated_at"], reverse=query.get("direction") != "asc")
+        per_page = min(int(query.get("per_page", 30)), self.config.github_page_size, 100)
+        page = int(query.get("page", 1))
+        data = issues[(page - 1) * per_page : page * per_page]
+        etag = f'W/"{_sha(data)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return 304, None, {"ETag": etag}
+        return 200, data, {"ETag": etag}
+
+    def create_issue(self, request):
+        body = request.json
+        return 201, self._add_issue(body["title"], body.get("body") or "", body.get("labels", []))
+
+    def update_issue(self, request, number):
+        issue = next((i for i in self.issues if i["number"] == int(number)), None)
+        if issue is None:
+            return 404, {"message": "Not Found"}
+        for key in ("title", "body", "state"):
+            if key in request.json:
+                issue[key] = request.json[key]
+        issue["updated_at"] = self._timestamp()
+        return 200, issue
+
+    def create_pull(self, request):
+        body = request.json
+        if f"heads/{body['head']}" not in self.refs:
+            return 422, {"message": "Validation Failed", "errors": [{"field": "head"}]}
+        number = len(self.issues) + len(self.pulls) + 1
+        pull = {
+            "number": number,
+            "title": body["title"],
+            "body": body.get("body"),
+            "state": "open",
+            "head": {"ref": body["head"]},
+            "base": {"ref": body.get("base", "main")},
+            "url": f"{self.base}/repos/{self.full_name}/pulls/{number}",
+            "html_url": f"https://github.com/{self.full_name}/pull/{number}",
+        }
+        self.pulls.append(pull)
+        return 201, pull
+
+    def routes(self):
+        repo = re.escape(self.full_name)
+        return [
+            ("GET", rf"/repos/{repo}", self.get_repo),
+            ("GET", rf"/repos/{repo}/branches/(.+)", self.get_branch),
+            ("GET", rf"/repos/{repo}/git/refs?/(.+)", self.get_ref),
+            ("POST", rf"/repos/{repo}/git/refs", self.create_ref),
+            ("PATCH", rf"/repos/{repo}/git/refs/(.+)", self.update_ref),
+            ("GET", rf"/repos/{repo}/git/commits/(\w+)", self.get_commit),
+            ("POST", rf"/repos/{repo}/git/commits", self.create_commit),
+            ("GET", rf"/repos/{repo}/git/trees/(\w+)", self.get_tree),
+            ("POST", rf"/repos/{repo}/git/trees", self.create_tree),
+            ("POST", rf"/repos/{repo}/git/blobs", self.create_blob),
+            ("GET", rf"/repos/{repo}/contents/?(.*)", self.get_contents),
+            ("PUT", rf"/repos/{repo}/contents/(.+)", self.put_contents),
+            ("GET", rf"/repos/{repo}/issues", self.list_issues),
+            ("POST", rf"/repos/{repo}/issues", self.create_issue),
+            ("PATCH", rf"/repos/{repo}/issues/(\d+)", self.update_issue),
+            ("POST", rf"/repos/{repo}/pulls", self.create_pull),
+        ]
+
+
+class FakeNotion:
+    """Notion database query endpoint serving generated idea pages."""
+
+    def __init__(self, config: FakeConfig, database_id: str):
+        self.config = config
+        self.database_id = database_id
+        self.lock = threading.Lock()
+        self.pages = [self._page(i) for i in range(config.ideas)]
+
+    @staticmethod
+    def _page(i: int) -> dict:
+        def text(value: str, kind: str = "rich_text") -> dict:
+            return {kind: [{"type": "text", "plain_text": value, "text": {"content": value}}]}
+
+        return {
+            "object": "page",
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "url": f"https://www.notion.so/idea-{i}",
+            "last_edited_time": time.strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(1_700_000_000 + i * 3600)
+            ),
+            "properties": {
+                "Name": text(f"Idea {i}", "title"),
+                "Status": text("Neu"),
+                "TRL": text("Idee" if i % 2 else "Ausformuliert"),
+                "Description": text(f"What idea {i} is about, in a few sentences."),
+                "Category": text(["Backend", "Frontend", "Infra"][i % 3]),
+                "Complexity": text(["S", "M", "L"][i % 3]),
+                "Tags": text("bench"),
+            },
+        }
+
+    def query(self, request, database_id):
+        if database_id.replace("-", "") != self.database_id.replace("-", ""):
+            return 404, {"object": "error", "status": 404, "code": "object_not_found", "message": "Not found"}
+        body = request.json or {}
+        # Only the last_edited_time condition is evaluated; every page matches the rest.
+        edited_after = next(
+            (
+                c["last_edited_time"]["on_or_after"]
+                for c in body.get("filter", {}).get("and", [])
+                if c.get("timestamp") == "last_edited_time"
+            ),
+            None,
+        )
+        pages = [p for p in self.pages if not edited_after or p["last_edited_time"] >= edited_after]
+        start = int(body.get("start_cursor") or 0)
+        size = min(int(body.get("page_size", 100)), self.config.notion_page_size)
+        end = start + size
+        return 200, {
+            "object": "list",
+            "results": pages[start:end],
+            "has_more": end < len(pages),
+            "next_cursor": str(end) if end < len(pages) else None,
+        }
+
+    def routes(self):
+        return [("POST", r"/v1/databases/([\w-]+)/query", self.query)]
+
+
+class StubLLM:
+    """
+    OpenAI-compatible chat completions endpoint speaking crewai's ReAct format.
+    Every agent turn first calls the SCRIPTED_ACTIONS tools it has, then gives
+    a final answer, so a crew run exercises tools without a real model.
+    """
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+
+    def reply(self, messages: list[dict]) -> str:
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        for tool, args in SCRIPTED_ACTIONS.items():
+            if f"Tool Name: {tool}" in prompt and f"Action: {tool}" not in prompt:
+                return (
+                    f"Thought: I should use {tool}.\n"
+                    f"Action: {tool}\n"
+                    f"Action Input: {json.dumps(args)}"
+                )
+        answer = {
+            "issue_title": "Backlog item 1",
+            "technical_specification": "Stub specification.",
+            "code": "```python\nprint('stub')\n```",
+        }
+        return f"Thought: I now know the final answer\nFinal Answer: {json.dumps(answer)}"
+
+    def chat_completions(self, request):
+        body = request.json
+        model = body.get("model", "stub")
+        if model in self.config.llm_failing_models:
+            return 503, {"error": {"message": f"{model} is unavailable", "type": "server_error"}}
+        time.sleep(self.config.llm_model_latency_ms.get(model, 0) / 1000)
+        content = self.reply(body.get("messages", []))
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in body.get("messages", [])) // 4
+        return 200, {
+            "id": f"chatcmpl-{_sha(content, time.time())[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4,
+            },
+        }
+
+    def routes(self):
+        return [("POST", r"/v1/chat/completions", self.chat_completions)]
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    query: dict
+    headers: dict
+    json: dict | None
+
+
+class FakeServices:
+    """
+    Fake GitHub (/github), Notion (/notion) and LLM (/llm) APIs on one local
+    HTTP/1.1 server, so keep-alive and pooling behave as against the real hosts.
+    Counts every request per service and per route.
+    """
+
+    def __init__(
+        self,
+        config: FakeConfig | None = None,
+        full_name: str = "bench/osa",
+        database_id: str = "bench-ideas",
+    ):
+        self.config = config or FakeConfig()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.github = FakeGitHub(self.config, full_name, self.url("github"))
+        self.notion = FakeNotion(self.config, database_id)
+        self.llm = StubLLM(self.config)
+        self.requests: Counter = Counter()
+        self._counter_lock = threading.Lock()
+        self._throttled: dict[str, deque] = defaultdict(deque)
+        self._routes = {
+            "github": (self.github, self.config.latency_ms, self._compile(self.github.routes())),
+            "notion": (self.notion, self.config.latency_ms, self._compile(self.notion.routes())),
+            "llm": (self.llm, self.config.llm_latency_ms, self._compile(self.llm.routes())),
+        }
+
+    @staticmethod
+    def _compile(routes):
+        return [(method, re.compile(pattern + r"/?"), handler) for method, pattern, handler in routes]
+
+    def url(self, service: str) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{service}"
+
+    def __enter__(self) -> "FakeServices":
+        threading.Thread(target=self._server.serve_forever, name="fake-services", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                service, _, path = parts.path.lstrip("/").partition("/")
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, payload, headers = services.dispatch(
+                    _Request(
+                        self.command,
+                        unquote("/" + path),
+                        {k: v[-1] for k, v in parse_qs(parts.query).items()},
+                        dict(self.headers),
+                        json.loads(body) if body else None,
+                    ),
+                    service,
+                )
+                data = b""
+                if payload is not None:
+                    data = (payload if isinstance(payload, str) else json.dumps(payload)).encode("utf-8")
+                self.send_response(status)
+                self.send_header(
+                    "Content-Type", "text/plain" if isinstance(payload, str) else "application/json"
+                )
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+        return Handler
+
+    def throttle(self, service: str, *responses: tuple[int, dict]) -> None:
+        """Answers the next requests to `service` with these (status, headers) instead."""
+        with self._counter_lock:
+            self._throttled[service].extend(responses)
+
+    def dispatch(self, request: _Request, service: str):
+        if service not in self._routes:
+            return 404, {"message": "Not Found"}, {}
+        api, latency_ms, routes = self._routes[service]
+        time.sleep(latency_ms / 1000)
+        with self._counter_lock:
+            if self._throttled[service]:
+                self.requests[service] += 1
+                self.requests[f"{service} throttled"] += 1
+                status, headers = self._throttled[service].popleft()
+                return status, {"message": "API rate limit exceeded"}, headers
+        for method, pattern, handler in routes:
+            match = pattern.fullmatch(request.path)
+            if match and method == request.method:
+                with self._counter_lock:
+                    self.requests[service] += 1
+                    self.requests[f"{service} {request.method} {handler.__name__}"] += 1
+                # The LLM stub is stateless; the fake APIs serialize their mutations.
+                if api is self.llm:
+                    result = handler(request, *match.groups())
+                else:
+                    with api.lock:
+                        result = handler(request, *match.groups())
+                status, payload, headers = result if len(result) == 3 else (*result, {})
+                if service == "github":
+                    headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": str(int(time.time()) + 3600), **headers}
+                return status, payload, headers
+        with self._counter_lock:
+            self.requests[service] += 1
+            self.requests[f"{service} unmatched"] += 1
+        return 404, {"message": f"No fake route for {request.method} {request.path}"}, {}
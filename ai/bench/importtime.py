@@ -0,0 +1,96 @@
+"""
+Cold-start profile of the crew: how long a fresh interpreter takes to import
+kickoff, to construct a DeveloperCrew and to build the crew with its tools.
+Run from the ai/ directory:
+
+    python -m bench.importtime                  # compare against bench/baselines.local.json
+    python -m bench.importtime --save-baseline  # record the current numbers as baseline
+    python -m bench.importtime --top 25
+
+Each phase is measured in fresh interpreters started with -X importtime; the
+fastest of --runs runs counts. The report lists the packages that cost the most
+import time, so new heavy imports on the startup path show up right away.
+Timings only compare on one machine, so the baseline is a local one (see bench.run).
+"""
+
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from bench.run import add_baseline_arguments, check_baseline
+
+AI_DIR = Path(__file__).resolve().parent.parent
+
+STARTUP = """
+import json, time
+started = time.perf_counter()
+import kickoff
+imported = time.perf_counter()
+from crew.dev_crew import DeveloperCrew
+crew = DeveloperCrew()
+constructed = time.perf_counter()
+crew.crew()
+built = time.perf_counter()
+print(json.dumps({
+    "import kickoff": (imported - started) * 1000,
+    "DeveloperCrew()": (constructed - imported) * 1000,
+    "crew() with tools": (built - constructed) * 1000,
+}))
+"""
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def profile_once() -> tuple[dict[str, float], Counter]:
+    """Runs STARTUP in a fresh interpreter; returns phase timings and self time per package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP],
+        cwd=AI_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{result.stderr[-2000:]}")
+    packages: Counter = Counter()
+    for match in _LINE.finditer(result.stderr):
+        self_us, _, _, name = match.groups()
+        packages[name.split(".")[0]] += int(self_us)
+    return json.loads(result.stdout.strip().splitlines()[-1]), packages
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile the crew's cold start.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list")
+    add_baseline_arguments(parser, "importtime")
+    args = parser.parse_args(argv)
+
+    phases: dict[str, float] = {}
+    packages: Counter = Counter()
+    for _ in range(args.runs):
+        timings, run_packages = profile_once()
+        for phase, ms in timings.items():
+            phases[phase] = min(phases.get(phase, ms), ms)
+        if not packages or sum(run_packages.values()) < sum(packages.values()):
+            packages = run_packages
+
+    print(f"{'phase':<24} {'ms':>9}")
+    for phase, ms in phases.items():
+        print(f"{phase:<24} {ms:>9.1f}")
+    print(f"\n{'package':<24} {'self ms':>9}")
+    for package, us in packages.most_common(args.top):
+        print(f"{package:<24} {us / 1000:>9.1f}")
+    print()
+
+    results = {phase: {"cold_ms": round(ms, 1)} for phase, ms in phases.items()}
+    return check_baseline(args, {"python": platform.python_version()}, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""
+Offline benchmark of every tool and of a full DeveloperCrew run.
+
+All GitHub, Notion and LLM traffic goes to local fakes (see bench.fake_api),
+so the numbers only depend on this code, the configured latency and the sizes.
+Run from the ai/ directory:
+
+    python -m bench.run                     # compare against the baselines
+    python -m bench.run --save-baseline     # record the current numbers as baseline
+    python -m bench.run --latency-ms 80 --files 5000 --profile large
+
+Per case it reports the first ("cold") call, measured under tracemalloc for the
+peak memory, and the median/p95 of the following ("warm") calls, plus the
+number of HTTP requests they needed. Every case starts with empty caches, and
+the rate limits are lifted, so timings show this code and not the pacing.
+
+The committed bench/baselines.json only holds numbers that do not depend on
+the machine: exact request and LLM call counts, which must not grow, and the
+warm/cold time ratio. Timings and memory are compared with
+bench/baselines.local.json, which --save-baseline writes next to it and which
+is not committed; CI records its own. A missing baseline, or a case or metric
+without one, fails the comparison.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Callable
+
+from bench.fake_api import FakeConfig, FakeServices
+
+BASELINES = Path(__file__).with_name("baselines.json")
+LOCAL_BASELINES = Path(__file__).with_name("baselines.local.json")
+# Exact counts; any increase is a regression.
+REQUEST_METRICS = ("cold_requests", "warm_requests", "llm_calls")
+# Median warm time over cold time, e.g. 0.01 when a cache answers the warm calls.
+RATIO_METRICS = ("warm_ratio",)
+# Only comparable on the machine that recorded them.
+TIMING_METRICS = ("cold_ms", "warm_p50_ms", "warm_p95_ms", "peak_kib")
+
+
+@dataclass
+class Case:
+    name: str
+    call: Callable[[int], Any]  # gets the iteration number
+    iterations: int | None = None  # defaults to --iterations
+    setup: Callable[[int], Any] | None = None  # gets the number of iterations; not measured
+
+
+def configure(services: FakeServices, workdir: Path) -> None:
+    """
+    Points the tools, the crew and all caches at the fakes and a scratch directory.
+    Settings are read at import time, so this has to run before tools or crew are imported.
+    """
+    if any(name.startswith(("tools.", "crew.")) for name in sys.modules):
+        raise RuntimeError("configure() must run before tools or crew are imported")
+    os.environ.update(
+        {
+            "GH_API_URL": services.url("github"),
+            "GH_REPO_KEY": "bench-token",
+            "GH_REPO_NAME": services.github.full_name,
+            "GH_MIRROR_URL": services.github.export_git(workdir / "remote.git"),
+            "NOTION_API_URL": services.url("notion"),
+            "NOTION_API_KEY": "bench-token",
+            "NOTION_DB_ID": services.notion.database_id,
+            "LLM_MODEL": "openai/osa-bench",
+            "LLM_BASE_URL": services.url("llm") + "/v1",
+            "LLM_CACHE_MODE": "off",
+            "OPENAI_API_KEY": "bench-token",
+            "OSA_CACHE_DIR": str(workdir / "cache"),
+            "OSA_RUNS_DIR": str(workdir / "runs"),
+            "CREWAI_DISABLE_TELEMETRY": "true",
+            "OTEL_SDK_DISABLED": "true",
+            # Pacing would dominate the timings; the scheduler has its own tests.
+            **{
+                f"RATE_LIMIT_{service}_{key}": "10000"
+                for service in ("GITHUB", "NOTION")
+                for key in ("RPS", "BURST")
+            },
+        }
+    )
+
+
+def reset_caches() -> None:
+    """Drops every on-disk and in-memory cache so the next call starts cold."""
+    from crew import routing
+    from tools import code_index, code_search_tool, github_client, repo_tree_index
+    from tools.local_cache import OSA_CACHE_DIR
+
+    shutil.rmtree(OSA_CACHE_DIR, ignore_errors=True)
+    with repo_tree_index._lock:
+        repo_tree_index._indexes.clear()
+        repo_tree_index._heads.clear()
+    with code_index._lock:
+        code_index._indexes.clear()
+    with code_search_tool._lock:
+        code_search_tool._mirrors.clear()
+    github_client.stats.reset()
+    routing.stats.reset()
+
+
+def tool_cases() -> list[Case]:
+    from tools.async_http import run_sync
+    from tools.code_search_tool import CodeSearchTool
+    from tools.notion_issue_sync_tool import NotionIssueSyncTool
+    from tools.github_commit_code_tool import GithubCommitCodeTool
+    from tools.github_create_branch_tool import GithubCreateBranchTool
+    from tools.github_create_pull_request_tool import GithubCreatePullRequestTool
+    from tools.github_issue_create_tool import GithubIssueCreateTool
+    from tools.github_issue_fetch_tool import GithubIssueFetchTool
+    from tools.github_list_files_tool import GithubListFilesTool
+    from tools.github_read_files_tool import GithubReadFilesTool
+    from tools.notion_table_fetch_tool import NotionTableFetchTool
+
+    # _run instead of run(), which prints every call.
+    def sync(tool, args: Callable[[int], dict]) -> Callable[[int], Any]:
+        return lambda i: tool._run(**args(i))
+
+    def run_async(tool, args: Callable[[int], dict]) -> Callable[[int], Any]:
+        return lambda i: run_sync(tool._arun(**args(i)))
+
+    def batch(i: int) -> dict:
+        return {
+            "branch_name": "main",
+            "commit_msg": f"Bench batch {i}",
+            "files": [
+                {"path": f"bench/batch/file_{n}.py", "content": f"# iteration {i}\nVALUE = {n}\n"}
+                for n in range(20)
+            ],
+        }
+
+    issues, files, commit = GithubIssueFetchTool(), GithubListFilesTool(), GithubCommitCodeTool()
+    branch, notion, search = GithubCreateBranchTool(), NotionTableFetchTool(), CodeSearchTool()
+    read_paths = [f"src/pkg{n}/module_{n}.py" for n in range(10)]
+    return [
+        Case("issue_fetch", sync(issues, lambda i: {"limit": 20})),
+        Case("issue_fetch async", run_async(issues, lambda i: {"limit": 20})),
+        Case("issue_fetch number", sync(issues, lambda i: {"number": 1})),
+        Case("list_files dir", sync(files, lambda i: {"path": "src"})),
+        Case("list_files recursive", sync(files, lambda i: {"recursive": True})),
+        Case("list_files recursive async", run_async(files, lambda i: {"recursive": True})),
+        Case("list_files pattern", sync(files, lambda i: {"path": "src/pkg1", "pattern": "*.py"})),
+        Case("read_files 10", sync(GithubReadFilesTool(), lambda i: {"paths": read_paths})),
+        Case("code_search symbol", sync(search, lambda i: {"query": f"function_{i}", "symbol": True})),
+        Case("code_search substring", sync(search, lambda i: {"query": f"return {i}"})),
+        Case("code_search read 10", sync(search, lambda i: {"read": read_paths})),
+        Case(
+            "commit_code single",
+            sync(
+                commit,
+                lambda i: {
+                    "branch_name": "main",
+                    "path": "bench/notes.md",
+                    "content": f"iteration {i}\n",
+                    "commit_msg": f"Bench commit {i}",
+                },
+            ),
+        ),
+        Case("commit_code batch 20", sync(commit, batch)),
+        Case("commit_code batch 20 async", run_async(commit, batch)),
+        Case("create_branch", sync(branch, lambda i: {"branch_name": f"bench/branch-{i}"})),
+        Case(
+            "create_pull_request",
+            sync(
+                GithubCreatePullRequestTool(),
+                lambda i: {"title": f"Bench PR {i}", "body": "Bench", "head": f"bench/pr-{i}"},
+            ),
+            setup=lambda n: [branch._run(branch_name=f"bench/pr-{i}") for i in range(n)],
+        ),
+        Case(
+            "issue_create",
+            sync(GithubIssueCreateTool(), lambda i: {"title": f"Bench issue {i}", "body": "Bench"}),
+        ),
+        Case("notion_fetch", sync(notion, lambda i: {})),
+        Case("notion_fetch async", run_async(notion, lambda i: {})),
+        Case("notion_fetch incremental", sync(notion, lambda i: {"incremental": True})),
+        # After the first run every idea has its issue; later runs should not write at all.
+        Case("notion_issue_sync", sync(NotionIssueSyncTool(), lambda i: {})),
+        Case("notion_issue_sync full", sync(NotionIssueSyncTool(), lambda i: {"full": True})),
+    ]
+
+
+def crew_case(runs: int) -> Case:
+    def run(i: int):
+        from crew.dev_crew import DeveloperCrew
+
+        # crewai's verbose console output would dominate the report.
+        with contextlib.redirect_stdout(io.StringIO()):
+            crew = DeveloperCrew()
+            crew.add_retrieval_context()
+            return crew.crew().kickoff()
+
+    return Case("crew kickoff", run, iterations=runs)
+
+
+def routing_case() -> Case:
+    """One agent's LLM calls routed over a down, a slow and a healthy stub model."""
+    from crew.routing import ModelRouter, RoutingPolicy
+
+    policy = RoutingPolicy.from_dict(
+        {
+            "models": {
+                "openai/osa-down": {"cost": 1},
+                "openai/osa-slow": {"cost": 2},
+                "openai/osa-bench": {"cost": 3},
+            },
+            "tiers": {
+                "bench": {
+                    "models": ["openai/osa-down", "openai/osa-slow", "openai/osa-bench"],
+                    "latency_budget": 0.5,
+                    "min_samples": 2,
+                }
+            },
+            "default_tier": "bench",
+        }
+    )
+    llm = ModelRouter(policy).llm("Developer")
+    return Case("llm routing", lambda i: llm.call([{"role": "user", "content": f"Bench call {i}"}]))
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def measure(case: Case, services: FakeServices, iterations: int) -> dict:
+    iterations = case.iterations or iterations
+    if case.setup:
+        case.setup(iterations)
+    reset_caches()
+    timings, requests, llm_calls = [], [], 0
+    metrics: dict = {}
+    for i in range(iterations):
+        before = {k: services.requests[k] for k in ("github", "notion", "llm")}
+        if i == 0:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            case.call(i)
+        except Exception as e:
+            metrics["error"] = f"{type(e).__name__}: {e}"
+        timings.append((time.perf_counter() - started) * 1000)
+        if i == 0:
+            metrics["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            tracemalloc.stop()
+        delta = {k: services.requests[k] - v for k, v in before.items()}
+        requests.append(delta["github"] + delta["notion"])
+        llm_calls += delta["llm"]
+        if "error" in metrics:
+            break
+
+    metrics.update(cold_ms=round(timings[0], 1), cold_requests=requests[0])
+    if len(timings) > 1:
+        metrics.update(
+            warm_p50_ms=round(statistics.median(timings[1:]), 1),
+            warm_p95_ms=round(_percentile(timings[1:], 0.95), 1),
+            warm_requests=sum(requests[1:]),
+        )
+        if metrics["cold_ms"]:
+            metrics["warm_ratio"] = round(metrics["warm_p50_ms"] / metrics["cold_ms"], 3)
+    if llm_calls:
+        metrics["llm_calls"] = llm_calls
+    return metrics
+
+
+def compare(
+    results: dict, baseline: dict, metrics: tuple[str, ...], tolerance: float, noise_ms: float, noise_ratio: float
+) -> tuple[list[str], list[str]]:
+    """
+    Compares `metrics` with the baseline. Returns the regressions, including
+    metrics without a baseline, and the request counts that went down, whose
+    baseline should be recorded again.
+    """
+    regressions, improvements = [], []
+    for name, result in results.items():
+        if "error" in result:
+            regressions.append(f"{name}: failed with {result['error']}")
+        base = baseline.get(name)
+        if base is None:
+            regressions.append(f"{name}: no baseline, record one with --save-baseline")
+            continue
+        for key in metrics:
+            if key not in result:
+                continue
+            if key not in base:
+                regressions.append(f"{name}: no baseline for {key}")
+                continue
+            if key in REQUEST_METRICS:
+                worse, better = result[key] > base[key], result[key] < base[key]
+            elif key in RATIO_METRICS:
+                worse, better = result[key] > base[key] * (1 + tolerance) + noise_ratio, False
+            else:
+                noise = 0 if key == "peak_kib" else noise_ms
+                worse, better = result[key] > base[key] * (1 + tolerance) + noise, False
+            if worse:
+                regressions.append(f"{name}: {key} {base[key]} -> {result[key]}")
+            elif better:
+                improvements.append(f"{name}: {key} {base[key]} -> {result[key]}")
+    return regressions, improvements
+
+
+def print_report(results: dict) -> None:
+    header = (
+        f"{'case':<28} {'cold ms':>9} {'warm p50':>9} {'warm p95':>9} {'warm/cold':>9} "
+        f"{'req cold':>8} {'req warm':>8} {'llm':>4} {'peak KiB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, m in results.items():
+        print(
+            f"{name:<28} {m['cold_ms']:>9.1f} {m.get('warm_p50_ms', '-'):>9} {m.get('warm_p95_ms', '-'):>9} "
+            f"{m.get('warm_ratio', '-'):>9} "
+            f"{m['cold_requests']:>8} {m.get('warm_requests', '-'):>8} {m.get('llm_calls', '-'):>4} "
+            f"{m.get('peak_kib', '-'):>9}" + (f"  ERROR {m['error']}" if "error" in m else "")
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the tools and the crew against local fake APIs.")
+    # Sizes and latencies are options; the stub models' behaviour stays as configured.
+    options = [f for f in fields(FakeConfig) if f.type in (int, float)]
+    for f in options:
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=f.type, default=f.default)
+    parser.add_argument("--iterations", type=int, default=5, help="Calls per tool case")
+    parser.add_argument("--crew-runs", type=int, default=1, help="Full crew runs; 0 skips the crew")
+    parser.add_argument("--only", help="Only run cases whose name contains this text")
+    add_baseline_arguments(parser, "default")
+    args = parser.parse_args(argv)
+
+    config = FakeConfig(**{f.name: getattr(args, f.name) for f in options})
+    workdir = Path(tempfile.mkdtemp(prefix="osa-bench-"))
+    try:
+        with FakeServices(config) as services:
+            configure(services, workdir)
+            from crew import routing
+
+            cases = tool_cases() + [routing_case()] + ([crew_case(args.crew_runs)] if args.crew_runs else [])
+            results = {}
+            try:
+                for case in cases:
+                    if args.only and args.only not in case.name:
+                        continue
+                    results[case.name] = measure(case, services, args.iterations)
+                    print(f"{case.name}: {results[case.name]['cold_ms']:.0f} ms", file=sys.stderr)
+            finally:
+                routing.shutdown()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+    # Earlier cases change the fakes' state, so the counts depend on which and how many ran.
+    settings = {**asdict(config), "iterations": args.iterations, "crew_runs": args.crew_runs, "only": args.only}
+    return check_baseline(args, settings, results)
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser, profile: str) -> None:
+    parser.add_argument("--profile", default=profile, help="Baseline entry to compare with or save to")
+    parser.add_argument("--baseline", type=Path, default=BASELINES, help="Machine-independent baseline")
+    parser.add_argument("--local-baseline", type=Path, default=LOCAL_BASELINES, help="This machine's timings")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--noise-ms", type=float, default=5, help="Allowed absolute slowdown")
+    parser.add_argument("--noise-ratio", type=float, default=0.25, help="Allowed absolute warm/cold ratio increase")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON")
+
+
+def check_baseline(args: argparse.Namespace, config: dict, results: dict) -> int:
+    """
+    Saves the results as the profile's baselines or compares them with them:
+    counts and ratios with --baseline, timings with --local-baseline.
+    Timings are skipped without a local baseline.
+    Returns the exit code: 1 on regressions or metrics without a baseline,
+    2 if a baseline used other settings, 3 if there is no baseline at all.
+    """
+    config = json.loads(json.dumps(config))  # tuples compare equal to the stored lists
+    if args.output:
+        args.output.write_text(json.dumps({"config": config, "results": results}, indent=2))
+
+    files = {
+        args.baseline: (*REQUEST_METRICS, *RATIO_METRICS),
+        args.local_baseline: TIMING_METRICS,
+    }
+    if args.save_baseline:
+        for path, metrics in files.items():
+            kept = {name: {k: v for k, v in m.items() if k in metrics} for name, m in results.items()}
+            if not any(kept.values()):
+                continue
+            baselines = json.loads(path.read_text()) if path.exists() else {}
+            baselines[args.profile] = {"config": config, "results": kept}
+            path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+            print(f"Saved baseline '{args.profile}' to {path}")
+        return 0
+
+    baseline: dict = {}
+    metrics: tuple[str, ...] = ()
+    for path, path_metrics in files.items():
+        entry = json.loads(path.read_text()).get(args.profile) if path.exists() else None
+        if entry is None:
+            continue
+        if entry["config"] != config:
+            print(f"Baseline '{args.profile}' in {path} was recorded with different settings: {entry['config']}")
+            return 2
+        for name, base in entry["results"].items():
+            baseline.setdefault(name, {}).update(base)
+        metrics += path_metrics
+    if not metrics:
+        print(
+            f"ERROR: no baseline '{args.profile}' in {args.baseline} or {args.local_baseline}; "
+            "run with --save-baseline first.",
+            file=sys.stderr,
+        )
+        return 3
+    if not set(TIMING_METRICS) & set(metrics):
+        print(f"Timings not compared: no baseline '{args.profile}' in {args.local_baseline} for this machine")
+    regressions, improvements = compare(
+        results, baseline, metrics, args.tolerance, args.noise_ms, args.noise_ratio
+    )
+    for line in improvements:
+        print("IMPROVED", line, "(record the baseline again with --save-baseline)")
+    for line in regressions:
+        print("REGRESSION", line)
+    print(f"{len(regressions)} regression(s) against baseline '{args.profile}'")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
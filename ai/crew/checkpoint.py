@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from tools.env import load_env
+from tools.local_cache import OSA_CACHE_DIR
+
+load_env()
+OSA_RUNS_DIR = Path(os.getenv("OSA_RUNS_DIR", OSA_CACHE_DIR / "runs"))
+
+logger = logging.getLogger(__name__)
+
+_STORED_FIELDS = {"description", "name", "expected_output", "summary", "raw", "json_dict", "agent"}
+
+
+class RunCheckpoint:
+    """
+    Persists every task output of one crew run to its own run directory.
+    A checkpoint is only valid for the exact task definition and the exact
+    outputs of the tasks it depends on, so resuming never mixes stale results.
+    """
+
+    def __init__(self, run_dir: Path):
+        self.run_dir = Path(run_dir)
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.run_id = self.run_dir.name
+
+    @classmethod
+    def open(cls, run_id: str | None = None, resume: bool = False) -> "RunCheckpoint":
+        """Opens `run_id`, the latest run when resuming without an id, or a fresh run."""
+        if run_id is None and resume:
+            runs = sorted(p for p in OSA_RUNS_DIR.glob("*") if p.is_dir())
+            if runs:
+                return cls(runs[-1])
+        return cls(OSA_RUNS_DIR / (run_id or time.strftime("%Y%m%d-%H%M%S")))
+
+    def fingerprint(self, task: Task) -> str:
+        """Hashes the task definition together with the outputs of its context tasks."""
+        context = task.context if isinstance(task.context, list) else []
+        payload = {
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "agent": task.agent.role if task.agent else None,
+            "context": [t.output.raw if t.output else None for t in context],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, task: Task) -> Path:
+        return self.run_dir / f"{task.name}.json"
+
+    def save(self, task: Task, output: TaskOutput) -> None:
+        data = {
+            "fingerprint": self.fingerprint(task),
+            "output": output.model_dump(include=_STORED_FIELDS),
+        }
+        tmp = self._path(task).with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, default=str))
+        tmp.replace(self._path(task))
+
+    def load(self, task: Task) -> TaskOutput | None:
+        path = self._path(task)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        if data.get("fingerprint") != self.fingerprint(task):
+            return None
+        return TaskOutput(**data["output"])
+
+    def remember(self, name: str, compute: Callable[[], str], resume: bool = False) -> str:
+        """
+        Computes a run input once and keeps it in the run directory. When
+        resuming, the stored value is returned instead, so inputs that end up in
+        a task definition keep their fingerprint and are not fetched again.
+        """
+        path = self.run_dir / f"{name}.input"
+        if resume and path.exists():
+            return path.read_text()
+        value = compute()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(value)
+        tmp.replace(path)
+        return value
+
+    def attach(self, tasks: list[Task], resume: bool = False) -> list[Task]:
+        """
+        Makes every task save its output as soon as it completes and, when
+        resuming, restores valid checkpoints in order. Restored tasks keep their
+        output so later tasks still get it as context.
+        Returns the tasks that still have to run.
+        """
+        pending = []
+        for task in tasks:
+            output = self.load(task) if resume else None
+            if output is not None:
+                task.output = output
+                logger.info("Resuming %s from checkpoint in %s", task.name, self.run_dir)
+                continue
+            task.callback = self._saver(task, task.callback)
+            pending.append(task)
+        return pending
+
+    def _saver(self, task: Task, callback):
+        def save(output: TaskOutput):
+            self.save(task, output)
+            if callback:
+                callback(output)
+
+        return save
@@ -1,10 +1,9 @@
 from crewai import Agent, Crew, Process, Task
-from crewai_tools import CodeInterpreterTool
-from tools.github_commit_code_tool import GithubCommitCodeTool
-from tools.github_create_branch_tool import GithubCreateBranchTool
-from tools.github_create_pull_request_tool import GithubCreatePullRequestTool
-from tools.github_issue_fetch_tool import GithubIssueFetchTool
-from tools.github_list_files_tool import GithubListFilesTool
+from crew import retrieval
+from crew.llm import build_llm
+from crew.routing import get_router
+from crew.task_graph import schedule_tasks
+from tools.registry import registry
 
 
 class DeveloperCrew:
@@ -15,32 +14,86 @@ class DeveloperCrew:
     # agents_config: dict  # Add this line to define agents_config
     tasks_config: dict  # Add this line to define tasks_config
 
-    def __init__(self):
-        self.init_tools()
+    def __init__(self, issue=None, branch_prefix: str = "feature/", stream: bool = False):
+        """
+        Without an issue the requirements engineer picks one from the backlog;
+        with an issue (see tools.issue_store.Issue) the crew works on exactly that one.
+        With stream=True the LLM streams its tokens (see crew.progress).
+        """
+        self.issue = issue
+        self.stream = stream
+        self.branch_prefix = branch_prefix
+        self.retrieval_context: str | None = None
         self.init_agents()
         self.init_tasks()
 
-    def init_tools(self):
-        """Initialize tools for the crew."""
-        self.code_tool = CodeInterpreterTool(unsafe_mode=True)
-        self.github_issue_fetch_tool = GithubIssueFetchTool()
-        self.github_list_files_tool = GithubListFilesTool()
-        self.github_create_branch_tool = GithubCreateBranchTool()
-        self.github_commit_code_tool = GithubCommitCodeTool()
-        self.github_create_pull_request_tool = GithubCreatePullRequestTool()
+    def init_tools(self, tasks: list[Task]):
+        """
+        Equips the agents of the given tasks with their tools (see tools.registry).
+        Tools are only imported and built for agents that actually run, so e.g.
+        resuming after the develop task never loads the code interpreter.
+        """
+        for agent in {id(t.agent): t.agent for t in tasks if t.agent}.values():
+            if not agent.tools:
+                agent.tools = registry.build(self.agent_tools[agent.role])
+
+    def build_retrieval_context(self) -> str:
+        """The top-ranked issues and their most similar files (see crew.retrieval); syncs issues and the mirror."""
+        return retrieval.build_context(self.issue)
+
+    def add_retrieval_context(self, context: str | None = None) -> str:
+        """
+        Appends the retrieval context to the requirements task, so the agent
+        starts from a short candidate list instead of full listings. The
+        context becomes part of the task definition, so add it before
+        RunCheckpoint.attach fingerprints the tasks. Without `context` it is
+        built here (see build_retrieval_context). Only the first call counts.
+        """
+        if self.retrieval_context is None:
+            self.retrieval_context = self.build_retrieval_context() if context is None else context
+            if self.retrieval_context:
+                self.requirements_task.description += f"\n                {self.retrieval_context}\n"
+        return self.retrieval_context
+
+    def agent_llm(self, role: str):
+        """The agent's LLM as routed by LLM_ROUTING_POLICY (see crew.routing), else the shared one."""
+        router = get_router()
+        if router is None:
+            return self.llm
+        return router.llm(role, stream=self.stream)
 
     def init_agents(self):
-        """Initialize agents for the crew."""
+        """Initialize agents for the crew. Their tools are added by init_tools()."""
+        self.llm = build_llm(stream=self.stream)
+        self.agent_tools = {
+            "Requirements Engineer": [
+                "github_issue_fetch",
+                "github_list_files",
+                "github_read_files",
+                "code_search",
+            ],
+            "Developer": [
+                # "github_issue_fetch",
+                # "github_list_files",
+                "code_interpreter",
+                "test_runner",
+            ],
+            "DevOps Engineer": [
+                "github_issue_fetch",
+                "github_list_files",
+                "github_create_branch",
+                "github_commit_code",
+                "github_create_pull_request",
+                # "code_interpreter",
+            ],
+        }
+
         self.requirements_engineer = Agent(
             verbose=True,
             role="Requirements Engineer",
             goal="Create a detailed technical specification for the development team",
             backstory="You are an expert in analyzing product requirements and translating them into technical specifications. You ensure that the development team has a clear understanding of the tasks at hand.",
-            llm="gemini/gemini-2.0-flash",
-            tools=[
-                self.github_issue_fetch_tool,
-                self.github_list_files_tool,
-            ],
+            llm=self.agent_llm("Requirements Engineer"),
             allow_code_execution=False,
             allow_delegation=False,
         )
@@ -50,13 +103,9 @@ class DeveloperCrew:
             role="Developer",
             goal="Implement software features and fix bugs based on requirements",
             backstory="You are a skilled software developer with experience in various programming languages and frameworks. You enjoy solving complex problems and creating efficient, scalable solutions.",
-            llm="gemini/gemini-2.0-flash",
-            tools=[
-                # self.github_issue_fetch_tool,
-                # self.github_list_files_tool,
-                self.code_tool,
-            ],
-            allow_code_execution=True,
+            llm=self.agent_llm("Developer"),
+            # Code runs through the sandbox pool of the code_interpreter tool.
+            allow_code_execution=False,
             allow_delegation=False,
         )
 
@@ -65,15 +114,7 @@ class DeveloperCrew:
             role="DevOps Engineer",
             goal="Manage the software development lifecycle, including branching, committing code, and creating pull requests",
             backstory="You are a DevOps engineer responsible for ensuring smooth collaboration between development and operations teams. You manage the software development lifecycle, including branching, committing code, and creating pull requests.",
-            llm="gemini/gemini-2.0-flash",
-            tools=[
-                self.github_issue_fetch_tool,
-                self.github_list_files_tool,
-                self.github_create_branch_tool,
-                self.github_commit_code_tool,
-                self.github_create_pull_request_tool,
-                # self.code_tool,
-            ],
+            llm=self.agent_llm("DevOps Engineer"),
             allow_code_execution=False,
             allow_delegation=False,
         )
@@ -84,15 +125,25 @@ class DeveloperCrew:
             self.dev_ops,
         ]
 
+    def issue_selection(self) -> str:
+        """Instructions for how the requirements engineer gets to its issue."""
+        if self.issue is None:
+            return """Review the issues in the GitHub Project Board with GithubIssueFetchTool.
+                Select one high-priority issue from the backlog. Issues are listed most urgent first; use the priority and label filters to narrow the list.
+                Read the selected issue in full with GithubIssueFetchTool by passing its number."""
+        return f"""Work on issue #{self.issue.number}: {self.issue.title}
+                Read it in full with GithubIssueFetchTool by passing number={self.issue.number}. Do not select another issue."""
+
     def init_tasks(self):
         """Initialize tasks for the crew."""
         self.requirements_task = Task(
-            description="""
-                Review the issues in the GitHub Project Board with GithubIssueFetchTool.
-                Select one high-priority issue from the backlog.
+            name="requirements_task",
+            description=f"""
+                {self.issue_selection()}
                 Analyze the issue details, including title, description, requirements, and acceptance criteria.
                 Ensure you understand the context and purpose of the issue.
-                Compare with files in the current repository using GithubListFilesTool.
+                Compare with files in the current repository using GithubListFilesTool (recursive=True lists the whole project grouped by directory; narrow it with path or pattern, or pass the returned cursor for the next page).
+                Find the code the issue touches with the Code Search Tool (symbol=True for names of functions and classes) and read it there or, several files in one call, with GithubReadFilesTool.
                 Write a detailed technical specification from the issue for the whole team to understand easily, including:
                 - Overview of the problem to be solved
                 - Technical approach and architecture
@@ -115,19 +166,19 @@ class DeveloperCrew:
         )
 
         self.develop_task = Task(
+            name="develop_task",
             description="""
                 Implement the required functionality and take the existing project into consideration.
                 Write clean, testable code that fulfills all the defined acceptance criteria.
                 Ensure the code adheres to the project's coding standards and best practices.
                 Document the code thoroughly, including comments and docstrings where necessary.
                 Write unit tests to cover all functionalities, edge cases, and potential failure points.
-                Set up the development environment, including installing necessary dependencies and tools.
-                Ensure that the environment is configured correctly for the project.
-                Use the uv tool to install dependencies from the pyproject.toml file.
+                The Code Interpreter runs in a warm environment that already has all dependencies from uv.lock installed.
                 Ensure that the development environment is ready for coding and testing.
                 This task is crucial for the successful execution of the development tasks.
-                Use the CodeInterpreterTool to execute the application and see if it works.
-                If some dependencies are missing, install them using the CodeInterpreterTool.
+                Use the Code Interpreter to execute the application and see if it works.
+                Run the tests with the Test Runner; it only reruns the tests affected by your changes, so run it after every change.
+                If some dependencies are missing, pass them as libraries_used to the Code Interpreter.
                 Ensure that the application runs without errors and all dependencies are installed correctly.
                 Repeat changing the code until all the written tests are passing and the application is running smoothly with all necessary dependencies.
             """,
@@ -145,10 +196,12 @@ class DeveloperCrew:
         )
 
         self.pr_task = Task(
-            description="""
-                Create a new branch for development using the format: 'feature/<slugified-issue-title>'.
+            name="pr_task",
+            description=f"""
+                Create a new branch for development using the format: '{self.branch_prefix}<slugified-issue-title>'.
                 Ensure the branch is based on the latest main branch to avoid conflicts.
                 Slice the whole code into smaller, manageable commits that are easy to review.
+                Commit all files of one logical change together by passing them as 'files' to GithubCommitCodeTool.
                 Only open a pull request (PR) after the code is fully implemented, tested, and reviewed by the whole crew and approved.
                 Always ask all the crew members for feedback before opening a PR.
                 Open a pull request (PR) that includes a technical summary, references the related issue (e.g. #123), and outlines how to test the implementation.
@@ -171,11 +224,15 @@ class DeveloperCrew:
             context=[self.develop_task],  # type: ignore[index]
         )
 
-        self.tasks = [
-            self.develop_task,
-            self.requirements_task,
-            self.pr_task,
-        ]
+        # Concurrency follows the tasks' context dependencies; every context task
+        # is listed before the tasks that use it.
+        self.tasks = schedule_tasks(
+            [
+                self.requirements_task,
+                self.develop_task,
+                self.pr_task,
+            ]
+        )
 
     # @agent
     # def requirements_engineer(self) -> Agent:
@@ -291,11 +348,16 @@ class DeveloperCrew:
     #     )
 
     # @crew
-    def crew(self) -> Crew:
-        """Creates the software development crew"""
+    def crew(self, tasks: list[Task] | None = None) -> Crew:
+        """
+        Creates the software development crew, optionally for a subset of its tasks.
+        Does no I/O; the retrieval context is added beforehand (see add_retrieval_context).
+        """
+        tasks = self.tasks if tasks is None else schedule_tasks(tasks)
+        self.init_tools(tasks)
         return Crew(
             agents=self.agents,
-            tasks=self.tasks,
+            tasks=tasks,
             # manager_llm="gemini/gemini-2.0-flash",
             process=Process.sequential,
             verbose=True,
@@ -0,0 +1,57 @@
+from crewai.utilities.events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    crewai_event_bus,
+)
+from tools.tracing import Tracer, tracer
+
+_installed = False
+
+
+def install(trace: Tracer = tracer) -> None:
+    """
+    Opens a span when crewai starts a task or an agent run and closes it when
+    the matching completed/failed event arrives. Handlers run on the thread
+    that executes the task, so LLM and tool spans nest below it.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    open_spans = {}
+
+    def start(kind: str, key, name: str, **attrs) -> None:
+        open_spans[(kind, id(key))] = trace.start(kind, name, **attrs)
+
+    def finish(kind: str, key, error=None) -> None:
+        span = open_spans.pop((kind, id(key)), None)
+        if span is not None:
+            trace.finish(span, RuntimeError(error) if error else None)
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source, event):
+        start("task", source, getattr(source, "name", None) or "task")
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source, event):
+        finish("task", source)
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def on_task_failed(source, event):
+        finish("task", source, event.error)
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def on_agent_started(source, event):
+        start("agent", event.agent, event.agent.role.strip())
+
+    @crewai_event_bus.on(AgentExecutionCompletedEvent)
+    def on_agent_completed(source, event):
+        finish("agent", event.agent)
+
+    @crewai_event_bus.on(AgentExecutionErrorEvent)
+    def on_agent_error(source, event):
+        finish("agent", event.agent, event.error)
@@ -0,0 +1,208 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+
+from tools.env import load_env
+from tools.local_cache import cache_path
+
+load_env()
+# How long a claimed job stays reserved without a heartbeat from its owner.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Delay before a failed job is retried; doubles with every attempt.
+JOB_RETRY_SECONDS = float(os.getenv("JOB_RETRY_SECONDS", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, not_before, id);
+"""
+
+STATES = ("queued", "running", "done", "failed")
+
+
+@dataclass
+class Job:
+    id: int
+    key: str
+    kind: str
+    payload: dict
+    state: str
+    attempts: int
+    lease_owner: str | None = None
+    result: str | None = None
+    error: str | None = None
+
+
+def worker_id() -> str:
+    """Identifies this process as a lease owner: host and pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Persistent local work queue in SQLite.
+    Every job has an idempotency key, so enqueueing the same work twice (a
+    poll and a webhook for the same issue) yields one job. A worker claims a
+    job with a lease that it has to renew while it works; if the worker dies,
+    the lease runs out and the job is handed out again. Only the lease owner
+    can finish a job, so a job that was handed out again is never finished
+    twice.
+    """
+
+    def __init__(self, name: str = "jobs"):
+        self.path = cache_path("daemon", f"{name}.sqlite3")
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit; claim() takes the write lock explicitly.
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def enqueue(self, kind: str, payload: dict, key: str) -> tuple[Job, bool]:
+        """Adds a job unless one with `key` exists. Returns the job and whether it is new."""
+        now = time.time()
+        with closing(self._connect()) as db:
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO jobs (key, kind, payload, created, updated) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(payload), now, now),
+            )
+            row = db.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+        return self._row_to_job(row), cursor.rowcount == 1
+
+    def claim(self, owner: str, lease: float = JOB_LEASE_SECONDS) -> Job | None:
+        """
+        Leases the oldest due job to `owner`: a queued one, or a running one
+        whose lease expired because its worker is gone.
+        """
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT id FROM jobs WHERE (state = 'queued' AND not_before <= ?)"
+                " OR (state = 'running' AND lease_until < ?) ORDER BY id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_owner = ?,"
+                " lease_until = ?, updated = ? WHERE id = ?",
+                (owner, now + lease, now, row[0]),
+            )
+            job = db.execute("SELECT * FROM jobs WHERE id = ?", (row[0],)).fetchone()
+            db.execute("COMMIT")
+        return self._row_to_job(job)
+
+    def renew(self, job: Job, owner: str, lease: float = JOB_LEASE_SECONDS) -> bool:
+        """Extends the lease; False if `owner` lost it and has to give the job up."""
+        return self._update(
+            job, owner, "lease_until = ?, updated = ?", (time.time() + lease, time.time())
+        )
+
+    def complete(self, job: Job, owner: str, result: str = "") -> bool:
+        return self._update(
+            job,
+            owner,
+            "state = 'done', result = ?, error = NULL, lease_owner = NULL, lease_until = NULL, updated = ?",
+            (result, time.time()),
+        )
+
+    def fail(self, job: Job, owner: str, error: str, max_attempts: int = JOB_MAX_ATTEMPTS) -> bool:
+        """Queues the job again with exponential backoff, or marks it failed for good."""
+        if job.attempts < max_attempts:
+            retry_at = time.time() + JOB_RETRY_SECONDS * 2 ** (job.attempts - 1)
+            return self._update(
+                job,
+                owner,
+                "state = 'queued', error = ?, not_before = ?, lease_owner = NULL, lease_until = NULL, updated = ?",
+                (error, retry_at, time.time()),
+            )
+        return self._update(
+            job,
+            owner,
+            "state = 'failed', error = ?, lease_owner = NULL, lease_until = NULL, updated = ?",
+            (error, time.time()),
+        )
+
+    def release(self, job: Job, owner: str) -> bool:
+        """Hands an unfinished job back without counting the attempt."""
+        return self._update(
+            job,
+            owner,
+            "state = 'queued', attempts = attempts - 1, lease_owner = NULL, lease_until = NULL, updated = ?",
+            (time.time(),),
+        )
+
+    def recover(self) -> int:
+        """
+        Queues again the jobs that a dead process on this host still holds,
+        without waiting for their leases to run out. Returns how many.
+        """
+        host = socket.gethostname()
+        dead = []
+        with closing(self._connect()) as db:
+            for job_id, owner in db.execute(
+                "SELECT id, lease_owner FROM jobs WHERE state = 'running'"
+            ).fetchall():
+                owner_host, _, pid = (owner or "").rpartition(":")
+                if owner_host == host and pid.isdigit() and not _alive(int(pid)):
+                    dead.append((time.time(), job_id, owner))
+            db.executemany(
+                "UPDATE jobs SET state = 'queued', attempts = attempts - 1, lease_owner = NULL,"
+                " lease_until = NULL, updated = ? WHERE id = ? AND lease_owner = ?",
+                dead,
+            )
+        return len(dead)
+
+    def _update(self, job: Job, owner: str, assignments: str, args: tuple) -> bool:
+        with closing(self._connect()) as db:
+            cursor = db.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND state = 'running' AND lease_owner = ?",
+                (*args, job.id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def get(self, key: str) -> Job | None:
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def counts(self) -> dict[str, int]:
+        with closing(self._connect()) as db:
+            counts = dict(db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return {state: counts.get(state, 0) for state in STATES}
+
+    @staticmethod
+    def _row_to_job(row) -> Job:
+        job_id, key, kind, payload, state, attempts, _, owner, _, result, error, _, _ = row
+        return Job(job_id, key, kind, json.loads(payload), state, attempts, owner, result, error)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import litellm
+from crewai import LLM
+from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+from tools.env import load_env
+from tools.local_cache import OSA_CACHE_DIR
+from tools.tracing import tracer
+
+load_env()
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini/gemini-2.0-flash")
+# Optional OpenAI-compatible endpoint, e.g. a local model server or the benchmark stub.
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")
+# off: always call the model; cache: serve repeated calls from disk;
+# record: call the model and store every response as a cassette;
+# replay: answer only from the cassette, never calling the model. Tools still
+# call GitHub and Notion, so a replay only stays on the recorded path while
+# their answers are the same as during the recording.
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+LLM_CASSETTE_DIR = Path(os.getenv("LLM_CASSETTE_DIR", OSA_CACHE_DIR / "cassettes" / "default"))
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCacheMiss(LookupError):
+    """Raised in replay mode when a call was never recorded."""
+
+
+class ResponseStore:
+    """
+    Content-addressed store of LLM responses, one JSON file per key.
+    With `max_bytes` set, the least recently used entries are evicted once the
+    store grows beyond it, down to EVICT_TO of it; hits refresh an entry's mtime.
+    The size is scanned once and then tracked per write, so only an eviction
+    walks the whole store.
+    """
+
+    EVICT_TO = 0.9
+
+    def __init__(self, root: Path, max_bytes: int | None = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            response = json.loads(path.read_text())["response"]
+        except FileNotFoundError:
+            return None
+        if self.max_bytes:
+            os.utime(path)
+        return response
+
+    def put(self, key: str, model: str, response: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        replaced = path.stat().st_size if path.exists() else 0
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"model": model, "response": response}))
+        tmp.replace(path)
+        if not self.max_bytes:
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+            else:
+                self._size += path.stat().st_size - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Rescans, since other processes may share the store.
+        entries = [(p.stat(), p) for p in self.root.glob("*/*.json")]
+        total = sum(st.st_size for st, _ in entries)
+        for st, path in sorted(entries, key=lambda e: e[0].st_mtime):
+            if total <= self.max_bytes * self.EVICT_TO:
+                break
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+        self._size = total
+
+
+def cache_key(model: str, messages, tools=None, **params) -> str:
+    payload = {"model": model, "messages": messages, "tools": tools, **params}
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class CachedLLM(LLM):
+    """
+    crewai LLM that answers repeated calls from a local response store.
+    The key covers the model, the messages, the tool schema and the sampling
+    parameters, so any change to the prompt is a miss.
+    Only the model's answers are stored, not tool results: a replayed run
+    that reads changed issues or files builds new prompts and misses.
+    Calls that execute tools through `available_functions` are never cached.
+    """
+
+    def __init__(self, model: str, mode: str = LLM_CACHE_MODE, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self._mode = mode
+        if mode == "cache":
+            self._store = ResponseStore(
+                OSA_CACHE_DIR / "llm", int(LLM_CACHE_MAX_MB * 1024 * 1024)
+            )
+        else:
+            self._store = ResponseStore(LLM_CASSETTE_DIR)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        with tracer.span("llm", self.model) as span:
+            response = self._cached_call(
+                span, messages, tools, callbacks, available_functions, **kwargs
+            )
+            # Cache hits cost no tokens, so only real completions are counted.
+            if isinstance(response, str) and span.attrs.get("cache") != "hit":
+                tracer.record(
+                    prompt_tokens=_count_tokens(self.model, messages=messages),
+                    completion_tokens=_count_tokens(self.model, text=response),
+                )
+            return response
+
+    def _cached_call(self, span, messages, tools, callbacks, available_functions, **kwargs):
+        if self._mode == "off" or available_functions:
+            span.attrs["cache"] = "bypass"
+            return self._complete(messages, tools, callbacks, available_functions, **kwargs)
+
+        key = cache_key(
+            self.model, messages, tools, temperature=self.temperature, stop=self.stop
+        )
+        if self._mode != "record":
+            response = self._store.get(key)
+            if response is not None:
+                logger.debug("LLM cache hit %s", key[:12])
+                span.attrs["cache"] = "hit"
+                if self.stream:
+                    # Stream consumers see cached answers too, as a single chunk.
+                    crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=response))
+                return response
+            if self._mode == "replay":
+                raise LLMCacheMiss(f"No recorded response for {self.model} call {key[:12]}")
+
+        span.attrs["cache"] = "miss"
+        response = self._complete(messages, tools, callbacks, available_functions, **kwargs)
+        if isinstance(response, str):
+            self._store.put(key, self.model, response)
+        return response
+
+    def _complete(self, messages, tools, callbacks, available_functions, **kwargs):
+        """Calls the model itself; every call that is not served from the store ends up here."""
+        return super().call(messages, tools, callbacks, available_functions, **kwargs)
+
+
+def _count_tokens(model: str, **content) -> int:
+    """Token count as litellm would bill it; 0 if the model's tokenizer is unknown."""
+    try:
+        return litellm.token_counter(model=model, **content)
+    except Exception:
+        return 0
+
+
+def build_llm(model: str = LLM_MODEL, **kwargs) -> LLM:
+    """Creates the LLM used by the crew's agents."""
+    if LLM_BASE_URL:
+        kwargs.setdefault("base_url", LLM_BASE_URL)
+    return CachedLLM(model=model, **kwargs)
@@ -0,0 +1,192 @@
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import TextIO
+
+from crewai.utilities.events import (
+    LLMStreamChunkEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+    crewai_event_bus,
+)
+from tools.env import load_env
+from tools.tracing import tracer
+
+load_env()
+# Events held in memory before producers have to wait for the writer.
+PROGRESS_BUFFER = int(os.getenv("PROGRESS_BUFFER", "1000"))
+# Written while nothing else happens, so consumers can tell a stuck run from a slow one.
+PROGRESS_HEARTBEAT = float(os.getenv("PROGRESS_HEARTBEAT", "5"))
+PROGRESS_MAX_FIELD = int(os.getenv("PROGRESS_MAX_FIELD", "2000"))
+
+_CLOSE = object()
+_active: "ProgressStream | None" = None
+_installed = False
+
+
+class ProgressStream:
+    """
+    Writes progress events as JSON lines from a background thread.
+    Events wait in a bounded buffer. When it is full, LLM tokens are dropped
+    (and counted in the next 'dropped' event), while every other event blocks
+    its producer until the writer caught up, so a slow consumer slows the
+    crew down instead of growing memory.
+    """
+
+    def __init__(self, out: TextIO, buffer: int = PROGRESS_BUFFER, heartbeat: float = PROGRESS_HEARTBEAT):
+        self.out = out
+        self.heartbeat = heartbeat
+        self.seq = 0
+        self.dropped = 0
+        self.blocked_seconds = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=buffer)
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write, name="progress-writer", daemon=True)
+        self._writer.start()
+
+    def emit(self, event: str, lossy: bool = False, **fields) -> None:
+        record = {"event": event, "ts": round(time.time(), 3), **fields}
+        task = tracer.current("task")
+        if task is not None:
+            record.setdefault("task", task.name)
+        if lossy:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            started = time.perf_counter()
+            self._queue.put(record)
+            with self._lock:
+                self.blocked_seconds += time.perf_counter() - started
+
+    def _write(self) -> None:
+        pending = None
+        while True:
+            if pending is not None:
+                record, pending = pending, None
+            else:
+                try:
+                    record = self._queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    record = {"event": "heartbeat", "ts": round(time.time(), 3)}
+            if record is _CLOSE:
+                return
+            if record["event"] == "llm_token":
+                # Tokens that queued up while the last line was written go out as one line.
+                while pending is None:
+                    try:
+                        queued = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if queued is not _CLOSE and queued["event"] == "llm_token" and queued.get("task") == record.get("task"):
+                        record["text"] += queued["text"]
+                    else:
+                        pending = queued
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                self._line({"event": "dropped", "ts": record["ts"], "count": dropped})
+            self._line(record)
+
+    def _line(self, record: dict) -> None:
+        self.seq += 1
+        self.out.write(json.dumps({"seq": self.seq, **record}, default=str) + "\n")
+        self.out.flush()
+
+    def close(self) -> None:
+        self.emit("stream_closed", blocked_seconds=round(self.blocked_seconds, 3))
+        self._queue.put(_CLOSE)
+        self._writer.join()
+
+
+def _clip(value) -> str:
+    text = str(value)
+    return text if len(text) <= PROGRESS_MAX_FIELD else text[:PROGRESS_MAX_FIELD] + "..."
+
+
+def emit(event: str, lossy: bool = False, **fields) -> None:
+    """Sends an event to the active stream, if there is one."""
+    if _active is not None:
+        _active.emit(event, lossy, **fields)
+
+
+@contextmanager
+def streaming(out: TextIO):
+    """Streams the crew's progress events to `out` while the block runs."""
+    global _active
+    _install()
+    stream = ProgressStream(out)
+    _active = stream
+    try:
+        yield stream
+    finally:
+        _active = None
+        stream.close()
+
+
+def _install() -> None:
+    """Forwards crewai's task, tool and LLM stream events to the active stream."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    started: dict[int, float] = {}
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source, event):
+        started[id(source)] = time.perf_counter()
+        agent = getattr(source, "agent", None)
+        emit("task_started", task=getattr(source, "name", None), agent=agent.role.strip() if agent else None)
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source, event):
+        emit(
+            "task_completed",
+            task=getattr(source, "name", None),
+            seconds=round(time.perf_counter() - started.pop(id(source), time.perf_counter()), 3),
+            output=_clip(getattr(event.output, "raw", event.output)),
+        )
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def on_task_failed(source, event):
+        started.pop(id(source), None)
+        emit("task_failed", task=getattr(source, "name", None), error=_clip(event.error))
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def on_tool_started(source, event):
+        emit(
+            "tool_call",
+            tool=event.tool_name,
+            args=_clip(event.tool_args),
+            agent=getattr(event, "agent_role", None),
+        )
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        emit(
+            "tool_result",
+            tool=event.tool_name,
+            seconds=round((event.finished_at - event.started_at).total_seconds(), 3),
+            from_cache=getattr(event, "from_cache", False),
+            output=_clip(getattr(event, "output", "")),
+        )
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def on_tool_error(source, event):
+        emit("tool_error", tool=event.tool_name, error=_clip(event.error))
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def on_llm_chunk(source, event):
+        emit("llm_token", lossy=True, text=event.chunk)
@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import os
+from dataclasses import dataclass, field
+
+from tools.env import load_env
+from tools.tracing import tracer
+
+load_env()
+# Candidates handed to the requirements engineer; RELEVANCE_TOP_ISSUES=0 disables the stage.
+RELEVANCE_TOP_ISSUES = int(os.getenv("RELEVANCE_TOP_ISSUES", "5"))
+RELEVANCE_TOP_FILES = int(os.getenv("RELEVANCE_TOP_FILES", "8"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RankedIssue:
+    issue: object  # tools.issue_store.Issue
+    relevance: float
+    files: list[tuple[str, float]] = field(default_factory=list)
+
+
+def rank(issues: list, index, top_issues: int, top_files: int) -> list[RankedIssue]:
+    """
+    Ranks the files of a CodeIndex against every issue by TF-IDF cosine
+    similarity. Issues keep their priority order; within a priority, issues
+    whose text matches the code best come first, since they are the easiest
+    to ground in the repository.
+    """
+    from tools.relevance import EmbeddingCache, similarity
+
+    paths = [p for p in sorted(index.files) if p not in index.binary]
+
+    def file_texts(positions: list[int]) -> list[str]:
+        contents = index.read_many([paths[i] for i in positions])
+        return [f"{paths[i]}\n{contents.get(paths[i], '')}" for i in positions]
+
+    files = EmbeddingCache(f"files-{index.mirror.path.stem}").matrix(
+        [f"{path}:{index.files[path]}" for path in paths], file_texts
+    )
+    texts = [_issue_text(issue) for issue in issues]
+    queries = EmbeddingCache(f"issues-{index.mirror.path.stem}").matrix(
+        [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts],
+        lambda positions: [texts[i] for i in positions],
+        prune=len(issues) > 1,
+    )
+    if not len(queries) or not len(files):
+        return [RankedIssue(issue, 0.0) for issue in issues[:top_issues]]
+
+    scores = similarity(queries, files)
+    k = min(top_files, len(paths))
+    best = scores.argsort(axis=1)[:, ::-1][:, :k]
+    ranked = [
+        RankedIssue(
+            issue,
+            float(scores[i, best[i]].mean()),
+            [(paths[j], float(scores[i, j])) for j in best[i] if scores[i, j] > 0],
+        )
+        for i, issue in enumerate(issues)
+    ]
+    ranked.sort(key=lambda r: (r.issue.priority, -r.relevance))
+    return ranked[:top_issues]
+
+
+def _issue_text(issue) -> str:
+    # The title names the feature most precisely, so it counts twice.
+    return f"{issue.title}\n{issue.title}\n{' '.join(issue.labels)}\n{issue.body}"
+
+
+def build_context(
+    issue=None, top_issues: int = RELEVANCE_TOP_ISSUES, top_files: int = RELEVANCE_TOP_FILES
+) -> str:
+    """
+    The top-ranked open issues (or only `issue`) with their most similar files,
+    formatted for the requirements task. Returns "" when the stage is disabled,
+    fails or finds no open issue, in which case the agent falls back to its tools.
+    """
+    if top_issues <= 0:
+        return ""
+    from tools.async_http import run_sync
+    from tools.code_index import CodeIndex
+    from tools.github_client import GH_REPO_NAME, github_call
+    from tools.issue_store import IssueStore
+    from tools.repo_mirror import RepoMirror
+
+    with tracer.span("retrieval", "relevance ranking"):
+        try:
+            if issue is None:
+                store = IssueStore(GH_REPO_NAME)
+                with github_call("relevance ranking"):
+                    run_sync(store.async_sync())
+                issues = store.query()
+            else:
+                issues = [issue]
+            ranked = rank(issues, CodeIndex.load(RepoMirror()), top_issues, top_files)
+        except Exception:
+            logger.exception("Relevance ranking failed, the agent has to search on its own")
+            return ""
+    if not ranked:
+        return ""
+
+    lines = [
+        "Pre-ranked candidates (local TF-IDF similarity between issue texts and repository files).",
+        "Select the issue from these and start with its files; list or search the repository only for what they don't cover:",
+    ]
+    for r in ranked:
+        lines.append(f"- #{r.issue.number} [{r.issue.priority_name}] {r.issue.title} (relevance {r.relevance:.2f})")
+        if r.files:
+            lines.append("  files: " + ", ".join(f"{path} ({score:.2f})" for path, score in r.files))
+    return "\n                ".join(lines)
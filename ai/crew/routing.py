@@ -0,0 +1,350 @@
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+from crewai import LLM
+from crewai.utilities.exceptions.context_window_exceeding_exception import (
+    LLMContextLengthExceededException,
+)
+from crew.llm import LLM_BASE_URL, LLM_MODEL, CachedLLM, LLMCacheMiss, build_llm
+from tools.env import load_env
+from tools.tracing import tracer
+
+load_env()
+# YAML policy of model tiers per agent, e.g. crew/config/models.yaml.
+# Without one every agent uses LLM_MODEL, as before.
+LLM_ROUTING_POLICY = os.getenv("LLM_ROUTING_POLICY", "")
+# Calls per model kept for the rolling latency and error statistics.
+LLM_ROUTING_WINDOW = int(os.getenv("LLM_ROUTING_WINDOW", "50"))
+# Older samples are forgotten, so a model that was slow or down gets tried again.
+LLM_ROUTING_WINDOW_SECONDS = float(os.getenv("LLM_ROUTING_WINDOW_SECONDS", "600"))
+LLM_HEDGE_THREADS = int(os.getenv("LLM_HEDGE_THREADS", "16"))
+
+logger = logging.getLogger(__name__)
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    """The threads hedged calls run on, started on first use and again after shutdown()."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(LLM_HEDGE_THREADS, thread_name_prefix="llm-hedge")
+        return _pool
+
+
+def shutdown() -> None:
+    """
+    Stops the hedge pool when a run is done: queued hedges are dropped, running
+    duplicates finish in the background. kickoff, batch workers and the bench
+    call it, since concurrent.futures would otherwise work through the whole
+    queue at exit. Calls that race with it go out without hedging.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _PoolClosed(Exception):
+    """The hedge pool was shut down while a hedged call was using it."""
+
+
+class LLMRoutingError(RuntimeError):
+    """Raised when every model of a tier and its fallbacks failed."""
+
+
+class ModelStats:
+    """Rolling latency and error rate per model over the last calls that reached it."""
+
+    def __init__(self, window: int = LLM_ROUTING_WINDOW, window_seconds: float = LLM_ROUTING_WINDOW_SECONDS):
+        self.window = window
+        self.window_seconds = window_seconds
+        self._samples: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append((time.monotonic(), seconds, ok))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+    def _recent(self, model: str) -> list[tuple[float, float, bool]]:
+        horizon = time.monotonic() - self.window_seconds
+        with self._lock:
+            return [s for s in self._samples.get(model, ()) if s[0] >= horizon]
+
+    def summary(self, model: str) -> dict:
+        """Samples, p50 and p95 latency of successful calls in seconds, and the error rate."""
+        samples = self._recent(model)
+        latencies = sorted(seconds for _, seconds, ok in samples if ok)
+
+        def percentile(q: float) -> float | None:
+            return latencies[min(len(latencies) - 1, round(q * (len(latencies) - 1)))] if latencies else None
+
+        return {
+            "samples": len(samples),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "error_rate": sum(not ok for _, _, ok in samples) / len(samples) if samples else 0.0,
+        }
+
+    def healthy(self, model: str, tier: "Tier") -> bool:
+        """Too few samples count as healthy, so new and recovered models get traffic."""
+        summary = self.summary(model)
+        if summary["samples"] < tier.min_samples:
+            return True
+        if summary["error_rate"] > tier.max_error_rate:
+            return False
+        return summary["p95"] is None or summary["p95"] <= tier.latency_budget
+
+
+stats = ModelStats()
+
+
+@dataclass
+class ModelConfig:
+    name: str
+    cost: float = 0.0  # relative price, e.g. USD per million input tokens
+    base_url: str | None = None
+    api_key_env: str | None = None  # environment variable holding the model's API key
+    timeout: float | None = None
+
+    def llm_kwargs(self) -> dict:
+        kwargs = {}
+        if self.base_url or LLM_BASE_URL:
+            kwargs["base_url"] = self.base_url or LLM_BASE_URL
+        if self.api_key_env and os.getenv(self.api_key_env):
+            kwargs["api_key"] = os.getenv(self.api_key_env)
+        if self.timeout:
+            kwargs["timeout"] = self.timeout
+        return kwargs
+
+
+@dataclass
+class Tier:
+    name: str
+    models: list[str]  # interchangeable models; the cheapest healthy one is tried first
+    latency_budget: float = 60.0  # seconds a call may take before it is hedged
+    max_error_rate: float = 0.5
+    min_samples: int = 5
+    hedge: bool = True
+    fallback: str | None = None  # tier whose models are tried after this tier's
+
+
+@dataclass
+class RoutingPolicy:
+    models: dict[str, ModelConfig]
+    tiers: dict[str, Tier]
+    agents: dict[str, str] = field(default_factory=dict)  # agent role -> tier
+    default_tier: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RoutingPolicy":
+        models = {name: ModelConfig(name, **(cfg or {})) for name, cfg in (data.get("models") or {}).items()}
+        tiers = {name: Tier(name, **cfg) for name, cfg in (data.get("tiers") or {}).items()}
+        policy = cls(models, tiers, dict(data.get("agents") or {}), data.get("default_tier"))
+        for tier in tiers.values():
+            for model in tier.models:
+                policy.models.setdefault(model, ModelConfig(model))
+            if tier.fallback and tier.fallback not in tiers:
+                raise ValueError(f"Tier {tier.name} falls back to unknown tier {tier.fallback}")
+        for role, tier in [*policy.agents.items(), ("default_tier", policy.default_tier)]:
+            if tier is not None and tier not in tiers:
+                raise ValueError(f"{role} is routed to unknown tier {tier}")
+        return policy
+
+    @classmethod
+    def load(cls, path: str | Path) -> "RoutingPolicy":
+        return cls.from_dict(yaml.safe_load(Path(path).read_text()) or {})
+
+    def chain(self, tier: Tier) -> list[tuple[Tier, list[str]]]:
+        """The tier and its fallback tiers, each with the models it adds."""
+        chain, seen = [], set()
+        while tier is not None and tier.name not in seen:
+            seen.add(tier.name)
+            models = [m for m in tier.models if all(m not in ms for _, ms in chain)]
+            chain.append((tier, models))
+            tier = self.tiers.get(tier.fallback) if tier.fallback else None
+        return chain
+
+
+class _MeasuredLLM(CachedLLM):
+    """CachedLLM that reports the latency and outcome of every real model call."""
+
+    def _complete(self, messages, tools, callbacks, available_functions, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = super()._complete(messages, tools, callbacks, available_functions, **kwargs)
+        except LLMContextLengthExceededException:
+            raise  # the prompt's fault, not the model's
+        except Exception:
+            stats.record(self.model, time.perf_counter() - started, False)
+            raise
+        stats.record(self.model, time.perf_counter() - started, True)
+        return response
+
+
+class RoutedLLM(LLM):
+    """
+    LLM of one agent that sends every call to the models of its tier.
+    Healthy models (see ModelStats.healthy) go first, the tier's own before
+    those of its fallback tiers and the cheapest first within a tier, then
+    the unhealthy ones. A failing call fails over to the next model. A call
+    that exceeds the tier's latency budget is hedged: the next model gets
+    the same prompt and the first answer wins.
+    Calls that execute tools or stream are never hedged, since the second
+    model would run the tools or emit tokens a second time.
+    """
+
+    def __init__(self, policy: RoutingPolicy, tier: Tier, **kwargs):
+        chain = policy.chain(tier)
+        super().__init__(model=chain[0][1][0], **kwargs)
+        self.policy = policy
+        self.tier = tier
+        self._chain = chain
+        self._llms = {
+            model: _MeasuredLLM(model=model, **{**policy.models[model].llm_kwargs(), **kwargs})
+            for _, models in chain
+            for model in models
+        }
+
+    def order(self) -> list[tuple[Tier, str]]:
+        """Models to try, with the tier each one is judged by."""
+        healthy, degraded = [], []
+        for rank, (tier, models) in enumerate(self._chain):
+            for model in models:
+                if stats.healthy(model, tier):
+                    healthy.append((rank, self.policy.models[model].cost, tier, model))
+                else:
+                    degraded.append((tier, model))
+        # A fallback tier only goes first once every model of the tiers before it is unhealthy.
+        healthy.sort(key=lambda entry: entry[:2])
+        return [(tier, model) for _, _, tier, model in healthy] + degraded
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        order = self.order()
+        hedge = self.tier.hedge and not available_functions and not self.stream
+        with tracer.span("route", self.tier.name, order=[m for _, m in order]) as span:
+            attempt = functools.partial(self._attempt, messages, tools, callbacks, available_functions, **kwargs)
+            if hedge:
+                try:
+                    response, model = self._hedged(attempt, order, span)
+                except _PoolClosed:
+                    logger.info("Hedge pool is shut down, calling %s without hedging", self.tier.name)
+                    response, model = self._failover(attempt, order, span)
+            else:
+                response, model = self._failover(attempt, order, span)
+            span.attrs["model"] = model
+            return response
+
+    def _attempt(self, messages, tools, callbacks, available_functions, model: str, **kwargs):
+        llm = self._llms[model]
+        # crewai sets the agent's stop words and sampling on this LLM, not on the routed ones.
+        llm.stop, llm.temperature = self.stop, self.temperature
+        return llm.call(messages, tools, callbacks, available_functions, **kwargs)
+
+    def _failover(self, attempt, order, span):
+        errors = []
+        for _, model in order:
+            try:
+                return attempt(model=model), model
+            except (LLMContextLengthExceededException, LLMCacheMiss):
+                raise
+            except Exception as e:
+                errors.append(f"{model}: {type(e).__name__}: {e}")
+                logger.warning("LLM %s failed, failing over: %s", model, e)
+        span.attrs["errors"] = errors
+        raise LLMRoutingError(f"All models of tier {self.tier.name} failed:\n" + "\n".join(errors))
+
+    def _hedged(self, attempt, order, span):
+        errors, pending = [], {}
+        queue = iter(order)
+
+        def launch() -> bool:
+            tier_model = next(queue, None)
+            if tier_model is None:
+                return False
+            # A copied context keeps the LLM spans below this task's span.
+            try:
+                future = _hedge_pool().submit(contextvars.copy_context().run, attempt, model=tier_model[1])
+            except RuntimeError:
+                raise _PoolClosed from None
+            pending[future] = tier_model
+            return True
+
+        launch()
+        while pending:
+            budget = min(tier.latency_budget for tier, _ in pending.values())
+            done, _ = wait(pending, timeout=budget, return_when=FIRST_COMPLETED)
+            if not done:
+                if launch():
+                    span.attrs["hedged"] = span.attrs.get("hedged", 0) + 1
+                    logger.info("LLM call exceeded %ss, hedging with %s", budget, list(pending.values())[-1][1])
+                continue
+            for future in done:
+                _, model = pending.pop(future)
+                if future.cancelled():
+                    raise _PoolClosed
+                try:
+                    # Slower duplicates keep running; their answers only feed the statistics.
+                    return future.result(), model
+                except (LLMContextLengthExceededException, LLMCacheMiss):
+                    raise
+                except Exception as e:
+                    errors.append(f"{model}: {type(e).__name__}: {e}")
+                    logger.warning("LLM %s failed, failing over: %s", model, e)
+            if not pending:
+                launch()
+        span.attrs["errors"] = errors
+        raise LLMRoutingError(f"All models of tier {self.tier.name} failed:\n" + "\n".join(errors))
+
+
+class ModelRouter:
+    """Builds the LLM of every agent according to a RoutingPolicy."""
+
+    def __init__(self, policy: RoutingPolicy):
+        self.policy = policy
+
+    def tier(self, role: str) -> Tier | None:
+        name = self.policy.agents.get(role.strip(), self.policy.default_tier)
+        return self.policy.tiers.get(name) if name else None
+
+    def llm(self, role: str, **kwargs) -> LLM:
+        """The routed LLM of the agent with `role`; LLM_MODEL if the policy has no tier for it."""
+        tier = self.tier(role)
+        if tier is None:
+            return build_llm(LLM_MODEL, **kwargs)
+        return RoutedLLM(self.policy, tier, **kwargs)
+
+    def report(self) -> str:
+        """Rolling statistics of every model in the policy."""
+        lines = []
+        for model in self.policy.models:
+            s = stats.summary(model)
+            if s["samples"]:
+                p50 = f"{s['p50']:.1f}s" if s["p50"] is not None else "-"
+                p95 = f"{s['p95']:.1f}s" if s["p95"] is not None else "-"
+                lines.append(f"{model}: {s['samples']} calls, p50 {p50}, p95 {p95}, errors {s['error_rate']:.0%}")
+        return "\n".join(lines)
+
+
+@functools.cache
+def get_router() -> ModelRouter | None:
+    """The router of LLM_ROUTING_POLICY, loaded once per process; None without a policy."""
+    if not LLM_ROUTING_POLICY:
+        return None
+    return ModelRouter(RoutingPolicy.load(LLM_ROUTING_POLICY))
@@ -0,0 +1,112 @@
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+
+class TaskGraphError(ValueError):
+    """Raised when the tasks' context dependencies contain a cycle or are violated."""
+
+
+def _dependencies(task: Task, task_ids: set[int]) -> list[Task]:
+    # Tasks without an explicit context list are roots; context tasks outside
+    # the scheduled tasks (e.g. restored from a checkpoint) count as satisfied.
+    context = task.context if isinstance(task.context, list) else []
+    return [t for t in context if id(t) in task_ids]
+
+
+def task_layers(tasks: list[Task]) -> list[list[Task]]:
+    """
+    Groups tasks into layers from their `context` dependencies: every task only
+    depends on tasks in earlier layers, so the tasks of one layer are independent.
+    Within a layer the declared order is kept.
+    """
+    task_ids = {id(t) for t in tasks}
+    done: set[int] = set()
+    remaining = list(tasks)
+    layers = []
+    while remaining:
+        layer = [
+            task
+            for task in remaining
+            if all(id(dep) in done for dep in _dependencies(task, task_ids))
+        ]
+        if not layer:
+            names = ", ".join(t.name or t.description[:40] for t in remaining)
+            raise TaskGraphError(f"Task context dependencies contain a cycle: {names}")
+        layers.append(layer)
+        done.update(id(t) for t in layer)
+        remaining = [t for t in remaining if id(t) not in done]
+    return layers
+
+
+class JoinTask(Task):
+    """
+    A synchronous task that waits for the async tasks in its context and passes
+    their outputs on, without asking the agent. Crews need it where crewai has
+    no other synchronous task to join on.
+    """
+
+    def _execute_core(self, agent, context, tools) -> TaskOutput:
+        output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=context or "",
+            agent=(agent or self.agent).role,
+        )
+        self.output = output
+        if self.callback:
+            self.callback(output)
+        return output
+
+
+def _join(layer: list[Task]) -> JoinTask:
+    names = ", ".join(t.name or t.description[:40] for t in layer)
+    return JoinTask(
+        name="join_" + "_".join(t.name or str(i) for i, t in enumerate(layer)),
+        description=f"Wait for: {names}",
+        expected_output="The outputs of the joined tasks.",
+        agent=layer[-1].agent,
+        context=list(layer),
+    )
+
+
+def schedule_tasks(tasks: list[Task]) -> list[Task]:
+    """
+    Orders tasks for Process.sequential from their dependency graph and marks
+    independent tasks for concurrent execution.
+    crewai starts consecutive async tasks together and waits for all of them
+    before it runs the next synchronous task. So every task of a layer with
+    several tasks becomes async and the first task of the next layer, which is
+    synchronous, is the barrier. Where the next layer is async as well, or the
+    crew would end with several async tasks, a JoinTask is the barrier.
+    Join tasks from an earlier schedule are dropped and placed again.
+    """
+    tasks = [t for t in tasks if not isinstance(t, JoinTask)]
+    check_order(tasks)
+    layers = task_layers(tasks)
+    ordered = []
+    for i, layer in enumerate(layers):
+        concurrent = len(layer) > 1
+        for task in layer:
+            task.async_execution = concurrent
+        ordered.extend(layer)
+        last = i == len(layers) - 1
+        if concurrent and (last or len(layers[i + 1]) > 1):
+            ordered.append(_join(layer))
+    return ordered
+
+
+def check_order(tasks: list[Task]) -> None:
+    """
+    Rejects a task list in which a task is declared before one of its context
+    tasks, like crewai does for Process.sequential.
+    """
+    task_ids = {id(t) for t in tasks}
+    seen: set[int] = set()
+    for task in tasks:
+        for dep in _dependencies(task, task_ids):
+            if id(dep) not in seen:
+                raise TaskGraphError(
+                    f"Task '{task.name}' is declared before its context task '{dep.name}'"
+                )
+        seen.add(id(task))
@@ -0,0 +1,329 @@
+import hashlib
+import hmac
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from batch import share_rate_limits
+from crew.checkpoint import OSA_RUNS_DIR
+from crew.job_queue import JOB_LEASE_SECONDS, Job, JobQueue, worker_id
+from tools.env import load_env
+
+load_env()
+DAEMON_WORKERS = int(os.getenv("DAEMON_WORKERS", "2"))
+DAEMON_POLL_SECONDS = float(os.getenv("DAEMON_POLL_SECONDS", "300"))
+# Open issues with this label get a crew run; empty processes every open issue.
+DAEMON_ISSUE_LABEL = os.getenv("DAEMON_ISSUE_LABEL", "automated")
+DAEMON_SYNC_NOTION = os.getenv("DAEMON_SYNC_NOTION", "true").lower() == "true"
+# Checked against X-Hub-Signature-256 on every webhook request. The webhook
+# refuses to start without one unless DAEMON_WEBHOOK_INSECURE=true.
+DAEMON_WEBHOOK_SECRET = os.getenv("DAEMON_WEBHOOK_SECRET", "")
+DAEMON_WEBHOOK_INSECURE = os.getenv("DAEMON_WEBHOOK_INSECURE", "false").lower() == "true"
+# Interface the webhook listens on; 0.0.0.0 exposes it to the network.
+DAEMON_WEBHOOK_HOST = os.getenv("DAEMON_WEBHOOK_HOST", "127.0.0.1")
+
+JOB_KINDS = ("issue", "sync_notion")
+# Written into the job directory by the worker process, so the daemon can kill it.
+WORKER_PID_FILE = "worker.pid"
+
+logger = logging.getLogger(__name__)
+
+
+def warm_worker() -> None:
+    """Runs once in every pool process, so jobs find crewai and the clients loaded."""
+    from crew import instrumentation
+    from crew.dev_crew import DeveloperCrew  # noqa: F401
+    from tools import async_http  # noqa: F401
+
+    # Ctrl-C reaches the whole process group; the daemon decides when jobs stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    instrumentation.install()
+
+
+def run_job(kind: str, payload: dict, job_dir: str) -> dict:
+    """Runs one job inside a pool process and returns its summary."""
+    if kind == "issue":
+        from batch import run_issue
+        from tools.async_http import run_sync
+        from tools.github_client import GH_REPO_NAME
+        from tools.issue_store import IssueStore
+
+        store = IssueStore(GH_REPO_NAME)
+        run_sync(store.async_sync())
+        issue = store.get(payload["number"])
+        if issue is None:
+            return {"status": "failed", "error": f"Issue #{payload['number']} not found"}
+        if issue.state != "open":
+            return {"status": "success", "result": f"Issue #{issue.number} is {issue.state}"}
+        return run_issue(asdict(issue), job_dir)
+    if kind == "sync_notion":
+        from tools.notion_issue_sync import NotionIssueSync
+
+        result = NotionIssueSync().run(full=payload.get("full", False))
+        if result.failed:
+            return {"status": "failed", "error": str(result)}
+        return {"status": "success", "result": str(result)}
+    return {"status": "failed", "error": f"Unknown job kind {kind!r}"}
+
+
+def _run_in_worker(kind: str, payload: dict, job_dir: str) -> dict:
+    pid_file = Path(job_dir, WORKER_PID_FILE)
+    pid_file.parent.mkdir(parents=True, exist_ok=True)
+    pid_file.write_text(str(os.getpid()))
+    return run_job(kind, payload, job_dir)
+
+
+class Daemon:
+    """
+    Resident crew service. Jobs come from a persistent JobQueue, fed by a
+    poller and an optional webhook endpoint, and run in a pool of long-lived
+    worker processes that keep crewai, the API clients and the caches loaded
+    between jobs.
+    While a job runs, the daemon renews its lease. If the daemon dies, the
+    leases run out (or recover() releases them on restart) and the jobs run
+    again in the same job directory, resuming from the checkpoints of the
+    tasks that already completed instead of repeating them. A job whose lease
+    was taken over anyway is aborted, so that two copies never write at once.
+    """
+
+    def __init__(
+        self,
+        workers: int = DAEMON_WORKERS,
+        poll_seconds: float = DAEMON_POLL_SECONDS,
+        port: int | None = None,
+        label: str | None = DAEMON_ISSUE_LABEL,
+        queue: JobQueue | None = None,
+        host: str = DAEMON_WEBHOOK_HOST,
+        secret: str = DAEMON_WEBHOOK_SECRET,
+    ):
+        if port is not None and not secret and not DAEMON_WEBHOOK_INSECURE:
+            raise ValueError(
+                "The webhook needs DAEMON_WEBHOOK_SECRET; "
+                "set DAEMON_WEBHOOK_INSECURE=true to accept unsigned requests"
+            )
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.port = port
+        self.host = host
+        self.secret = secret
+        self.label = label or None
+        self.queue = queue or JobQueue()
+        self.owner = worker_id()
+        self.jobs_dir = (OSA_RUNS_DIR / "daemon").resolve()
+        self.stopping = threading.Event()
+        self.server: ThreadingHTTPServer | None = None
+
+    def submit(self, kind: str, payload: dict, key: str | None = None) -> tuple[Job, bool]:
+        """Enqueues a job; the key defaults to one derived from kind and payload."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}, expected one of {JOB_KINDS}")
+        if key is None:
+            key = f"issue:{payload['number']}" if kind == "issue" else f"{kind}:{json.dumps(payload, sort_keys=True)}"
+        job, created = self.queue.enqueue(kind, payload, key)
+        if created:
+            logger.info("Queued job %s (%s)", job.id, key)
+        return job, created
+
+    def poll(self) -> None:
+        """Syncs Notion ideas into issues and queues a job for every matching open issue."""
+        from tools.async_http import run_sync
+        from tools.github_client import GH_REPO_NAME
+        from tools.issue_store import IssueStore
+
+        if DAEMON_SYNC_NOTION:
+            from tools.notion_issue_sync import NotionIssueSync
+
+            logger.info("%s", NotionIssueSync().run())
+        store = IssueStore(GH_REPO_NAME)
+        run_sync(store.async_sync())
+        for issue in store.query(label=self.label):
+            self.submit("issue", {"number": issue.number})
+
+    def _poll_loop(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling failed")
+            self.stopping.wait(self.poll_seconds)
+
+    def run(self) -> None:
+        """Processes jobs until SIGTERM or SIGINT, then finishes the running ones."""
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: self.stop())
+        recovered = self.queue.recover()
+        if recovered:
+            logger.info("Recovered %s jobs of a previous daemon", recovered)
+        if self.poll_seconds > 0:
+            threading.Thread(target=self._poll_loop, name="daemon-poll", daemon=True).start()
+        if self.port is not None:
+            self.server = ThreadingHTTPServer((self.host, self.port), _webhook_handler(self))
+            threading.Thread(target=self.server.serve_forever, name="daemon-webhook", daemon=True).start()
+            logger.info("Webhook listening on %s:%s", *self.server.server_address[:2])
+
+        share_rate_limits(self.workers)
+        pool = self._pool()
+        running: dict[Future, Job] = {}
+        aborted: set[int] = set()
+        tick = min(5.0, JOB_LEASE_SECONDS / 3)
+        try:
+            while running or not self.stopping.is_set():
+                while not self.stopping.is_set() and len(running) < self.workers:
+                    job = self.queue.claim(self.owner)
+                    if job is None:
+                        break
+                    logger.info("Starting job %s (%s, attempt %s)", job.id, job.key, job.attempts)
+                    job_dir = self.jobs_dir / f"job-{job.id}"
+                    (job_dir / WORKER_PID_FILE).unlink(missing_ok=True)
+                    running[pool.submit(_run_in_worker, job.kind, job.payload, str(job_dir))] = job
+                if not running:
+                    self.stopping.wait(tick)
+                    continue
+                done, _ = wait(running, timeout=tick, return_when=FIRST_COMPLETED)
+                restarted = any(isinstance(f.exception(), BrokenProcessPool) for f in done)
+                if restarted:
+                    # A crashed or killed worker takes the whole pool and all its jobs down with it.
+                    if aborted:
+                        logger.warning("Restarting the pool after aborting jobs %s", sorted(aborted))
+                    else:
+                        logger.error("A worker process died, restarting the pool")
+                    done = set(running)
+                    wait(done)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self._pool()
+                for future in done:
+                    job = running.pop(future)
+                    if job.id in aborted:
+                        continue  # the job belongs to whoever took the lease
+                    if aborted and restarted:
+                        # Killed along with an aborted job; runs again from its checkpoints.
+                        self.queue.release(job, self.owner)
+                    else:
+                        self._finish(job, future)
+                if restarted:
+                    aborted.clear()
+                for future, job in list(running.items()):
+                    if job.id not in aborted and not self.queue.renew(job, self.owner):
+                        if future.cancel():
+                            logger.warning("Lost the lease of job %s before it started", job.id)
+                            del running[future]
+                        elif self._kill(job):
+                            aborted.add(job.id)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            if self.server is not None:
+                self.server.shutdown()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # spawn gives every worker a fresh interpreter instead of a fork of this one's threads.
+        return ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=warm_worker
+        )
+
+    def _kill(self, job: Job) -> bool:
+        """Kills the worker running a job that lost its lease; False if it has not started yet."""
+        try:
+            pid = int((self.jobs_dir / f"job-{job.id}" / WORKER_PID_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return False
+        logger.warning("Lost the lease of job %s, killing its worker %s", job.id, pid)
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        return True
+
+    def _finish(self, job: Job, future: Future) -> None:
+        error = future.exception()
+        summary = {"status": "failed", "error": f"{type(error).__name__}: {error}"} if error else future.result()
+        if summary.get("status") == "success":
+            self.queue.complete(job, self.owner, json.dumps(summary, default=str))
+            logger.info("Job %s done", job.id)
+        else:
+            self.queue.fail(job, self.owner, summary.get("error", ""))
+            logger.warning("Job %s failed: %s", job.id, summary.get("error"))
+
+    def stop(self) -> None:
+        if not self.stopping.is_set():
+            logger.info("Stopping after the running jobs")
+        self.stopping.set()
+
+
+def verify_signature(body: bytes, signature: str | None, secret: str = DAEMON_WEBHOOK_SECRET) -> bool:
+    """
+    Checks GitHub's X-Hub-Signature-256 header. Everything passes without a
+    secret, which the Daemon only allows with DAEMON_WEBHOOK_INSECURE=true.
+    """
+    if not secret:
+        return True
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def _webhook_handler(daemon: Daemon) -> type[BaseHTTPRequestHandler]:
+    """
+    POST /github takes GitHub 'issues' webhooks, POST /jobs takes
+    {"kind", "payload", "key"} directly, GET /health returns the job counts.
+    An issue gets one job, however often it is opened or labelled; to run it
+    again, post it to /jobs with a new key.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/health":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, {"jobs": daemon.queue.counts(), "stopping": daemon.stopping.is_set()})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length < 0:
+                    raise ValueError(f"Invalid Content-Length {length}")
+                body = self.rfile.read(length)
+                if not verify_signature(body, self.headers.get("X-Hub-Signature-256"), daemon.secret):
+                    return self._reply(401, {"error": "bad signature"})
+                data = json.loads(body or b"{}")
+                if self.path == "/github":
+                    return self._github(self.headers.get("X-GitHub-Event"), data)
+                if self.path == "/jobs":
+                    job, created = daemon.submit(data["kind"], data.get("payload", {}), data.get("key"))
+                    return self._reply(202, {"job": job.id, "state": job.state, "created": created})
+            except (ValueError, KeyError, TypeError) as e:
+                return self._reply(400, {"error": str(e)})
+            self._reply(404, {"error": "not found"})
+
+        def _github(self, event: str | None, data: dict):
+            if event == "ping":
+                return self._reply(200, {"ok": True})
+            issue = data.get("issue") or {}
+            labels = [l["name"].lower() for l in issue.get("labels", [])]
+            if (
+                event != "issues"
+                or data.get("action") not in ("opened", "labeled")
+                or "pull_request" in issue
+                or (daemon.label and daemon.label.lower() not in labels)
+            ):
+                return self._reply(200, {"ignored": True})
+            job, created = daemon.submit("issue", {"number": issue["number"]})
+            self._reply(202, {"job": job.id, "state": job.state, "created": created})
+
+        def _reply(self, status: int, data: dict):
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return Handler
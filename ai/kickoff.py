@@ -1,24 +1,138 @@
+import argparse
+import contextlib
+import logging
+import sys
+from typing import TextIO
+
+from crew import instrumentation, progress, routing
+from crew.checkpoint import RunCheckpoint
 from crew.dev_crew import DeveloperCrew
-from dotenv import load_dotenv
+from tools.env import load_env
+from tools.issue_store import priority_rank
+from tools.tracing import tracer
 
 
-def kickoff():
+def kickoff(run_id: str | None = None, resume: bool = False, stream: TextIO | None = None):
     """
     Initializes the software crew and processes new ideas from Notion.
+    Every task output is checkpointed to the run directory; with resume=True
+    tasks that already completed in that run are skipped.
+    Spans of all tasks, agent runs, LLM and tool calls are appended to
+    trace.jsonl in the run directory and summarized at the end.
+    With `stream`, progress events (see crew.progress) are written to it as
+    JSON lines while the crew runs; if it is stdout, everything else that is
+    printed goes to stderr instead.
     Returns the result of the crew's kickoff.
     """
-    try:
-        crew = DeveloperCrew()
-        result = crew.crew().kickoff()
-        print("Crew result:", result)
-    except Exception as e:
-        import traceback
-
-        print("Crew kickoff failed:", e)
-        traceback.print_exc()
-        result = None
+    instrumentation.install()
+    with contextlib.ExitStack() as stack:
+        if stream is not None:
+            stack.enter_context(progress.streaming(stream))
+            if stream is sys.stdout:
+                stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        checkpoint = RunCheckpoint.open(run_id, resume)
+        print("Run directory:", checkpoint.run_dir)
+        progress.emit("run_started", run_dir=str(checkpoint.run_dir))
+        try:
+            crew = DeveloperCrew(stream=stream is not None)
+            # Part of the requirements task's fingerprint, so a resumed run reuses the first run's.
+            context = checkpoint.remember("retrieval_context", crew.build_retrieval_context, resume)
+            crew.add_retrieval_context(context)
+            pending = checkpoint.attach(crew.tasks, resume)
+            if pending:
+                result = crew.crew(pending).kickoff()
+            else:
+                result = crew.tasks[-1].output
+            print("Crew result:", result)
+            progress.emit("run_completed", status="success")
+        except Exception as e:
+            import traceback
+
+            print("Crew kickoff failed:", e)
+            traceback.print_exc()
+            progress.emit("run_completed", status="failed", error=f"{type(e).__name__}: {e}")
+            result = None
+        finally:
+            routing.shutdown()
+            tracer.export_jsonl(checkpoint.run_dir / "trace.jsonl")
+            print(tracer.summary())
     return result
 
+
 if __name__ == "__main__":
-    load_dotenv()
-    kickoff()
\ No newline at end of file
+    load_env()
+    logging.basicConfig(format="%(name)s: %(message)s")
+    logging.getLogger("tools").setLevel(logging.INFO)
+    logging.getLogger("crew").setLevel(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Run the developer crew.")
+    parser.add_argument("--run-id", help="Name of the run directory to write checkpoints to")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip tasks with valid checkpoints in --run-id (or the latest run)",
+    )
+    parser.add_argument(
+        "--batch", type=int, metavar="N", help="Run one isolated crew for each of the N most urgent issues"
+    )
+    parser.add_argument("--workers", type=int, help="Crews to run in parallel in batch or daemon mode")
+    parser.add_argument("--priority", help="Batch mode: only issues with at least this priority")
+    parser.add_argument("--label", help="Batch or daemon mode: only issues with this label")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and process queued jobs, fed by polling and --port, until stopped",
+    )
+    parser.add_argument("--port", type=int, help="Daemon mode: serve the webhook endpoint on this port")
+    parser.add_argument(
+        "--poll", type=float, metavar="SECONDS", help="Daemon mode: seconds between polls, 0 disables polling"
+    )
+    parser.add_argument(
+        "--sync-notion",
+        action="store_true",
+        help="Create or update one GitHub issue per new Notion idea instead of running the crew",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="--sync-notion: check every idea, not only edited ones"
+    )
+    parser.add_argument(
+        "--stream",
+        nargs="?",
+        const="-",
+        metavar="PATH",
+        help="Write progress events as JSON lines to PATH, or to stdout without PATH",
+    )
+    args = parser.parse_args()
+    if args.sync_notion:
+        from tools.notion_issue_sync import NotionIssueSync
+
+        print(NotionIssueSync().run(full=args.full))
+    elif args.daemon:
+        from daemon import DAEMON_ISSUE_LABEL, DAEMON_POLL_SECONDS, DAEMON_WORKERS, Daemon
+
+        try:
+            daemon = Daemon(
+                workers=args.workers or DAEMON_WORKERS,
+                poll_seconds=DAEMON_POLL_SECONDS if args.poll is None else args.poll,
+                port=args.port,
+                label=args.label or DAEMON_ISSUE_LABEL,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        daemon.run()
+    elif args.batch:
+        from batch import run_batch
+
+        run_batch(
+            args.batch,
+            workers=args.workers,
+            max_priority=priority_rank(args.priority) if args.priority else None,
+            label=args.label,
+            batch_id=args.run_id,
+        )
+    elif args.stream:
+        with contextlib.ExitStack() as stack:
+            out = sys.stdout if args.stream == "-" else stack.enter_context(open(args.stream, "a"))
+            kickoff(run_id=args.run_id, resume=args.resume, stream=out)
+    else:
+        kickoff(run_id=args.run_id, resume=args.resume)
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+AI_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(AI_DIR))
+
+# Settings are read at import time, so the scratch cache has to be set before tools are imported.
+os.environ["OSA_CACHE_DIR"] = tempfile.mkdtemp(prefix="osa-tests-")
+os.environ.setdefault("GH_REPO_NAME", "bench/osa")
+os.environ.setdefault("LLM_CACHE_MODE", "off")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+
+@pytest.fixture
+def services():
+    from bench.fake_api import FakeConfig, FakeServices
+
+    with FakeServices(FakeConfig(latency_ms=0, llm_latency_ms=0, files=20, issues=10, ideas=5)) as services:
+        yield services
+
+
+@pytest.fixture
+def github(services, monkeypatch, tmp_path):
+    """Points the shared GitHub client at the fake API with empty head and tree caches."""
+    import httpx
+    from tools import github_client, repo_tree_index
+
+    clients: dict = {}
+
+    def client() -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = httpx.AsyncClient(base_url=services.url("github"))
+        return clients[loop]
+
+    monkeypatch.setattr("tools.async_http.github_async_client", client)
+    monkeypatch.setattr(repo_tree_index, "_indexes", {})
+    monkeypatch.setattr(repo_tree_index, "_heads", {})
+    monkeypatch.setattr(repo_tree_index, "_index_path", lambda full_name, sha: tmp_path / f"{sha}.json")
+    github_client.stats.reset()
+    yield services
+    github_client.stats.reset()
@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+
+import batch
+import pytest
+from crew import dev_crew
+from tools import sandbox_pool
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def runs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "OSA_RUNS_DIR", tmp_path)
+    return tmp_path
+
+
+def test_new_batches_get_their_own_directory(runs_dir):
+    first, second = batch.create_batch_dir(), batch.create_batch_dir()
+    assert first != second
+    assert first.parent == second.parent == runs_dir
+
+
+def test_a_given_batch_id_is_resumed(runs_dir):
+    first = batch.create_batch_dir("nightly")
+    (first / "issue-1").mkdir()
+    assert batch.create_batch_dir("nightly") == first
+    assert (first / "issue-1").exists()
+
+
+def test_issue_workers_keep_the_project_environment(runs_dir, monkeypatch):
+    monkeypatch.chdir(REPO_ROOT / "ai")
+    monkeypatch.setattr(sandbox_pool, "_project", None)
+    monkeypatch.setattr(sandbox_pool, "SANDBOX_PROJECT_DIR", None)
+    seen = {}
+
+    class RecordingCrew:
+        def __init__(self, issue, branch_prefix):
+            seen.update(cwd=Path(os.getcwd()), project=sandbox_pool.resolve_project(), prefix=branch_prefix)
+            raise RuntimeError("stop before the crew runs")
+
+    monkeypatch.setattr(dev_crew, "DeveloperCrew", RecordingCrew)
+    summary = batch.run_issue({"number": 7, "title": "Seven"}, str(runs_dir / "batch-x"))
+
+    assert summary["status"] == "failed"
+    assert seen["cwd"] == (runs_dir / "batch-x" / "issue-7" / "workspace").resolve()
+    # The workspace has no lockfile; the sandbox still builds the repository's environment.
+    assert seen["project"] == REPO_ROOT
+    assert seen["prefix"] == "crew/batch-x/issue-7-"
@@ -0,0 +1,69 @@
+import argparse
+import json
+
+import pytest
+from bench.run import add_baseline_arguments, check_baseline
+
+RESULTS = {
+    "case": {
+        "cold_ms": 100.0,
+        "warm_p50_ms": 10.0,
+        "warm_p95_ms": 12.0,
+        "warm_ratio": 0.1,
+        "peak_kib": 50.0,
+        "cold_requests": 3,
+        "warm_requests": 4,
+    }
+}
+
+
+@pytest.fixture
+def bench_args(tmp_path):
+    def parse(*argv: str) -> argparse.Namespace:
+        parser = argparse.ArgumentParser()
+        add_baseline_arguments(parser, "default")
+        return parser.parse_args(
+            ["--baseline", str(tmp_path / "baselines.json"), "--local-baseline", str(tmp_path / "local.json"), *argv]
+        )
+
+    return parse
+
+
+def changed(**metrics) -> dict:
+    return {"case": {**RESULTS["case"], **metrics}}
+
+
+def test_only_machine_independent_numbers_are_committed(bench_args, tmp_path):
+    assert check_baseline(bench_args("--save-baseline"), {"files": 5}, RESULTS) == 0
+    committed = json.loads((tmp_path / "baselines.json").read_text())["default"]
+    local = json.loads((tmp_path / "local.json").read_text())["default"]
+    assert committed["results"] == {"case": {"warm_ratio": 0.1, "cold_requests": 3, "warm_requests": 4}}
+    assert set(local["results"]["case"]) == {"cold_ms", "warm_p50_ms", "warm_p95_ms", "peak_kib"}
+
+
+def test_timings_are_skipped_without_a_local_baseline(bench_args, tmp_path, capsys):
+    check_baseline(bench_args("--save-baseline"), {}, RESULTS)
+    (tmp_path / "local.json").unlink()
+    assert check_baseline(bench_args(), {}, changed(cold_ms=900.0, warm_p50_ms=90.0, warm_ratio=0.1)) == 0
+    assert "Timings not compared" in capsys.readouterr().out
+    assert check_baseline(bench_args(), {}, changed(warm_ratio=0.5)) == 1
+
+
+def test_request_counts_are_exact(bench_args, capsys):
+    check_baseline(bench_args("--save-baseline"), {}, RESULTS)
+    assert check_baseline(bench_args(), {}, changed(warm_requests=5)) == 1
+    assert "REGRESSION case: warm_requests 4 -> 5" in capsys.readouterr().out
+    assert check_baseline(bench_args(), {}, changed(cold_requests=2)) == 0
+    assert "IMPROVED case: cold_requests 3 -> 2" in capsys.readouterr().out
+
+
+def test_local_timings_regress_beyond_the_tolerance(bench_args):
+    check_baseline(bench_args("--save-baseline"), {}, RESULTS)
+    assert check_baseline(bench_args(), {}, changed(cold_ms=120.0)) == 0
+    assert check_baseline(bench_args(), {}, changed(cold_ms=140.0)) == 1
+
+
+def test_missing_or_different_baselines(bench_args):
+    assert check_baseline(bench_args(), {}, RESULTS) == 3
+    check_baseline(bench_args("--save-baseline"), {"files": 5}, RESULTS)
+    assert check_baseline(bench_args(), {"files": 6}, RESULTS) == 2
@@ -0,0 +1,45 @@
+from crew.checkpoint import RunCheckpoint
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+
+def tasks(spec: str = "Write the spec") -> list[Task]:
+    spec_task = Task(name="spec", description=spec, expected_output="A spec")
+    code = Task(name="code", description="Implement it", expected_output="Code", context=[spec_task])
+    return [spec_task, code]
+
+
+def complete(pending: list[Task]) -> None:
+    """Stands in for the crew: every task finishes and reports to its callback."""
+    for task in pending:
+        output = TaskOutput(description=task.description, agent="dev", raw=f"{task.name} done")
+        task.output = output
+        task.callback(output)
+
+
+def test_resumed_runs_skip_completed_tasks(tmp_path):
+    first = tasks()
+    complete(RunCheckpoint(tmp_path).attach(first))
+
+    resumed = tasks()
+    assert RunCheckpoint(tmp_path).attach(resumed, resume=True) == []
+    assert [task.output.raw for task in resumed] == ["spec done", "code done"]
+
+
+def test_changed_tasks_rerun_with_everything_that_depends_on_them(tmp_path):
+    complete(RunCheckpoint(tmp_path).attach(tasks()))
+
+    pending = RunCheckpoint(tmp_path).attach(tasks("Write a shorter spec"), resume=True)
+    assert [task.name for task in pending] == ["spec", "code"]
+
+
+def test_without_resume_every_task_runs_again(tmp_path):
+    complete(RunCheckpoint(tmp_path).attach(tasks()))
+    assert len(RunCheckpoint(tmp_path).attach(tasks())) == 2
+
+
+def test_run_inputs_are_computed_once(tmp_path):
+    checkpoint = RunCheckpoint(tmp_path)
+    assert checkpoint.remember("context", lambda: "first") == "first"
+    assert checkpoint.remember("context", lambda: "second", resume=True) == "first"
+    assert checkpoint.remember("context", lambda: "third") == "third"
@@ -0,0 +1,87 @@
+import http.client
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import daemon
+import pytest
+from crew.job_queue import JobQueue
+from daemon import Daemon
+
+
+@pytest.fixture
+def queue(request):
+    return JobQueue(request.node.name)
+
+
+def slow_job(kind: str, payload: dict, job_dir: str) -> dict:
+    time.sleep(payload["seconds"])
+    Path(job_dir, "finished").touch()
+    return {"status": "success"}
+
+
+def default_signals() -> None:
+    # Forked workers would inherit the daemon's SIGTERM handler and survive the pool's terminate().
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def test_a_bad_content_length_is_a_bad_request(queue):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), daemon._webhook_handler(Daemon(queue=queue, secret="s")))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for length in ("many", "-1"):
+            connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+            connection.putrequest("POST", "/jobs")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+            assert connection.getresponse().status == 400
+            connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_jobs_that_lose_their_lease_are_aborted(queue, tmp_path, monkeypatch):
+    # Forked workers inherit the patched job function.
+    monkeypatch.setattr(daemon, "run_job", slow_job)
+    monkeypatch.setattr(daemon, "JOB_LEASE_SECONDS", 0.3)
+    service = Daemon(workers=2, poll_seconds=0, queue=queue)
+    service.jobs_dir = tmp_path
+    monkeypatch.setattr(
+        service,
+        "_pool",
+        lambda: ProcessPoolExecutor(
+            2, mp_context=multiprocessing.get_context("fork"), initializer=default_signals
+        ),
+    )
+    monkeypatch.setattr(daemon, "share_rate_limits", lambda workers: None)
+    lost, _ = queue.enqueue("issue", {"seconds": 30}, "lost")
+    other, _ = queue.enqueue("issue", {"seconds": 30}, "other")
+    renew = queue.renew
+
+    def renew_until_taken_over(job, owner, *args):
+        if job.id != lost.id:
+            return renew(job, owner, *args)
+        if not (tmp_path / f"job-{job.id}" / daemon.WORKER_PID_FILE).exists():
+            return True
+        service.stop()
+        return False
+
+    monkeypatch.setattr(queue, "renew", renew_until_taken_over)
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+    started = time.monotonic()
+    try:
+        service.run()
+    finally:
+        for sig, handler in handlers.items():
+            signal.signal(sig, handler)
+
+    assert time.monotonic() - started < 20
+    assert not (tmp_path / f"job-{lost.id}" / "finished").exists()
+    # The job running next to it is handed back without using up an attempt.
+    assert queue.get("other").state == "queued"
+    assert queue.get("other").attempts == 0
@@ -0,0 +1,31 @@
+from tools import github_client
+from tools.github_client import github_call
+from tools.github_list_files_tool import GithubListFilesTool
+
+
+def test_tool_calls_report_sent_and_saved_requests(github, caplog):
+    tool = GithubListFilesTool()
+    with caplog.at_level("INFO", logger="tools.github_client"):
+        first = tool._run(recursive=True)
+        sent = github.requests["github"]
+        second = tool._run(recursive=True)
+
+    assert first == second
+    assert github.requests["github"] == sent  # head and tree both came from the caches
+    stats = github_client.stats
+    assert (stats.calls, stats.requests) == (2, sent)
+    assert stats.requests + stats.saved_requests == 4
+    assert caplog.messages[-1] == (
+        f"GithubListFilesTool: 0 GitHub request(s), saved 2 ({stats.saved_requests} saved in total over 2 calls)"
+    )
+
+
+def test_calls_count_their_own_requests(github):
+    with github_call("outer") as outer:
+        github_client.record(requests=2)
+        with github_call("inner") as inner:
+            github_client.record(saved_requests=1)
+        github_client.record(requests=1)
+    assert (outer.requests, outer.saved_requests) == (3, 0)
+    assert (inner.requests, inner.saved_requests) == (0, 1)
+    assert (github_client.stats.calls, github_client.stats.requests) == (2, 3)
@@ -0,0 +1,42 @@
+from tools.github_commit_code_tool import GithubCommitCodeTool
+
+
+def files_at(fake, ref: str = "heads/main") -> dict[str, str]:
+    tree = fake.trees[fake.commits[fake.refs[ref]]["tree"]]
+    return {path: fake.blobs[blob] for path, blob in tree.items()}
+
+
+def test_batches_become_one_commit(github):
+    fake = github.github
+    head, before = fake.refs["heads/main"], files_at(fake)
+    existing = next(iter(before))
+
+    result = GithubCommitCodeTool()._run(
+        "main",
+        commit_msg="Add a feature",
+        files=[
+            {"path": "src/feature.py", "content": "FEATURE = 1\n"},
+            {"path": "/docs/feature.md", "content": "# Feature\n"},
+            {"path": existing, "content": before[existing]},
+        ],
+    )
+
+    assert result.startswith("Committed 2 files to branch main")
+    assert "1 unchanged files skipped" in result
+    commit = fake.commits[fake.refs["heads/main"]]
+    assert (commit["message"], commit["parents"]) == ("Add a feature", [head])
+    assert files_at(fake) == {**before, "src/feature.py": "FEATURE = 1\n", "docs/feature.md": "# Feature\n"}
+
+
+def test_unchanged_batches_do_not_commit(github):
+    fake = github.github
+    head, before = fake.refs["heads/main"], files_at(fake)
+    path = next(iter(before))
+
+    result = GithubCommitCodeTool()._run(
+        "main", commit_msg="Nothing new", files=[{"path": path, "content": before[path]}]
+    )
+
+    assert result == "No changes to commit in branch main (1 files unchanged)"
+    assert fake.refs["heads/main"] == head
+    assert not [key for key in github.requests if key.startswith("github POST")]
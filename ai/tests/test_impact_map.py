@@ -0,0 +1,84 @@
+import pytest
+from tools.impact_map import ImpactMap
+
+
+@pytest.fixture
+def impact(tmp_path, monkeypatch):
+    monkeypatch.setattr("tools.impact_map.TEST_IMPACT_FULL_EVERY", 5)
+    impact = ImpactMap(tmp_path)
+    impact.update(
+        {path: "1" for path in ("app.py", "util.py", "setup_helper.py", "tests/test_app.py", "tests/test_util.py")},
+        {
+            "tests/test_app.py::test_app": {"outcome": "passed", "duration": 1.0, "files": ["app.py"]},
+            "tests/test_util.py::test_util": {"outcome": "passed", "duration": 2.0, "files": ["util.py"]},
+            "tests/test_util.py::test_broken": {"outcome": "failed", "duration": 0.5, "files": []},
+        },
+        ["setup_helper.py"],
+        full_suite=True,
+    )
+    return impact
+
+
+def changed(impact, hashes: dict[str, str]) -> dict[str, str]:
+    """The recorded snapshot with some files changed."""
+    return {**impact.data["files"], **hashes}
+
+
+def test_first_run_is_full(tmp_path):
+    selection = ImpactMap(tmp_path).select({"app.py": "1"})
+    assert selection.full
+    assert selection.reason == "no impact map yet"
+
+
+def test_only_tests_of_changed_files_run(impact):
+    selection = impact.select(changed(impact, {"app.py": "2"}))
+    assert not selection.full
+    assert selection.changed == ["app.py"]
+    # Failed tests always run again.
+    assert selection.deselect == ["tests/test_util.py::test_util"]
+    assert selection.saved_seconds == 2.0
+
+
+def test_a_changed_test_file_selects_its_tests(impact):
+    selection = impact.select(changed(impact, {"tests/test_util.py": "2"}))
+    assert selection.deselect == ["tests/test_app.py::test_app"]
+
+
+def test_setup_and_config_files_run_everything(impact):
+    selection = impact.select(changed(impact, {"setup_helper.py": "2"}))
+    assert selection.full
+    assert "setup_helper.py" in selection.reason
+    assert impact.select(changed(impact, {"tests/conftest.py": "1"})).full
+
+
+def test_every_nth_run_is_full(impact, monkeypatch):
+    monkeypatch.setattr("tools.impact_map.TEST_IMPACT_FULL_EVERY", 2)
+    assert not impact.select(impact.data["files"]).full
+    impact.update(impact.data["files"], {}, [], full_suite=False)
+    assert impact.select(impact.data["files"]).full
+
+
+def test_partial_update_keeps_the_other_tests(impact):
+    impact.update(
+        changed(impact, {"app.py": "2"}),
+        {"tests/test_app.py::test_app": {"outcome": "failed", "duration": 1.5, "files": ["app.py", "util.py"]}},
+        ["other_helper.py"],
+        full_suite=False,
+    )
+    reloaded = ImpactMap(impact.root)
+    assert reloaded.data["runs_since_full"] == 1
+    assert reloaded.data["setup_files"] == ["other_helper.py", "setup_helper.py"]
+    assert set(reloaded.data["tests"]) == {
+        "tests/test_app.py::test_app",
+        "tests/test_util.py::test_util",
+        "tests/test_util.py::test_broken",
+    }
+    assert reloaded.data["tests"]["tests/test_app.py::test_app"]["outcome"] == "failed"
+
+
+def test_full_update_replaces_the_map(impact):
+    tests = {"tests/test_app.py::test_app": {"outcome": "passed", "duration": 1.0, "files": []}}
+    impact.update({"app.py": "3"}, tests, [], full_suite=True)
+    assert list(impact.data["tests"]) == ["tests/test_app.py::test_app"]
+    assert impact.data["setup_files"] == []
+    assert impact.data["runs_since_full"] == 0
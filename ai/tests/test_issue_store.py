@@ -0,0 +1,43 @@
+import pytest
+from tools import issue_store
+from tools.async_http import run_sync
+from tools.github_issue_fetch_tool import GithubIssueFetchTool
+from tools.issue_store import UNPRIORITIZED, IssueStore, priority_from_labels
+
+
+@pytest.fixture
+def store(github, tmp_path, monkeypatch):
+    monkeypatch.setattr(issue_store, "cache_path", lambda *parts: tmp_path / parts[-1])
+    return IssueStore("bench/osa")
+
+
+def test_priority_labels_are_ranked():
+    assert priority_from_labels(["bug", "priority: high"]) == 1
+    assert priority_from_labels(["P3", "critical"]) == 0
+    assert priority_from_labels(["high-priority"]) == 1
+    assert priority_from_labels(["bug"]) == UNPRIORITIZED
+
+
+def test_unchanged_backlogs_cost_one_not_modified_page(store, github):
+    first = run_sync(store.async_sync())
+    assert (first.updated, first.not_modified) == (10, 0)
+
+    # Later syncs only ask for the issues updated since the newest one stored...
+    assert run_sync(store.async_sync()).requests == 1
+    # ...and send the page's ETag once they have seen it.
+    third = run_sync(store.async_sync())
+    assert (third.requests, third.not_modified) == (1, 1)
+
+    github.github.issues[2].update(title="Renamed", updated_at="2100-01-01T00:00:00Z")
+    assert run_sync(store.async_sync()).not_modified == 0
+    assert store.get(3).title == "Renamed"
+
+
+def test_issues_are_listed_most_urgent_first(store):
+    listing = GithubIssueFetchTool()._run(limit=4).splitlines()
+    assert listing[0] == "# | priority | title | labels"
+    assert [row.split(" | ")[1] for row in listing[1:5]] == ["critical", "critical", "high", "high"]
+    assert 'cursor="' in listing[-1]
+
+    high = GithubIssueFetchTool()._run(priority="high").splitlines()[1:]
+    assert {row.split(" | ")[1] for row in high} == {"critical", "high"}
@@ -0,0 +1,108 @@
+import socket
+import subprocess
+import threading
+import time
+
+import pytest
+from crew.job_queue import JobQueue, worker_id
+
+
+@pytest.fixture
+def queue(request):
+    return JobQueue(request.node.name)
+
+
+def test_enqueue_is_idempotent(queue):
+    job, created = queue.enqueue("issue", {"number": 1}, "issue:1")
+    again, created_again = queue.enqueue("issue", {"number": 1}, "issue:1")
+    assert created and not created_again
+    assert again.id == job.id
+    assert queue.counts()["queued"] == 1
+
+
+def test_concurrent_claims_hand_out_every_job_once(queue):
+    for number in range(30):
+        queue.enqueue("issue", {"number": number}, f"issue:{number}")
+    start = threading.Barrier(8)
+    claimed: dict[str, list[int]] = {}
+
+    def work(owner: str):
+        start.wait()
+        while (job := queue.claim(owner)) is not None:
+            claimed[owner].append(job.id)
+
+    threads = []
+    for n in range(8):
+        claimed[f"worker-{n}"] = []
+        threads.append(threading.Thread(target=work, args=(f"worker-{n}",)))
+        threads[-1].start()
+    for thread in threads:
+        thread.join()
+
+    ids = [job_id for jobs in claimed.values() for job_id in jobs]
+    assert sorted(ids) == sorted(set(ids))
+    assert len(ids) == 30
+    assert queue.counts() == {"queued": 0, "running": 30, "done": 0, "failed": 0}
+
+
+def test_expired_lease_is_handed_out_again(queue):
+    queue.enqueue("issue", {"number": 1}, "issue:1")
+    first = queue.claim("a", lease=0.1)
+    assert queue.claim("b") is None
+    time.sleep(0.15)
+    second = queue.claim("b")
+    assert second.id == first.id
+    assert second.attempts == 2
+    # The first owner lost the job and can no longer finish it.
+    assert not queue.renew(first, "a")
+    assert not queue.complete(first, "a", "late")
+    assert queue.complete(second, "b", "ok")
+    assert queue.get("issue:1").result == "ok"
+
+
+def test_renewed_lease_is_kept(queue):
+    queue.enqueue("issue", {"number": 1}, "issue:1")
+    job = queue.claim("a", lease=0.1)
+    assert queue.renew(job, "a", lease=60)
+    time.sleep(0.15)
+    assert queue.claim("b") is None
+
+
+def test_recover_requeues_jobs_of_dead_processes(queue):
+    dead = subprocess.Popen(["true"])
+    dead.wait()
+    queue.enqueue("issue", {"number": 1}, "issue:1")
+    queue.enqueue("issue", {"number": 2}, "issue:2")
+    orphan = queue.claim(f"{socket.gethostname()}:{dead.pid}")
+    queue.claim(worker_id())
+
+    assert queue.recover() == 1
+    job = queue.get(orphan.key)
+    assert (job.state, job.attempts, job.lease_owner) == ("queued", 0, None)
+    assert queue.counts()["running"] == 1
+
+
+def test_failed_job_is_retried_with_backoff_then_given_up(queue, monkeypatch):
+    monkeypatch.setattr("crew.job_queue.JOB_RETRY_SECONDS", 0.1)
+    queue.enqueue("issue", {"number": 1}, "issue:1")
+
+    job = queue.claim("a")
+    assert queue.fail(job, "a", "boom", max_attempts=2)
+    assert queue.get("issue:1").state == "queued"
+    assert queue.claim("a") is None  # not before the retry delay
+    time.sleep(0.15)
+
+    job = queue.claim("a")
+    assert job.attempts == 2
+    assert job.error == "boom"
+    assert queue.fail(job, "a", "boom again", max_attempts=2)
+    failed = queue.get("issue:1")
+    assert (failed.state, failed.attempts, failed.error) == ("failed", 2, "boom again")
+    assert queue.claim("a") is None
+
+
+def test_release_does_not_count_the_attempt(queue):
+    queue.enqueue("issue", {"number": 1}, "issue:1")
+    job = queue.claim("a")
+    assert queue.release(job, "a")
+    assert queue.claim("b").attempts == 1
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+from crew import llm
+from crew.llm import CachedLLM, LLMCacheMiss, ResponseStore
+
+MESSAGES = [{"role": "user", "content": "Write the spec"}]
+
+
+@pytest.fixture
+def completions(tmp_path, monkeypatch):
+    """Model calls that reach the provider; every answer names its call."""
+    calls = []
+
+    def complete(self, messages, tools, callbacks, available_functions, **kwargs):
+        calls.append(messages)
+        return f"answer {len(calls)}"
+
+    monkeypatch.setattr(llm, "OSA_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(llm, "LLM_CASSETTE_DIR", tmp_path / "cassette")
+    monkeypatch.setattr(CachedLLM, "_complete", complete)
+    return calls
+
+
+def test_repeated_calls_come_from_the_cache(completions):
+    model = CachedLLM("openai/stub", mode="cache")
+    assert model.call(MESSAGES) == model.call(MESSAGES) == "answer 1"
+    assert model.call([{"role": "user", "content": "Something else"}]) == "answer 2"
+    # Tool-executing calls always reach the model.
+    assert model.call(MESSAGES, available_functions={"tool": print}) == "answer 3"
+    assert len(completions) == 3
+
+
+def test_replays_answer_from_the_recording_only(completions):
+    assert CachedLLM("openai/stub", mode="record").call(MESSAGES) == "answer 1"
+    replay = CachedLLM("openai/stub", mode="replay")
+    assert replay.call(MESSAGES) == "answer 1"
+    with pytest.raises(LLMCacheMiss):
+        replay.call([{"role": "user", "content": "Not recorded"}])
+    assert len(completions) == 1
+
+
+def test_the_store_evicts_least_recently_used_entries(tmp_path):
+    store = ResponseStore(tmp_path, max_bytes=1000)
+    for age, key in enumerate(("cc3", "bb2", "aa1"), 1):
+        store.put(key, "m", "x" * 200)
+        os.utime(store._path(key), (time.time() - 100 * age,) * 2)
+    store.get("aa1")  # refreshes the oldest entry
+
+    store.put("dd4", "m", "x" * 400)
+
+    assert store.get("bb2") is None
+    assert [store.get(key) is not None for key in ("aa1", "cc3", "dd4")] == [True, True, True]
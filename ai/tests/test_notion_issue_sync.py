@@ -0,0 +1,60 @@
+import pytest
+from notion_client import AsyncClient
+from tools import issue_store, notion_issue_sync
+from tools.notion_issue_sync import NotionIssueSync, page_id_of
+
+
+@pytest.fixture
+def sync(github, tmp_path, monkeypatch):
+    """A sync from the fake Notion database into the fake repository, with its state in tmp_path."""
+    clients = {}
+
+    def client() -> AsyncClient:
+        loop = notion_issue_sync.asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = AsyncClient(auth="secret", base_url=github.url("notion"))
+        return clients[loop]
+
+    monkeypatch.setattr(notion_issue_sync, "notion_async_client", client)
+    monkeypatch.setattr(notion_issue_sync, "get_notion", lambda: None)
+    for module in (issue_store, notion_issue_sync):
+        monkeypatch.setattr(module, "cache_path", lambda *parts: tmp_path / parts[-1])
+    return lambda: NotionIssueSync("bench/osa", github.notion.database_id)
+
+
+def writes(services) -> int:
+    return sum(n for key, n in services.requests.items() if key.startswith(("github POST", "github PATCH")))
+
+
+def test_every_idea_gets_one_issue(sync, github):
+    first = sync().run()
+    assert (first.ideas, len(first.created), first.failed) == (5, 5, [])
+    pages = [page_id_of(issue["body"]) for issue in github.github.issues[10:]]
+    assert sorted(pages) == sorted(page["id"] for page in github.notion.pages)
+
+    sent = writes(github)
+    assert sync().run().writes == 0
+    assert writes(github) == sent
+
+
+def test_lost_state_does_not_duplicate_issues(sync, github, tmp_path):
+    sync().run()
+    sent = writes(github)
+    for state in tmp_path.glob("*.sqlite3"):
+        state.unlink()
+
+    result = sync().run(full=True)
+    assert (result.writes, result.unchanged) == (0, 5)
+    assert writes(github) == sent
+
+
+def test_edited_ideas_update_their_issue(sync, github):
+    sync().run()
+    page = github.notion.pages[1]
+    page["properties"]["Description"]["rich_text"][0]["plain_text"] = "A sharper description."
+    page["last_edited_time"] = "2100-01-01T00:00:00.000Z"
+
+    result = sync().run()
+    assert (result.created, len(result.updated)) == ([], 1)
+    issue = next(i for i in github.github.issues if i["number"] == result.updated[0])
+    assert "A sharper description." in issue["body"]
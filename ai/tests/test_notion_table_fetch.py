@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from notion_client import AsyncClient, Client
+from tools import notion_table_fetch_tool
+from tools.notion_table_fetch_tool import NotionTableFetchTool
+
+
+@pytest.fixture
+def notion(services, monkeypatch):
+    """The fake Notion database, three ideas per response and two table rows per tool page."""
+    client = Client(auth="secret", base_url=services.url("notion"))
+    monkeypatch.setattr(notion_table_fetch_tool, "get_notion", lambda: client)
+    monkeypatch.setattr(notion_table_fetch_tool, "NOTION_DB_ID", services.notion.database_id)
+    monkeypatch.setenv("TOOL_OUTPUT_TOKENS_NOTIONTABLEFETCHTOOL", "45")
+    services.config.notion_page_size = 3
+    NotionTableFetchTool()._state_path().unlink(missing_ok=True)
+    yield services
+    client.close()
+
+
+def fetch_all(tool: NotionTableFetchTool, **kwargs) -> tuple[list[str], list[str]]:
+    """Follows the cursors to the end; returns the titles and each page's last line."""
+    titles, footers, cursor = [], [], None
+    while True:
+        lines = tool._run(cursor=cursor, **kwargs).splitlines()
+        titles += [line.split(" | ")[0] for line in lines[1:] if not line.startswith("[")]
+        footers.append(lines[-1])
+        if 'cursor="' not in lines[-1]:
+            return titles, footers
+        cursor = lines[-1].split('cursor="')[1].split('"')[0]
+
+
+def test_pages_resume_at_the_notion_response_they_stopped_in(notion):
+    tool = NotionTableFetchTool()
+    tool._run()
+    assert notion.requests["notion"] == 1  # the first page fits into the first response
+
+    titles, footers = fetch_all(tool)
+    assert titles == [f"Idea {i}" for i in range(5)]
+    assert footers[0].startswith("[ideas 1-2; ")
+    # Pages 2 and 3 start inside a response; none re-reads the responses before it.
+    assert notion.requests["notion"] == 1 + 4
+
+
+def test_incremental_runs_do_not_repeat_the_last_idea(notion):
+    tool = NotionTableFetchTool()
+    assert fetch_all(tool, incremental=True)[0] == [f"Idea {i}" for i in range(5)]
+    assert fetch_all(tool, incremental=True)[0] == []
+
+    # An edit within the same minute as the watermark still shows up.
+    notion.notion.pages.append({**notion.notion.pages[-1], "id": "idea-5"})
+    assert fetch_all(tool, incremental=True)[0] == ["Idea 4"]
+
+
+def test_an_incremental_run_continues_after_the_last_idea_shown(notion):
+    tool = NotionTableFetchTool()
+    tool._run(incremental=True)
+    assert fetch_all(tool, incremental=True)[0] == ["Idea 2", "Idea 3", "Idea 4"]
+
+
+def test_async_pages_match_the_sync_ones(notion, monkeypatch):
+    tool = NotionTableFetchTool()
+    first = tool._run()
+    cursor = first.splitlines()[-1].split('cursor="')[1].split('"')[0]
+
+    async def both_pages() -> tuple[str, str]:
+        async with AsyncClient(auth="secret", base_url=notion.url("notion")) as client:
+            monkeypatch.setattr(notion_table_fetch_tool, "notion_async_client", lambda: client)
+            return await tool._arun(), await tool._arun(cursor=cursor)
+
+    assert asyncio.run(both_pages()) == (first, tool._run(cursor=cursor))
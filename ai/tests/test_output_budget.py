@@ -0,0 +1,52 @@
+from tools.output_budget import directory_tree, estimate_tokens, paginate, table, token_budget
+
+LINES = [f"line {i:02d} " + "x" * 30 for i in range(10)]  # 10 tokens each
+
+
+def cursor_of(page: str) -> str:
+    return page.splitlines()[-1].split('cursor="')[1].split('"')[0]
+
+
+def test_pages_follow_their_cursor_to_the_end():
+    shown, cursor = [], None
+    while True:
+        page = paginate(LINES, budget=35, cursor=cursor, query={"path": "src"})
+        shown += [line for line in page.splitlines() if not line.startswith("[")]
+        if 'cursor="' not in page:
+            break
+        cursor = cursor_of(page)
+    assert shown == LINES
+    key = cursor.partition(":")[0]
+    assert paginate(LINES, 35, f"{key}:10", {"path": "src"}).endswith("[no more lines, all 10 shown]")
+
+
+def test_cursors_of_another_query_start_over():
+    cursor = cursor_of(paginate(LINES, 35, query={"path": "src"}))
+    assert paginate(LINES, 35, cursor, {"path": "docs"}).startswith("line 00")
+
+
+def test_pages_respect_the_budget_and_row_limit():
+    page = paginate(LINES, budget=35, header="header")
+    assert page.splitlines()[:4] == ["header", *LINES[:3]]
+    assert page.endswith(f'[lines 1-3 of 10; pass cursor="{cursor_of(page)}" for more]')
+    assert len(paginate(LINES, budget=1000, max_rows=3).splitlines()) == 4
+
+
+def test_a_single_oversized_line_is_clipped():
+    page = paginate(["y" * 400], budget=20)
+    assert page.startswith("y" * 80) and page.endswith("[... 320 characters cut]")
+
+
+def test_budgets_can_be_set_per_tool(monkeypatch):
+    monkeypatch.setenv("TOOL_OUTPUT_TOKENS_GITHUBREADFILESTOOL", "123")
+    assert token_budget("GithubReadFilesTool") == 123
+    assert token_budget("OtherTool", default=50) == 50
+    assert estimate_tokens("abcd" * 10) == 11
+
+
+def test_compact_encodings():
+    assert directory_tree(["src/b.py", "src/a.py", "README.md", "src/pkg/"]) == [
+        "./: README.md",
+        "src/: a.py, b.py, pkg/",
+    ]
+    assert table(("name", "note"), [("a|b", "two\n  lines")]) == ("name | note", ["a/b | two lines"])
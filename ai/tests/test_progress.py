@@ -0,0 +1,73 @@
+import io
+import json
+import threading
+import time
+
+from crew import progress
+from crew.progress import ProgressStream
+from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+from tools.tracing import tracer
+
+
+class SlowOutput(io.StringIO):
+    """Blocks every write until `released` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.released = threading.Event()
+        self.writing = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.writing.set()
+        self.released.wait()
+        return super().write(text)
+
+
+def records(out: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_events_are_numbered_and_tagged_with_their_task():
+    out = io.StringIO()
+    stream = ProgressStream(out, heartbeat=60)
+    with tracer.span("task", "spec"):
+        stream.emit("tool_call", tool="search")
+    stream.close()
+
+    first, closed = records(out)
+    assert (first["seq"], first["event"], first["task"], first["tool"]) == (1, "tool_call", "spec", "search")
+    assert (closed["seq"], closed["event"]) == (2, "stream_closed")
+
+
+def test_tokens_are_dropped_when_the_consumer_falls_behind():
+    out = SlowOutput()
+    stream = ProgressStream(out, buffer=2, heartbeat=60)
+    stream.emit("task_started")
+    out.writing.wait(5)  # the writer holds the first event, the buffer is empty
+    for text in "abcde":
+        stream.emit("llm_token", lossy=True, text=text)
+    out.released.set()
+    stream.close()
+
+    events = [(r["event"], r.get("text") or r.get("count")) for r in records(out)]
+    # Queued tokens go out as one line; the ones that did not fit are counted.
+    assert events[:3] == [("task_started", None), ("dropped", 3), ("llm_token", "ab")]
+    assert events[-1][0] == "stream_closed"
+
+
+def test_idle_streams_send_heartbeats():
+    out = io.StringIO()
+    stream = ProgressStream(out, heartbeat=0.05)
+    time.sleep(0.3)
+    stream.close()
+    assert "heartbeat" in {r["event"] for r in records(out)}
+
+
+def test_crewai_events_reach_the_active_stream():
+    out = io.StringIO()
+    with progress.streaming(out):
+        crewai_event_bus.emit(object(), event=LLMStreamChunkEvent(chunk="Hello"))
+    progress.emit("after_close")  # no active stream, nothing happens
+
+    events = [(r["event"], r.get("text")) for r in records(out)]
+    assert events == [("llm_token", "Hello"), ("stream_closed", None)]
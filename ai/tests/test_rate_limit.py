@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from tools.rate_limit import RateLimitScheduler, ServiceLimits, TokenBucket
+
+
+def scheduler(rate=100.0, burst=100, concurrency=8, **kwargs) -> RateLimitScheduler:
+    return RateLimitScheduler({"github": ServiceLimits(rate, burst, concurrency)}, **kwargs)
+
+
+def get(services, path="/repos/bench/osa"):
+    def send() -> httpx.Response:
+        response = httpx.get(services.url("github") + path)
+        response.raise_for_status()
+        return response
+
+    return send
+
+
+def test_bucket_spends_burst_then_paces_at_rate():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_bucket_follows_server_quota():
+    bucket = TokenBucket(rate=100, capacity=100)
+    bucket.seed(remaining=0, reset_in=0.5)
+    assert bucket.reserve() == pytest.approx(0.5, abs=0.05)
+
+
+def test_retry_after_is_honoured(services):
+    services.throttle("github", (429, {"Retry-After": "0.3"}))
+    limiter = scheduler()
+    started = time.monotonic()
+    response = limiter.call("github", get(services))
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.3
+    assert services.requests["github"] == 2
+    assert limiter.stats("github")["retries"] == 1
+
+
+def test_exhausted_quota_waits_for_reset(services):
+    reset = int(time.time()) + 1
+    services.throttle("github", (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)}))
+    limiter = scheduler()
+    limiter.call("github", get(services))
+    assert time.time() >= reset - 0.05
+    assert services.requests["github"] == 2
+
+
+def test_backoff_with_jitter_grows_and_gives_up(services, monkeypatch):
+    services.throttle("github", *[(429, {})] * 3)
+    delays, sleep = [], time.sleep
+
+    def record(seconds):
+        delays.append(seconds)
+        sleep(seconds)
+
+    monkeypatch.setattr("tools.rate_limit.time.sleep", record)
+    limiter = scheduler(max_retries=2, base_delay=0.1, max_delay=1)
+    with pytest.raises(httpx.HTTPStatusError):
+        limiter.call("github", get(services))
+    # Attempt n waits between half and all of base * 2**n, plus up to base/2 jitter.
+    delays = [d for d in delays if d > 0.01]  # the bucket's waits are (almost) zero
+    assert len(delays) == 2
+    assert 0.05 <= delays[0] <= 0.15
+    assert 0.1 <= delays[1] <= 0.25
+    assert services.requests["github"] == 3
+    assert limiter.stats("github")["throttled"] == 3
+
+
+def test_other_errors_are_not_retried(services):
+    limiter = scheduler()
+    with pytest.raises(httpx.HTTPStatusError):
+        limiter.call("github", get(services, "/repos/bench/osa/no-such-route"))
+    assert services.requests["github"] == 1
+    assert limiter.stats("github")["retries"] == 0
+
+
+def test_async_calls_respect_concurrency_cap(services):
+    limiter = scheduler(concurrency=2)
+    in_flight = peak = 0
+
+    async def send():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        async with httpx.AsyncClient() as client:
+            response = await client.get(services.url("github") + "/repos/bench/osa")
+        in_flight -= 1
+        return response
+
+    async def main():
+        return await asyncio.gather(*(limiter.acall("github", send) for _ in range(6)))
+
+    assert all(r.status_code == 200 for r in asyncio.run(main()))
+    assert peak == 2
+
+
+def test_observe_seeds_bucket_from_headers():
+    limiter = scheduler()
+    limiter.observe("github", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 0.4)})
+    assert limiter._services["github"].bucket.reserve() == pytest.approx(0.4, abs=0.05)
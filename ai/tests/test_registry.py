@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from tools.registry import ToolRegistry
+
+AI_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_tools_are_built_once_on_first_use():
+    registry = ToolRegistry({"counter": ("collections", "Counter", {"a": 1})})
+    assert registry.built() == []
+    tool = registry.get("counter")
+    assert registry.build(["counter"]) == [tool] and registry.get("counter") is tool
+    assert registry.built() == ["counter"]
+    with pytest.raises(KeyError, match="Unknown tool 'missing'"):
+        registry.get("missing")
+
+
+def test_only_the_tools_of_running_agents_are_imported():
+    # A fresh interpreter, since other tests have imported the tools already.
+    script = """
+import sys
+from crew.dev_crew import DeveloperCrew
+
+crew = DeveloperCrew()
+print(sorted(m for m in sys.modules if m.startswith("tools.") and m.endswith("_tool")))
+crew.init_tools([crew.requirements_task])
+print(sorted(m for m in sys.modules if m.startswith("tools.") and m.endswith("_tool")))
+print("crewai_tools" in sys.modules)
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=AI_DIR, capture_output=True, text=True, check=True
+    )
+    at_start, equipped, interpreter = result.stdout.splitlines()[-3:]
+    assert at_start == "[]"
+    assert "tools.github_issue_fetch_tool" in equipped
+    assert "tools.sandbox_code_tool" not in equipped
+    assert interpreter == "False"
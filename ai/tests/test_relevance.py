@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from crew.retrieval import rank
+from tools import relevance
+from tools.issue_store import Issue
+from tools.relevance import EmbeddingCache, similarity, terms
+
+FILES = {
+    "tools/rate_limit.py": "class TokenBucket:\n    def acquire(self): rate limit retry backoff",
+    "tools/notion_api.py": "def get_notion(): notion client database query",
+    "README.md": "Project overview",
+}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(relevance, "cache_path", lambda *parts: tmp_path / parts[-1])
+    return tmp_path
+
+
+class FakeIndex:
+    """The parts of a CodeIndex that rank() reads; counts the files it loads."""
+
+    def __init__(self, files: dict[str, str]):
+        self.contents = files
+        self.files = {path: f"sha-{hash(text)}" for path, text in files.items()}
+        self.binary: set[str] = set()
+        self.mirror = SimpleNamespace(path=SimpleNamespace(stem="mirror"))
+        self.reads = 0
+
+    def read_many(self, paths: list[str]) -> dict[str, str]:
+        self.reads += len(paths)
+        return {path: self.contents[path] for path in paths}
+
+
+def test_identifiers_count_whole_and_by_word():
+    assert terms("parseHTTPResponse in rate_limit") == [
+        "parsehttpresponse", "parse", "http", "response", "rate_limit", "rate", "limit"
+    ]
+
+
+def test_similar_texts_score_highest():
+    vectors = np.stack([relevance.hash_vector(text) for text in FILES.values()])
+    query = relevance.hash_vector("Retry with backoff when the rate limit hits")
+    scores = similarity(query[np.newaxis], vectors)
+    assert scores.shape == (1, 3)
+    assert scores[0].argmax() == 0
+
+
+def test_only_changed_documents_are_vectorized(cache_dir):
+    asked = []
+
+    def texts(positions: list[int]) -> list[str]:
+        asked.append(positions)
+        return [f"document {i}" for i in positions]
+
+    EmbeddingCache("docs").matrix(["a", "b"], texts)
+    matrix = EmbeddingCache("docs").matrix(["a", "c"], texts)
+    assert asked == [[0, 1], [1]]
+    assert matrix.shape == (2, relevance.RELEVANCE_DIM)
+
+
+def test_issues_keep_their_priority_and_get_their_files(cache_dir):
+    index = FakeIndex(FILES)
+    issues = [
+        Issue(1, "Update the README", priority=1),
+        Issue(2, "Notion database query times out", priority=0),
+        Issue(3, "Rate limit retries need backoff", priority=1),
+    ]
+    ranked = rank(issues, index, top_issues=3, top_files=1)
+
+    assert [r.issue.number for r in ranked] == [2, 3, 1]
+    assert ranked[0].files[0][0] == "tools/notion_api.py"
+    assert ranked[1].files[0][0] == "tools/rate_limit.py"
+    rank(issues, index, top_issues=3, top_files=1)
+    assert index.reads == len(FILES)  # unchanged files are not read again
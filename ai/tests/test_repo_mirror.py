@@ -0,0 +1,129 @@
+import subprocess
+
+import pytest
+from tools import code_index
+from tools.code_index import CodeIndex
+from tools.repo_mirror import RepoMirror
+
+
+class Remote:
+    """A bare repository on disk plus a work tree that pushes to its main branch."""
+
+    def __init__(self, root):
+        self.url = str(root / "remote.git")
+        self.work = root / "work"
+        subprocess.run(["git", "init", "-q", "--bare", "-b", "main", self.url], check=True)
+        subprocess.run(["git", "init", "-q", "-b", "main", str(self.work)], check=True)
+
+    def git(self, *args: str) -> str:
+        command = ["git", "-c", "user.name=osa", "-c", "user.email=osa@example.com", "-C", str(self.work)]
+        return subprocess.run([*command, *args], check=True, capture_output=True, text=True).stdout.strip()
+
+    def push(self, files: dict[str, str | None]) -> str:
+        """Writes (or, for None, deletes) the files, commits and pushes; returns the new head."""
+        for path, content in files.items():
+            target = self.work / path
+            if content is None:
+                target.unlink()
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(content)
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", "update")
+        self.git("push", "-q", self.url, "main")
+        return self.git("rev-parse", "HEAD")
+
+
+@pytest.fixture
+def remote(tmp_path):
+    return Remote(tmp_path)
+
+
+@pytest.fixture
+def mirror(remote, tmp_path, monkeypatch):
+    # Every sync asks the remote, instead of trusting the head for GH_TREE_HEAD_TTL.
+    monkeypatch.setattr("tools.repo_mirror.GH_TREE_HEAD_TTL", 0)
+    # The index cache is keyed by the mirror's name, so each test gets its own.
+    return RepoMirror(remote.url, path=tmp_path / f"{tmp_path.name}.git")
+
+
+def count_calls(monkeypatch, obj, name: str) -> list:
+    calls, original = [], getattr(obj, name)
+
+    def spy(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, spy)
+    return calls
+
+
+def test_sync_fetches_the_remote_head(remote, mirror):
+    head = remote.push({"app.py": "def main():\n    pass\n", "pkg/util.py": "VALUE = 1\n"})
+    assert mirror.sync() == head
+    tree = mirror.tree(head)
+    assert sorted(tree) == ["app.py", "pkg/util.py"]
+    assert mirror.read_blobs([tree["pkg/util.py"][0]]) == {tree["pkg/util.py"][0]: b"VALUE = 1\n"}
+
+
+def test_sync_only_fetches_when_the_head_moved(remote, mirror, monkeypatch):
+    remote.push({"app.py": "A = 1\n"})
+    git = count_calls(monkeypatch, mirror, "_git")
+    first = mirror.sync()
+    mirror.sync()
+    assert sum(args[0] == "fetch" for args in git) == 1
+
+    head = remote.push({"app.py": "A = 2\n"})
+    assert head != first
+    assert mirror.sync() == head
+    assert sum(args[0] == "fetch" for args in git) == 2
+    assert mirror.read_blobs([mirror.tree(head)["app.py"][0]]).popitem()[1] == b"A = 2\n"
+
+
+def test_index_update_reindexes_only_changed_files(remote, mirror, monkeypatch):
+    remote.push(
+        {
+            "keep.py": "def stable_helper():\n    return 1\n",
+            "edit.py": "def old_name():\n    return 2\n",
+            "gone.py": "def removed_function():\n    return 3\n",
+        }
+    )
+    before = CodeIndex.load(mirror)
+    assert [m.path for m in before.search("old_name", symbol=True)] == ["edit.py"]
+
+    head = remote.push(
+        {
+            "edit.py": "def new_name():\n    return 2\n",
+            "gone.py": None,
+            "added.py": "def added_function():\n    return 4\n",
+        }
+    )
+    reads = count_calls(monkeypatch, mirror, "read_blobs")
+    after = CodeIndex.load(mirror)
+    assert after.sha == head
+
+    tree = mirror.tree(head)
+    read = {sha for args in reads for sha in args[0]}
+    assert tree["keep.py"][0] not in read  # unchanged files are neither read nor re-tokenized
+    assert {tree["edit.py"][0], tree["added.py"][0]} <= read
+    assert sorted(after.files) == ["added.py", "edit.py", "keep.py"]
+    assert after.search("old_name", symbol=True) == []
+    assert after.search("removed_function", symbol=True) == []
+    assert [m.path for m in after.search("new_name", symbol=True)] == ["edit.py"]
+    assert [m.path for m in after.search("added_func")] == ["added.py"]
+    assert [m.path for m in after.search("stable_helper", symbol=True)] == ["keep.py"]
+    # The previous index keeps answering for its own commit.
+    assert [m.path for m in before.search("old_name", symbol=True)] == ["edit.py"]
+
+
+def test_index_is_reloaded_from_disk(remote, mirror, monkeypatch):
+    remote.push({"app.py": "def main():\n    return 1\n"})
+    built = CodeIndex.load(mirror)
+    monkeypatch.setattr(code_index, "_indexes", {})
+    reads = count_calls(monkeypatch, mirror, "read_blobs")
+    loaded = CodeIndex.load(mirror)
+    assert loaded is not built
+    assert loaded.sha == built.sha
+    assert reads == []
+    assert loaded.tokens == built.tokens
+    assert [m.path for m in loaded.search("main", symbol=True)] == ["app.py"]
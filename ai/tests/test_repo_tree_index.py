@@ -0,0 +1,38 @@
+from tools.github_commit_code_tool import GithubCommitCodeTool
+from tools.github_create_branch_tool import GithubCreateBranchTool
+from tools.github_list_files_tool import GithubListFilesTool
+
+
+def listed(tool: GithubListFilesTool, ref: str = "main") -> str:
+    return tool._run(recursive=True, ref=ref)
+
+
+def test_commits_move_the_cached_head(github):
+    tool, commit = GithubListFilesTool(), GithubCommitCodeTool()
+    assert "notes.md" not in listed(tool)
+
+    commit._run("main", commit_msg="Add notes", files=[{"path": "notes.md", "content": "one"}])
+    assert "notes.md" in listed(tool)
+
+    commit._run("main", path="more.md", content="two", commit_msg="Add more")
+    assert "more.md" in listed(tool)
+
+
+def test_new_branches_are_listed_at_their_base(github):
+    tool = GithubListFilesTool()
+    main = listed(tool)
+    GithubCreateBranchTool()._run("feature")
+    requests = github.requests["github"]
+    assert listed(tool, "feature") == main
+    assert github.requests["github"] == requests  # head and tree are known already
+
+
+def test_truncated_trees_are_flagged(github, monkeypatch):
+    fake = github.github
+    tree_json = fake._tree_json
+
+    def truncated(sha: str, recursive: bool) -> dict:
+        return {**tree_json(sha, recursive), "truncated": True}
+
+    monkeypatch.setattr(fake, "_tree_json", truncated)
+    assert "GitHub truncated the tree" in listed(GithubListFilesTool()).splitlines()[0]
@@ -0,0 +1,158 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from crew import routing
+from crew.llm import CachedLLM
+from crew.routing import LLMRoutingError, ModelStats, RoutedLLM, RoutingPolicy, Tier
+from crewai.utilities.exceptions.context_window_exceeding_exception import (
+    LLMContextLengthExceededException,
+)
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+class StubModels:
+    """Stands in for the model calls of every CachedLLM: model name -> reply or exception."""
+
+    def __init__(self):
+        self.replies: dict[str, object] = {}
+        self.delays: dict[str, float] = {}
+        self.calls: list[str] = []
+        self.finished = threading.Event()
+
+    def __call__(self, llm, messages, tools, callbacks, available_functions, **kwargs):
+        model = llm.model.removeprefix("openai/")
+        self.calls.append(model)
+        time.sleep(self.delays.get(model, 0))
+        reply = self.replies[model]
+        if model in self.delays:
+            self.finished.set()
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def models(monkeypatch):
+    stub = StubModels()
+    monkeypatch.setattr(CachedLLM, "_complete", lambda llm, *args, **kwargs: stub(llm, *args, **kwargs))
+    routing.stats.reset()
+    yield stub
+    routing.shutdown()
+    routing.stats.reset()
+
+
+def routed(**tier) -> RoutedLLM:
+    policy = RoutingPolicy.from_dict(
+        {
+            "models": {"openai/cheap": {"cost": 1}, "openai/pricey": {"cost": 2}},
+            "tiers": {"t": {"models": ["openai/pricey", "openai/cheap"], **tier}},
+        }
+    )
+    return RoutedLLM(policy, policy.tiers["t"])
+
+
+def test_cheapest_model_goes_first(models):
+    models.replies = {"cheap": "from cheap", "pricey": "from pricey"}
+    assert routed(hedge=False).call(MESSAGES) == "from cheap"
+    assert models.calls == ["cheap"]
+
+
+def test_failing_model_fails_over_and_goes_last(models):
+    models.replies = {"cheap": RuntimeError("down"), "pricey": "from pricey"}
+    llm = routed(hedge=False, min_samples=1)
+    assert llm.call(MESSAGES) == "from pricey"
+    assert models.calls == ["cheap", "pricey"]
+    assert routing.stats.summary("openai/cheap")["error_rate"] == 1.0
+
+    models.calls.clear()
+    assert llm.call(MESSAGES) == "from pricey"
+    assert models.calls == ["pricey"]  # the unhealthy model is tried last
+
+
+def test_error_when_every_model_fails(models):
+    models.replies = {"cheap": RuntimeError("down"), "pricey": TimeoutError("slow")}
+    with pytest.raises(LLMRoutingError, match="cheap: RuntimeError: down"):
+        routed(hedge=False).call(MESSAGES)
+
+
+def test_context_length_errors_are_not_failed_over(models):
+    models.replies = {"cheap": LLMContextLengthExceededException("too long"), "pricey": "from pricey"}
+    with pytest.raises(LLMContextLengthExceededException):
+        routed().call(MESSAGES)
+    assert models.calls == ["cheap"]
+
+
+def test_hedge_wins_over_a_slow_model(models):
+    models.replies = {"cheap": "from cheap", "pricey": "from pricey"}
+    models.delays = {"cheap": 1.0}
+    started = time.monotonic()
+    assert routed(latency_budget=0.1).call(MESSAGES) == "from pricey"
+    assert time.monotonic() - started < 0.8
+    assert models.calls == ["cheap", "pricey"]
+
+    # The slow duplicate keeps running and still counts for the statistics.
+    assert models.finished.wait(2)
+    time.sleep(0.05)
+    assert routing.stats.summary("openai/cheap")["samples"] == 1
+
+
+def test_tool_calls_are_not_hedged(models):
+    models.replies = {"cheap": "from cheap", "pricey": "from pricey"}
+    models.delays = {"cheap": 0.3}
+    llm = routed(latency_budget=0.05)
+    assert llm.call(MESSAGES, available_functions={"tool": print}) == "from cheap"
+    assert models.calls == ["cheap"]
+
+
+def test_shutdown_closes_the_pool_until_the_next_hedged_call(models):
+    models.replies = {"cheap": "from cheap", "pricey": "from pricey"}
+    assert routed(latency_budget=1).call(MESSAGES) == "from cheap"
+    pool = routing._hedge_pool()
+    routing.shutdown()
+    assert routing._pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+    assert routed(latency_budget=1).call(MESSAGES) == "from cheap"
+    assert routing._pool is not None and routing._pool is not pool
+
+
+def test_closed_pool_falls_back_to_a_direct_call(models, monkeypatch):
+    models.replies = {"cheap": "from cheap", "pricey": "from pricey"}
+    closed = ThreadPoolExecutor(1)
+    closed.shutdown()
+    monkeypatch.setattr(routing, "_hedge_pool", lambda: closed)
+    assert routed(latency_budget=0.1).call(MESSAGES) == "from cheap"
+    assert models.calls == ["cheap"]
+
+
+def test_stats_keep_only_the_last_calls():
+    stats = ModelStats(window=3, window_seconds=60)
+    for seconds, ok in [(9.0, False), (1.0, True), (2.0, True), (3.0, False)]:
+        stats.record("m", seconds, ok)
+    summary = stats.summary("m")
+    assert summary["samples"] == 3
+    assert summary["error_rate"] == pytest.approx(1 / 3)
+    assert (summary["p50"], summary["p95"]) == (1.0, 2.0)  # failed calls have no latency
+
+
+def test_stats_forget_old_calls():
+    stats = ModelStats(window=10, window_seconds=0.1)
+    tier = Tier("t", ["m"], min_samples=2)
+    stats.record("m", 1.0, False)
+    stats.record("m", 1.0, False)
+    assert not stats.healthy("m", tier)
+    time.sleep(0.15)
+    assert stats.summary("m")["samples"] == 0
+    assert stats.healthy("m", tier)
+
+
+def test_slow_model_is_unhealthy():
+    stats = ModelStats()
+    tier = Tier("t", ["m"], latency_budget=1.0, min_samples=2)
+    stats.record("m", 0.5, True)
+    assert stats.healthy("m", tier)  # too few samples to judge
+    stats.record("m", 5.0, True)
+    assert not stats.healthy("m", tier)
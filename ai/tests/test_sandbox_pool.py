@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+import pytest
+from tools import sandbox_pool
+from tools.sandbox_pool import SandboxPool
+
+
+@pytest.fixture
+def installs(monkeypatch):
+    """Fakes pip: every installed package becomes a module with VALUE = its name."""
+    calls = []
+
+    def pip_install(python, packages, target=None):
+        calls.append((packages, target))
+        for package in packages:
+            (target / f"{package}.py").write_text(f"VALUE = {package!r}\n")
+
+    monkeypatch.setattr(sandbox_pool, "_pip_install", pip_install)
+    return calls
+
+
+@pytest.fixture
+def pools(tmp_path):
+    opened = []
+
+    def open_pool() -> SandboxPool:
+        opened.append(SandboxPool(Path(sys.executable), tmp_path, size=1))
+        return opened[-1]
+
+    yield open_pool
+    for pool in opened:
+        pool.close()
+
+
+def test_extras_go_to_the_pools_overlay(installs, pools):
+    pool, other = pools(), pools()
+    pool.install(["osa_extra"])
+    pool.install(["osa_extra"])
+    assert installs == [(["osa_extra"], pool.overlay)]
+
+    assert pool.run("import osa_extra; print(osa_extra.VALUE)").output.strip() == "osa_extra"
+    # Neither the shared environment nor other pools see the package.
+    assert "ModuleNotFoundError" in other.run("import osa_extra").error
+
+
+def test_closing_the_pool_removes_its_overlay(installs, pools):
+    pool = pools()
+    pool.install(["osa_extra"])
+    pool.close()
+    assert not pool.overlay.exists()
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from crew.task_graph import JoinTask, TaskGraphError, schedule_tasks
+from crewai import Agent, Crew, Process, Task
+from crewai.tasks.task_output import TaskOutput
+
+
+class TimedTask(Task):
+    """Sleeps instead of asking the agent and records when it ran."""
+
+    def _execute_core(self, agent, context, tools) -> TaskOutput:
+        start = time.monotonic()
+        time.sleep(0.2)
+        runs[self.name] = (start, time.monotonic())
+        self.output = TaskOutput(description=self.description, name=self.name, raw=self.name, agent=agent.role)
+        return self.output
+
+
+runs: dict[str, tuple[float, float]] = {}
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    runs.clear()
+    return Agent(role="dev", goal="test", backstory="test", llm="openai/gpt-4o-mini")
+
+
+def task(agent, name: str, *context: Task) -> Task:
+    return TimedTask(
+        name=name,
+        description=name,
+        expected_output=name,
+        agent=agent,
+        context=list(context) if context else None,
+    )
+
+
+def overlap(a: str, b: str) -> bool:
+    return runs[a][0] < runs[b][1] and runs[b][0] < runs[a][1]
+
+
+def names(tasks: list[Task]) -> list[str]:
+    return [t.name for t in tasks]
+
+
+def test_chain_stays_synchronous(agent):
+    a = task(agent, "a")
+    b = task(agent, "b", a)
+    c = task(agent, "c", b)
+    assert schedule_tasks([a, b, c]) == [a, b, c]
+    assert not any(t.async_execution for t in (a, b, c))
+
+
+def test_independent_tasks_overlap_and_the_next_layer_waits(agent):
+    a = task(agent, "a")
+    b = task(agent, "b")
+    c = task(agent, "c", a, b)
+    d = task(agent, "d", c)
+    e = task(agent, "e", c)
+    tasks = schedule_tasks([a, b, c, d, e])
+    assert names(tasks) == ["a", "b", "c", "d", "e", "join_d_e"]
+    assert [t.async_execution for t in tasks] == [True, True, False, True, True, False]
+
+    output = Crew(agents=[agent], tasks=tasks, process=Process.sequential).kickoff()
+    assert overlap("a", "b")
+    assert runs["c"][0] >= max(runs["a"][1], runs["b"][1])
+    assert overlap("d", "e")
+    assert runs["d"][0] >= runs["c"][1] and runs["e"][0] >= runs["c"][1]
+    assert "d" in output.raw and "e" in output.raw
+
+
+def test_consecutive_concurrent_layers_are_joined(agent):
+    a = task(agent, "a")
+    b = task(agent, "b")
+    c = task(agent, "c", a)
+    d = task(agent, "d", b)
+    tasks = schedule_tasks([a, b, c, d])
+    assert names(tasks) == ["a", "b", "join_a_b", "c", "d", "join_c_d"]
+
+    Crew(agents=[agent], tasks=tasks, process=Process.sequential).kickoff()
+    assert overlap("a", "b") and overlap("c", "d")
+    assert min(runs["c"][0], runs["d"][0]) >= max(runs["a"][1], runs["b"][1])
+
+
+def test_rescheduling_replaces_the_join_tasks(agent):
+    a = task(agent, "a")
+    b = task(agent, "b")
+    tasks = schedule_tasks([a, b])
+    assert isinstance(tasks[-1], JoinTask)
+    assert names(schedule_tasks(tasks)) == ["a", "b", "join_a_b"]
+    assert names(schedule_tasks([b])) == ["b"]
+    assert not b.async_execution
+
+
+def test_context_task_declared_later_is_rejected(agent):
+    a = task(agent, "a")
+    b = task(agent, "b", a)
+    with pytest.raises(TaskGraphError, match="'b' is declared before its context task 'a'"):
+        schedule_tasks([b, a])
@@ -0,0 +1,65 @@
+import asyncio
+import contextvars
+import json
+import threading
+
+import pytest
+from tools.tracing import Tracer, traced, tracer
+
+
+@pytest.fixture
+def spans():
+    tracer.reset()
+    yield tracer.spans
+    tracer.reset()
+
+
+def test_counts_add_up_along_the_span_stack():
+    local = Tracer()
+    with local.span("task", "spec") as task:
+        with local.span("tool", "fetch") as tool:
+            local.record(http_requests=2)
+        # Threads started with a copied context report to the same spans.
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=context.run, args=(local.record,), kwargs={"retries": 1})
+        worker.start()
+        worker.join()
+
+    assert (tool.counters["http_requests"], tool.parent_id) == (2, task.span_id)
+    assert (task.counters["http_requests"], task.counters["retries"]) == (2, 1)
+    assert [span.name for span in local.spans] == ["fetch", "spec"]
+
+
+def test_failures_are_recorded_and_raised():
+    local = Tracer()
+    with pytest.raises(ValueError), local.span("llm", "model"):
+        raise ValueError("quota")
+    assert (local.spans[0].status, local.spans[0].attrs["error"]) == ("error", "ValueError: quota")
+
+
+def test_traced_methods_get_a_span_named_after_their_class(spans):
+    class SearchTool:
+        @traced()
+        def _run(self):
+            return "sync"
+
+        @traced()
+        async def _arun(self):
+            return "async"
+
+    assert SearchTool()._run() == "sync"
+    assert asyncio.run(SearchTool()._arun()) == "async"
+    assert [(span.kind, span.name) for span in spans] == [("tool", "SearchTool")] * 2
+
+
+def test_spans_export_as_json_lines(tmp_path):
+    local = Tracer()
+    with local.span("task", "spec", agent="analyst"):
+        local.record(prompt_tokens=10, completion_tokens=5)
+    local.export_jsonl(tmp_path / "trace.jsonl")
+
+    (line,) = (tmp_path / "trace.jsonl").read_text().splitlines()
+    span = json.loads(line)
+    assert (span["kind"], span["attrs"]) == ("task", {"agent": "analyst"})
+    assert span["counters"]["prompt_tokens"] == 10
+    assert "spec" in local.summary()
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+import httpx
+from tools import github_client
+from tools.env import load_env
+from tools.github_client import GH_API_URL, GH_POOL_SIZE, GH_REPO_KEY, GH_TIMEOUT
+from tools.rate_limit import scheduler
+
+load_env()
+ASYNC_FAN_OUT = int(os.getenv("ASYNC_FAN_OUT", "8"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# httpx and notion clients are bound to the loop they were created on,
+# so there is one shared client per running event loop.
+_github_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_notion_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_loop_lock = threading.Lock()
+_background_loop: asyncio.AbstractEventLoop | None = None
+
+
+def github_async_client() -> httpx.AsyncClient:
+    """Returns the pooled async GitHub client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _github_clients.get(loop)
+    if client is None:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if GH_REPO_KEY:
+            headers["Authorization"] = f"Bearer {GH_REPO_KEY}"
+        client = httpx.AsyncClient(
+            base_url=GH_API_URL,
+            headers=headers,
+            timeout=GH_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=GH_POOL_SIZE, max_keepalive_connections=GH_POOL_SIZE
+            ),
+        )
+        _github_clients[loop] = client
+    return client
+
+
+def notion_async_client():
+    """Returns the shared async Notion client for the running event loop."""
+    from notion_client import AsyncClient
+    from tools.notion_api import NOTION_API_KEY, NOTION_API_URL, NOTION_TIMEOUT_MS
+
+    loop = asyncio.get_running_loop()
+    client = _notion_clients.get(loop)
+    if client is None:
+        client = AsyncClient(
+            auth=NOTION_API_KEY, base_url=NOTION_API_URL, timeout_ms=NOTION_TIMEOUT_MS
+        )
+        _notion_clients[loop] = client
+    return client
+
+
+async def github_request(method: str, path: str, **kwargs) -> httpx.Response:
+    """
+    Sends one GitHub REST request through the shared async client and the
+    rate-limit scheduler, and counts it in github_client.stats.
+    304 responses are returned as-is so callers can use conditional requests.
+    """
+
+    async def send() -> httpx.Response:
+        github_client.record(requests=1)
+        response = await github_async_client().request(method, path, **kwargs)
+        if response.status_code >= 400:
+            response.raise_for_status()
+        return response
+
+    response = await scheduler.acall("github", send)
+    scheduler.observe("github", response.headers)
+    return response
+
+
+async def fan_out(
+    func: Callable[[T], Awaitable[R]], items: Iterable[T], limit: int = ASYNC_FAN_OUT
+) -> list[R]:
+    """
+    Runs `func` for every item concurrently, at most `limit` at a time,
+    and returns the results in input order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(bounded(item) for item in items)))
+
+
+def run_sync(coro: Awaitable[R]) -> R:
+    """
+    Runs a coroutine on a long-lived background loop and waits for the result.
+    Blocking callers such as _run get concurrent fan-out while still reusing the
+    same async client and its open connections across calls.
+    """
+    global _background_loop
+    with _loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background_loop.run_forever, name="async-http", daemon=True
+            ).start()
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop).result()
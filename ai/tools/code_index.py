@@ -0,0 +1,272 @@
+import fnmatch
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from tools.env import load_env
+from tools.local_cache import cache_path
+from tools.repo_mirror import RepoMirror
+
+load_env()
+# Larger files and binaries are neither indexed nor searched.
+CODE_INDEX_MAX_FILE_BYTES = int(os.getenv("CODE_INDEX_MAX_FILE_BYTES", str(512 * 1024)))
+
+TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]+")
+# Lines that likely define a symbol: declarations and assignments ("name = ", "name: int").
+_DEFINITION = r"(?:def|class|function|interface|type|struct|fn)\s+{0}\b|^\s*{0}\s*(?::|=(?!=))"
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_indexes: dict[tuple[str, str], "CodeIndex"] = {}
+
+
+def trigrams(text: str) -> set[str]:
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass
+class Match:
+    path: str
+    line: int
+    text: str
+    definition: bool = False
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}: {self.text}"
+
+
+class CodeIndex:
+    """
+    Inverted index over the text files of one commit of a RepoMirror:
+    identifier tokens for symbol searches and lowercase trigrams for substring
+    searches. Both only narrow down the candidate files, which are then
+    scanned line by line, so results are exact.
+    An index is built from the previous one by re-indexing only the files
+    whose blob changed, and cached on disk per commit.
+    """
+
+    def __init__(
+        self,
+        mirror: RepoMirror,
+        sha: str,
+        files: dict[str, str],
+        tokens: dict[str, set[str]],
+        grams: dict[str, set[str]],
+        binary: set[str] = frozenset(),
+    ):
+        self.mirror = mirror
+        self.sha = sha
+        self.files = files  # path -> blob SHA
+        self.tokens = tokens
+        self.grams = grams
+        self.binary = set(binary)
+        self._contents: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, mirror: RepoMirror) -> "CodeIndex":
+        """Returns the index for the current remote head, updating mirror and index if it moved."""
+        sha = mirror.sync()
+        key = (str(mirror.path), sha)
+        with _lock:
+            index = _indexes.get(key)
+        if index is None:
+            index = cls._from_disk(mirror, sha) or cls._build(mirror, sha, _latest(mirror))
+            with _lock:
+                # Drop indexes of older heads of the same mirror.
+                for other in [k for k in _indexes if k[0] == key[0]]:
+                    del _indexes[other]
+                _indexes[key] = index
+        return index
+
+    @classmethod
+    def _build(cls, mirror: RepoMirror, sha: str, previous: "CodeIndex | None") -> "CodeIndex":
+        started = time.perf_counter()
+        files = {
+            path: blob
+            for path, (blob, size) in mirror.tree(sha).items()
+            if size <= CODE_INDEX_MAX_FILE_BYTES
+        }
+        index = cls(mirror, sha, files, {}, {})
+        changed = sorted(files)
+        if previous is not None:
+            changed = sorted(
+                p for p in files.keys() | previous.files.keys() if files.get(p) != previous.files.get(p)
+            )
+            removed = [p for p in changed if p in previous.files and p not in previous.binary]
+            previous._load(removed)
+            if any(p not in previous._contents for p in removed):
+                logger.warning("Blobs of %s are gone from the mirror, rebuilding", previous.sha[:7])
+                return cls._build(mirror, sha, None)
+            # Copies, since searches may still run on the previous index.
+            index.tokens = {t: set(ps) for t, ps in previous.tokens.items()}
+            index.grams = {g: set(ps) for g, ps in previous.grams.items()}
+            index.binary = {p for p in previous.binary if p in files and p not in changed}
+            index._contents = {
+                p: c for p, c in previous._contents.items() if p in files and p not in changed
+            }
+            for path in removed:
+                index._discard(path, previous._contents[path])
+
+        blobs = mirror.read_blobs([files[p] for p in changed if p in files])
+        for path in changed:
+            if path in files:
+                content = blobs[files[path]]
+                if b"\0" in content:
+                    index.binary.add(path)
+                else:
+                    index._add(path, content.decode("utf-8", errors="replace"))
+        index._store()
+        logger.info(
+            "Indexed %d of %d files at %s in %.2fs",
+            len(changed),
+            len(files),
+            sha[:7],
+            time.perf_counter() - started,
+        )
+        return index
+
+    def _add(self, path: str, content: str) -> None:
+        self._contents[path] = content
+        for token in set(TOKEN_RE.findall(content)):
+            self.tokens.setdefault(token, set()).add(path)
+        for gram in trigrams(content):
+            self.grams.setdefault(gram, set()).add(path)
+
+    def _discard(self, path: str, content: str) -> None:
+        for postings, terms in (
+            (self.tokens, set(TOKEN_RE.findall(content))),
+            (self.grams, trigrams(content)),
+        ):
+            for term in terms:
+                paths = postings.get(term)
+                if paths is not None:
+                    paths.discard(path)
+                    if not paths:
+                        del postings[term]
+
+    def read(self, path: str) -> str | None:
+        """Content of an indexed file; None for unknown, binary or oversized files."""
+        if path not in self._contents:
+            self._load([path])
+        return self._contents.get(path)
+
+    def read_many(self, paths: list[str]) -> dict[str, str]:
+        """Contents of the given indexed files, read from the mirror in one batch."""
+        self._load(paths)
+        return {p: self._contents[p] for p in paths if p in self._contents}
+
+    def _load(self, paths: list[str]) -> None:
+        missing = [
+            p for p in paths if p not in self._contents and p in self.files and p not in self.binary
+        ]
+        blobs = self.mirror.read_blobs([self.files[p] for p in missing])
+        for path in missing:
+            if self.files[path] in blobs:
+                self._contents[path] = blobs[self.files[path]].decode("utf-8", errors="replace")
+
+    def paths(self, prefix: str = "", pattern: str | None = None) -> list[str]:
+        prefix = prefix.strip("/")
+        return sorted(
+            p
+            for p in self.files
+            if (not prefix or p == prefix or p.startswith(prefix + "/"))
+            and (not pattern or fnmatch.fnmatchcase(p, pattern))
+        )
+
+    def candidates(self, query: str, symbol: bool = False) -> set[str]:
+        """Files that can contain the query according to the index."""
+        terms = TOKEN_RE.findall(query) if symbol else trigrams(query)
+        postings = self.tokens if symbol else self.grams
+        if not terms:
+            return set(self.files) - self.binary  # too short for the index, every file is a candidate
+        sets = sorted((postings.get(t, set()) for t in terms), key=len)
+        return set.intersection(*sets)
+
+    def search(
+        self, query: str, symbol: bool = False, prefix: str = "", pattern: str | None = None
+    ) -> list[Match]:
+        """
+        Lines containing `query`; case-insensitive substrings, or with `symbol`
+        whole identifiers, in which case definitions are listed first.
+        """
+        scope = set(self.paths(prefix, pattern)) if prefix or pattern else None
+        paths = sorted(p for p in self.candidates(query, symbol) if scope is None or p in scope)
+        self._load(paths)
+        if symbol:
+            matcher = re.compile(rf"(?<![A-Za-z0-9_]){re.escape(query)}(?![A-Za-z0-9_])")
+            definition = re.compile(_DEFINITION.format(re.escape(query)))
+        needle = query.lower()
+        matches = []
+        for path in paths:
+            content = self._contents.get(path)
+            if content is None:
+                continue
+            for number, line in enumerate(content.splitlines(), 1):
+                if symbol and matcher.search(line):
+                    matches.append(Match(path, number, line.strip(), bool(definition.search(line))))
+                elif not symbol and needle in line.lower():
+                    matches.append(Match(path, number, line.strip()))
+        matches.sort(key=lambda m: not m.definition)  # stable, keeps path order otherwise
+        return matches
+
+    def _store(self) -> None:
+        paths = sorted(self.files)
+        ids = {path: i for i, path in enumerate(paths)}
+        directory = _index_dir(self.mirror)
+        tmp = directory / f"{self.sha}.tmp"
+        tmp.write_text(
+            json.dumps(
+                {
+                    "sha": self.sha,
+                    "files": self.files,
+                    "binary": sorted(self.binary),
+                    "paths": paths,
+                    "tokens": {t: sorted(ids[p] for p in ps) for t, ps in self.tokens.items()},
+                    "grams": {g: sorted(ids[p] for p in ps) for g, ps in self.grams.items()},
+                }
+            )
+        )
+        tmp.replace(directory / f"{self.sha}.json")
+        # Only the newest commit is kept; it is the base for the next update.
+        for old in directory.glob("*.json"):
+            if old.stem != self.sha:
+                old.unlink(missing_ok=True)
+
+    @classmethod
+    def _from_disk(cls, mirror: RepoMirror, sha: str) -> "CodeIndex | None":
+        path = _index_dir(mirror) / f"{sha}.json"
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        paths = data["paths"]
+        return cls(
+            mirror,
+            data["sha"],
+            data["files"],
+            {t: {paths[i] for i in ids} for t, ids in data["tokens"].items()},
+            {g: {paths[i] for i in ids} for g, ids in data["grams"].items()},
+            set(data["binary"]),
+        )
+
+
+def _index_dir(mirror: RepoMirror):
+    directory = cache_path("code_index", mirror.path.stem, mirror.ref)
+    directory.mkdir(exist_ok=True)
+    return directory
+
+
+def _latest(mirror: RepoMirror) -> "CodeIndex | None":
+    """The index of an earlier head of the branch, in memory or on disk."""
+    with _lock:
+        for (mirror_path, _), index in _indexes.items():
+            if mirror_path == str(mirror.path):
+                return index
+    for path in _index_dir(mirror).glob("*.json"):
+        return CodeIndex._from_disk(mirror, path.stem)
+    return None
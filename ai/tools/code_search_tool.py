@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from tools.code_index import CodeIndex
+from tools.output_budget import CURSOR_DESCRIPTION, clip, paginate, token_budget
+from tools.repo_mirror import RepoMirror
+from tools.tracing import traced
+
+_lock = threading.Lock()
+_mirrors: dict[str, RepoMirror] = {}
+
+
+class CodeSearchInput(BaseModel):
+    query: Optional[str] = Field(
+        None, description="Text to search for, case-insensitive, e.g. 'rate limit' or 'def run('"
+    )
+    symbol: bool = Field(
+        False, description="Match the query as a whole identifier and list its definitions first"
+    )
+    read: Optional[list[str]] = Field(None, description="Paths of files to read instead of searching")
+    path: str = Field("", description="Only search below this directory")
+    pattern: Optional[str] = Field(None, description="Only search paths matching this glob, e.g. '*.py'")
+    ref: str = Field("main", description="Branch to search")
+    cursor: Optional[str] = Field(None, description=CURSOR_DESCRIPTION)
+
+
+class CodeSearchTool(BaseTool):
+    name: str = "Code Search Tool"
+    description: str = (
+        "Searches the contents of the repository for text or symbols and reads files, "
+        "answered from a local mirror of the branch in milliseconds. "
+        "Results are 'path:line: text'; pass the returned cursor to get more."
+    )
+    args_schema: Type[BaseModel] = CodeSearchInput
+
+    @traced()
+    def _run(
+        self,
+        query: Optional[str] = None,
+        symbol: bool = False,
+        read: Optional[list[str]] = None,
+        path: str = "",
+        pattern: Optional[str] = None,
+        ref: str = "main",
+        cursor: Optional[str] = None,
+    ) -> str:
+        return self._search(query, symbol, read, path, pattern, ref, cursor)
+
+    @traced()
+    async def _arun(
+        self,
+        query: Optional[str] = None,
+        symbol: bool = False,
+        read: Optional[list[str]] = None,
+        path: str = "",
+        pattern: Optional[str] = None,
+        ref: str = "main",
+        cursor: Optional[str] = None,
+    ) -> str:
+        # Mirror updates and searches are git subprocesses and CPU work.
+        return await asyncio.to_thread(
+            self._search, query, symbol, read, path, pattern, ref, cursor
+        )
+
+    def _search(
+        self,
+        query: Optional[str],
+        symbol: bool,
+        read: Optional[list[str]],
+        path: str,
+        pattern: Optional[str],
+        ref: str,
+        cursor: Optional[str],
+    ) -> str:
+        index = CodeIndex.load(_mirror(ref))
+        budget = token_budget(type(self).__name__)
+        if read:
+            lines = []
+            for file in read:
+                content = index.read(file.lstrip("/"))
+                lines += [f"=== {file}", *(content.splitlines() if content is not None else ["(not found)"])]
+            return paginate(lines, budget, cursor, query={"read": read, "ref": index.sha})
+        if not query:
+            return "Pass a query to search for, or files to read."
+
+        started = time.perf_counter()
+        matches = index.search(query, symbol, path, pattern)
+        files = len({m.path for m in matches})
+        return paginate(
+            [clip(str(m), 60) for m in matches],
+            budget,
+            cursor,
+            query={"query": query, "symbol": symbol, "path": path, "pattern": pattern, "ref": index.sha},
+            header=(
+                f"{len(matches)} matches in {files} files at {index.sha[:7]} "
+                f"({(time.perf_counter() - started) * 1000:.0f} ms)"
+            ),
+        )
+
+
+def _mirror(ref: str) -> RepoMirror:
+    with _lock:
+        if ref not in _mirrors:
+            _mirrors[ref] = RepoMirror(ref=ref)
+        return _mirrors[ref]
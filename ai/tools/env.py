@@ -0,0 +1,13 @@
+import functools
+
+from dotenv import load_dotenv
+
+
+@functools.cache
+def load_env() -> None:
+    """
+    Reads .env into the environment once per process.
+    Modules call this before reading their settings; only the first call
+    searches and parses the file.
+    """
+    load_dotenv()
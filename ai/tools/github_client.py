@@ -0,0 +1,94 @@
+import contextvars
+import functools
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+
+from tools.env import load_env
+
+load_env()
+GH_REPO_KEY = os.getenv("GH_REPO_KEY")
+GH_REPO_NAME = os.getenv("GH_REPO_NAME", "davidjaesch/osa")
+GH_API_URL = os.getenv("GH_API_URL", "https://api.github.com")
+GH_TIMEOUT = float(os.getenv("GH_TIMEOUT", "15"))
+GH_POOL_SIZE = int(os.getenv("GH_POOL_SIZE", "10"))
+GH_UPLOAD_WORKERS = int(os.getenv("GH_UPLOAD_WORKERS", "8"))
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+@dataclass
+class ClientStats:
+    """
+    Counts the requests sent through the shared GitHub client (see
+    tools.async_http.github_request) and the ones a cache answered instead.
+    """
+
+    calls: int = 0
+    requests: int = 0
+    saved_requests: int = 0
+
+    def add(self, **counts: int) -> None:
+        with _lock:
+            for key, value in counts.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def reset(self) -> None:
+        with _lock:
+            for f in fields(self):
+                setattr(self, f.name, 0)
+
+
+stats = ClientStats()
+
+# The stats of the tool call in progress; async tasks and run_sync share it
+# through the copied context.
+_call: contextvars.ContextVar[ClientStats | None] = contextvars.ContextVar(
+    "github_call", default=None
+)
+
+
+def record(**counts: int) -> None:
+    """Adds `requests` or `saved_requests` to the totals and to the current call."""
+    stats.add(**counts)
+    call = _call.get()
+    if call is not None:
+        call.add(**counts)
+
+
+@contextmanager
+def github_call(tool_name: str):
+    """
+    Wraps one tool call and logs how many GitHub requests it sent and how many
+    the caches saved.
+    """
+    call = ClientStats(calls=1)
+    token = _call.set(call)
+    stats.add(calls=1)
+    try:
+        yield call
+    finally:
+        _call.reset(token)
+        logger.info(
+            "%s: %d GitHub request(s), saved %d (%d saved in total over %d calls)",
+            tool_name,
+            call.requests,
+            call.saved_requests,
+            stats.saved_requests,
+            stats.calls,
+        )
+
+
+def counted(fn):
+    """Runs every call of the decorated async tool method inside github_call, named after its class."""
+
+    @functools.wraps(fn)
+    async def run(self, *args, **kwargs):
+        with github_call(type(self).__name__):
+            return await fn(self, *args, **kwargs)
+
+    return run
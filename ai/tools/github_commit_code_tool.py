@@ -1,36 +1,185 @@
-import os
-from typing import Type
+import base64
+import hashlib
+from typing import Optional, Type
 
+import httpx
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from github import Github
 from pydantic import BaseModel, Field
+from tools.async_http import fan_out, github_request, run_sync
+from tools.github_client import GH_REPO_NAME, GH_UPLOAD_WORKERS, counted
+from tools.repo_tree_index import set_head
+from tools.tracing import traced
 
-load_dotenv()
-GH_REPO_KEY = os.getenv("GH_REPO_KEY")
+
+class FileChange(BaseModel):
+    path: str = Field(..., description="Path to the file to commit")
+    content: str = Field(..., description="Content of the file to commit")
 
 
 class CommitCodeInput(BaseModel):
     branch_name: str = Field(..., description="Name of the branch to commit to")
-    path: str = Field(..., description="Path to the file to commit")
-    content: str = Field(..., description="Content of the file to commit")
+    path: Optional[str] = Field(None, description="Path to the file to commit")
+    content: Optional[str] = Field(None, description="Content of the file to commit")
     commit_msg: str = Field(..., description="Commit message")
+    files: Optional[list[FileChange]] = Field(
+        None,
+        description="Batch mode: list of {path, content} pairs committed together as one commit",
+    )
+
+
+def git_blob_sha(content: str) -> str:
+    """Computes the SHA git assigns to a blob with the given content."""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _normalize(files: list) -> dict[str, str]:
+    changes = {}
+    for file in files:
+        if isinstance(file, dict):
+            file = FileChange(**file)
+        changes[file.path.lstrip("/")] = file.content
+    return changes
+
+
+def _changed_paths(changes: dict[str, str], existing_shas: dict[str, str]) -> list[str]:
+    """Paths whose content differs from the blob already in the head tree."""
+    return [
+        path
+        for path, content in changes.items()
+        if existing_shas.get(path) != git_blob_sha(content)
+    ]
 
 
 class GithubCommitCodeTool(BaseTool):
     name: str = "GitHub Commit Code Tool"
-    description: str = "Commit code to a GitHub repository, creating or updating files in a specified branch."
+    description: str = (
+        "Commit code to a GitHub repository, creating or updating files in a specified branch. "
+        "Pass 'files' to commit many files at once as a single commit."
+    )
     args_schema: Type[BaseModel] = CommitCodeInput
 
-    def _run(self, branch_name: str, path: str, content: str, commit_msg: str):
-        github = Github(GH_REPO_KEY)
-        repo = github.get_repo("davidjaesch/osa")
+    @traced()
+    def _run(
+        self,
+        branch_name: str,
+        path: Optional[str] = None,
+        content: Optional[str] = None,
+        commit_msg: str = "",
+        files: Optional[list] = None,
+    ):
+        return run_sync(self._commit(branch_name, path, content, commit_msg, files))
+
+    @traced()
+    async def _arun(
+        self,
+        branch_name: str,
+        path: Optional[str] = None,
+        content: Optional[str] = None,
+        commit_msg: str = "",
+        files: Optional[list] = None,
+    ):
+        return await self._commit(branch_name, path, content, commit_msg, files)
+
+    @counted
+    async def _commit(
+        self,
+        branch_name: str,
+        path: Optional[str],
+        content: Optional[str],
+        commit_msg: str,
+        files: Optional[list],
+    ) -> str:
+        repo_path = f"/repos/{GH_REPO_NAME}"
+        if files:
+            return await self._commit_batch(repo_path, branch_name, files, commit_msg)
+        if path is None or content is None:
+            raise ValueError("Either 'files' or both 'path' and 'content' are required.")
+        payload = {
+            "message": commit_msg,
+            "content": base64.b64encode(content.encode("utf-8")).decode("ascii"),
+            "branch": branch_name,
+        }
         try:
-            existing_file = repo.get_contents(path, ref=branch_name)
-            repo.update_file(
-                path, commit_msg, content, existing_file.sha, branch=branch_name
+            existing = await github_request(
+                "GET", f"{repo_path}/contents/{path}", params={"ref": branch_name}
             )
-            return f"Updated {path} in branch {branch_name}"
-        except Exception:
-            repo.create_file(path, commit_msg, content, branch=branch_name)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            response = await github_request("PUT", f"{repo_path}/contents/{path}", json=payload)
+            set_head(GH_REPO_NAME, branch_name, response.json().get("commit", {}).get("sha"))
             return f"Created {path} in branch {branch_name}"
+        payload["sha"] = existing.json()["sha"]
+        response = await github_request("PUT", f"{repo_path}/contents/{path}", json=payload)
+        set_head(GH_REPO_NAME, branch_name, response.json().get("commit", {}).get("sha"))
+        return f"Updated {path} in branch {branch_name}"
+
+    async def _commit_batch(
+        self, repo_path: str, branch_name: str, files: list, commit_msg: str
+    ) -> str:
+        """
+        Writes all files as one commit through the Git data API:
+        upload blobs concurrently, build a tree on top of the branch head,
+        create the commit and move the branch ref.
+        Files whose blob SHA already matches the head tree are skipped.
+        """
+        changes = _normalize(files)
+        ref = (await github_request("GET", f"{repo_path}/git/ref/heads/{branch_name}")).json()
+        head_sha = ref["object"]["sha"]
+        head = (await github_request("GET", f"{repo_path}/git/commits/{head_sha}")).json()
+        tree = (
+            await github_request(
+                "GET",
+                f"{repo_path}/git/trees/{head['tree']['sha']}",
+                params={"recursive": "1"},
+            )
+        ).json()
+        existing = {e["path"]: e for e in tree["tree"] if e["type"] == "blob"}
+        changed = _changed_paths(changes, {p: e["sha"] for p, e in existing.items()})
+        skipped = len(changes) - len(changed)
+        if not changed:
+            return f"No changes to commit in branch {branch_name} ({skipped} files unchanged)"
+
+        async def upload(path: str) -> str:
+            response = await github_request(
+                "POST",
+                f"{repo_path}/git/blobs",
+                json={"content": changes[path], "encoding": "utf-8"},
+            )
+            return response.json()["sha"]
+
+        blob_shas = await fan_out(upload, changed, limit=GH_UPLOAD_WORKERS)
+        new_tree = (
+            await github_request(
+                "POST",
+                f"{repo_path}/git/trees",
+                json={
+                    "base_tree": head["tree"]["sha"],
+                    "tree": [
+                        {
+                            "path": path,
+                            "mode": existing[path]["mode"] if path in existing else "100644",
+                            "type": "blob",
+                            "sha": sha,
+                        }
+                        for path, sha in zip(changed, blob_shas)
+                    ],
+                },
+            )
+        ).json()
+        commit = (
+            await github_request(
+                "POST",
+                f"{repo_path}/git/commits",
+                json={"message": commit_msg, "tree": new_tree["sha"], "parents": [head_sha]},
+            )
+        ).json()
+        await github_request(
+            "PATCH", f"{repo_path}/git/refs/heads/{branch_name}", json={"sha": commit["sha"]}
+        )
+        set_head(GH_REPO_NAME, branch_name, commit["sha"])
+        return (
+            f"Committed {len(changed)} files to branch {branch_name} as {commit['sha'][:7]} "
+            f"({skipped} unchanged files skipped)"
+        )
@@ -1,13 +1,11 @@
-import os
 from typing import Type
 
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from github import Github
 from pydantic import BaseModel, Field
-
-load_dotenv()
-GH_REPO_KEY = os.getenv("GH_REPO_KEY")
+from tools.async_http import github_request, run_sync
+from tools.github_client import GH_REPO_NAME, counted
+from tools.repo_tree_index import set_head
+from tools.tracing import traced
 
 
 class CreateBranchInput(BaseModel):
@@ -22,9 +20,21 @@ class GithubCreateBranchTool(BaseTool):
     description: str = "Create a new Git branch from an existing base branch."
     args_schema: Type[BaseModel] = CreateBranchInput
 
+    @traced()
     def _run(self, branch_name: str, base: str = "main"):
-        github = Github(GH_REPO_KEY)
-        repo = github.get_repo("davidjaesch/osa")
-        ref = repo.get_branch(base)
-        repo.create_git_ref(ref=f"refs/heads/{branch_name}", sha=ref.commit.sha)
+        return run_sync(self._create_branch(branch_name, base))
+
+    @traced()
+    async def _arun(self, branch_name: str, base: str = "main"):
+        return await self._create_branch(branch_name, base)
+
+    @counted
+    async def _create_branch(self, branch_name: str, base: str) -> str:
+        repo_path = f"/repos/{GH_REPO_NAME}"
+        ref = await github_request("GET", f"{repo_path}/git/ref/heads/{base}")
+        sha = ref.json()["object"]["sha"]
+        await github_request(
+            "POST", f"{repo_path}/git/refs", json={"ref": f"refs/heads/{branch_name}", "sha": sha}
+        )
+        set_head(GH_REPO_NAME, branch_name, sha)
         return f"Branch '{branch_name}' created from '{base}'"
@@ -1,13 +1,10 @@
-import os
 from typing import Type
 
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from github import Github
 from pydantic import BaseModel, Field
-
-load_dotenv()
-GH_REPO_KEY = os.getenv("GH_REPO_KEY")
+from tools.async_http import github_request, run_sync
+from tools.github_client import GH_REPO_NAME, counted
+from tools.tracing import traced
 
 
 class CreatePullRequestInput(BaseModel):
@@ -27,8 +24,19 @@ class GithubCreatePullRequestTool(BaseTool):
     description: str = "Manage GitHub branches, commits and pull requests"
     args_schema: Type[BaseModel] = CreatePullRequestInput
 
+    @traced()
     def _run(self, title: str, body: str, head: str, base: str = "main"):
-        github = Github(GH_REPO_KEY)
-        repo = github.get_repo("davidjaesch/osa")
-        pr = repo.create_pull(title=title, body=body, head=head, base=base)
-        return f"PR created: {pr.html_url}"
+        return run_sync(self._create_pull_request(title, body, head, base))
+
+    @traced()
+    async def _arun(self, title: str, body: str, head: str, base: str = "main"):
+        return await self._create_pull_request(title, body, head, base)
+
+    @counted
+    async def _create_pull_request(self, title: str, body: str, head: str, base: str) -> str:
+        response = await github_request(
+            "POST",
+            f"/repos/{GH_REPO_NAME}/pulls",
+            json={"title": title, "body": body, "head": head, "base": base},
+        )
+        return f"PR created: {response.json()['html_url']}"
@@ -1,31 +1,67 @@
-import os
-from typing import Type
+from typing import Optional, Type
 
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from github import Github
 from pydantic import BaseModel, Field
-
-load_dotenv()
-GH_REPO_KEY = os.getenv("GH_REPO_KEY")
+from tools.async_http import github_request, run_sync
+from tools.github_client import GH_REPO_NAME, counted
+from tools.issue_store import IssueStore
+from tools.notion_issue_sync import NOTION_SYNC_LABELS, issues_by_page, marker
+from tools.tracing import traced
 
 
 class GitHubIssueInput(BaseModel):
     title: str = Field(..., description="Title of the issue")
     body: str = Field(..., description="Content/Description of the issue")
+    notion_page_id: Optional[str] = Field(
+        None,
+        description="ID of the Notion page the issue is created from; "
+        "the page's existing issue is updated instead of creating a second one",
+    )
 
 
 class GithubIssueCreateTool(BaseTool):
     name: str = "GitHub Issue Create Tool"
-    description: str = "Creates GitHub issues from fetched Notion tables."
+    description: str = (
+        "Creates GitHub issues from fetched Notion tables. "
+        "Never creates duplicates: an open issue with the same title, or the issue of the same "
+        "Notion page, is reused. To sync a whole Notion table use the Notion Issue Sync Tool."
+    )
     args_schema: Type[BaseModel] = GitHubIssueInput
 
-    def _run(self, title: str, body: str) -> None:
-        self._create_issue(title=title, body=body)
+    @traced()
+    def _run(self, title: str, body: str, notion_page_id: Optional[str] = None) -> str:
+        return run_sync(self._create_issue(title, body, notion_page_id))
+
+    @traced()
+    async def _arun(self, title: str, body: str, notion_page_id: Optional[str] = None) -> str:
+        return await self._create_issue(title, body, notion_page_id)
 
-    def _create_issue(self, title: str, body: str) -> None:
-        """Creates a GitHub issue from the agent's result."""
-        g = Github(GH_REPO_KEY)
-        repo = g.get_repo("davidjaesch/osa")
+    @counted
+    async def _create_issue(self, title: str, body: str, notion_page_id: Optional[str]) -> str:
+        """Creates a GitHub issue from the agent's result, unless it already exists."""
+        store = IssueStore(GH_REPO_NAME)
+        await store.async_sync()
+        if notion_page_id:
+            if marker(notion_page_id) not in body:
+                body = f"{body}\n\n{marker(notion_page_id)}"
+            existing = issues_by_page(store).get(notion_page_id)
+            if existing is not None:
+                if (existing.title, existing.body) == (title, body):
+                    return f"Issue #{existing.number} for this Notion page is up to date"
+                await github_request(
+                    "PATCH",
+                    f"/repos/{GH_REPO_NAME}/issues/{existing.number}",
+                    json={"title": title, "body": body},
+                )
+                return f"Updated issue #{existing.number} of this Notion page"
+        else:
+            same = [i for i in store.query() if i.title.strip().lower() == title.strip().lower()]
+            if same:
+                return f"Issue #{same[0].number} with this title already exists"
 
-        repo.create_issue(title=title, body=body, labels=["automated", "from-notion"])
+        response = await github_request(
+            "POST",
+            f"/repos/{GH_REPO_NAME}/issues",
+            json={"title": title, "body": body, "labels": NOTION_SYNC_LABELS},
+        )
+        return f"Created issue #{response.json()['number']}"
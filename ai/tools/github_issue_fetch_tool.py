@@ -1,21 +1,110 @@
-import os
+from typing import Optional, Type
 
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from github import Github
+from pydantic import BaseModel, Field
+from tools.async_http import run_sync
+from tools.github_client import GH_REPO_NAME, counted
+from tools.issue_store import IssueStore, priority_rank
+from tools.output_budget import CURSOR_DESCRIPTION, paginate, table, token_budget
+from tools.tracing import traced
 
-load_dotenv()
-GH_REPO_KEY = os.getenv("GH_REPO_KEY")
+
+class IssueFetchInput(BaseModel):
+    number: Optional[int] = Field(
+        None, description="Issue number to show in full, including its description"
+    )
+    label: Optional[str] = Field(None, description="Only list issues with this label")
+    priority: Optional[str] = Field(
+        None,
+        description="Only list issues with at least this priority (critical, high, medium, low)",
+    )
+    limit: int = Field(20, description="Maximum number of issues per page")
+    cursor: Optional[str] = Field(None, description=CURSOR_DESCRIPTION)
 
 
 class GithubIssueFetchTool(BaseTool):
     name: str = "GitHub List Project Issues Tool"
     description: str = (
-        "Lists all open issues from a repo – e.g., for project or board analysis."
+        "Lists open issues from a repo sorted by priority (most urgent first) – "
+        "e.g., for project or board analysis, as one table row per issue. "
+        "Pass 'number' to read one issue in full and the returned cursor to get the next page."
     )
+    args_schema: Type[BaseModel] = IssueFetchInput
+
+    @traced()
+    def _run(
+        self,
+        number: Optional[int] = None,
+        label: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> str:
+        return run_sync(self._fetch(number, label, priority, limit, cursor))
+
+    @traced()
+    async def _arun(
+        self,
+        number: Optional[int] = None,
+        label: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> str:
+        return await self._fetch(number, label, priority, limit, cursor)
+
+    @counted
+    async def _fetch(
+        self,
+        number: Optional[int],
+        label: Optional[str],
+        priority: Optional[str],
+        limit: int,
+        cursor: Optional[str],
+    ) -> str:
+        store = IssueStore(GH_REPO_NAME)
+        await store.async_sync()
+        return self._format(store, number, label, priority, limit, cursor)
+
+    def _format(
+        self,
+        store: IssueStore,
+        number: Optional[int],
+        label: Optional[str],
+        priority: Optional[str],
+        limit: int,
+        cursor: Optional[str],
+    ) -> str:
+        budget = token_budget(type(self).__name__)
+        if number is not None:
+            issue = store.get(number)
+            if issue is None:
+                return f"Issue #{number} not found"
+            return paginate(
+                issue.body.splitlines(),
+                budget,
+                cursor,
+                query={"number": number},
+                header=(
+                    f"#{issue.number}: {issue.title}\n"
+                    f"State: {issue.state} | Priority: {issue.priority_name} | "
+                    f"Labels: {', '.join(issue.labels) or '-'}\n"
+                ),
+            )
 
-    def _run(self) -> str:
-        g = Github(GH_REPO_KEY)
-        repo = g.get_repo("davidjaesch/osa")
-        issues = repo.get_issues(state="open")
-        return "\n".join(f"#{i.number}: {i.title}" for i in issues)
+        issues = store.query(
+            label=label,
+            max_priority=priority_rank(priority) if priority else None,
+        )
+        header, rows = table(
+            ("#", "priority", "title", "labels"),
+            [(i.number, i.priority_name, i.title, ",".join(i.labels) or "-") for i in issues],
+        )
+        return paginate(
+            rows,
+            budget,
+            cursor,
+            query={"label": label, "priority": priority},
+            header=header,
+            max_rows=limit,
+        )
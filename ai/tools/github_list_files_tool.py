@@ -1,26 +1,93 @@
-import os
-from typing import Type
+from typing import Optional, Type
 
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from github import Github
 from pydantic import BaseModel, Field
-
-load_dotenv()
-GH_REPO_KEY = os.getenv("GH_REPO_KEY")
+from tools.async_http import github_request, run_sync
+from tools.github_client import GH_REPO_NAME, counted
+from tools.output_budget import CURSOR_DESCRIPTION, directory_tree, paginate, token_budget
+from tools.repo_tree_index import RepoTreeIndex
+from tools.tracing import traced
 
 
 class ListFilesInput(BaseModel):
-    path: str = Field(..., description="Path to the directory to list files from")
+    path: str = Field("", description="Path to the directory to list files from")
+    recursive: bool = Field(
+        False, description="List all files below the path, not just the direct children"
+    )
+    pattern: Optional[str] = Field(
+        None, description="Optional glob to filter paths, e.g. '*.py' or 'ai/tools/*'"
+    )
+    ref: str = Field("main", description="Branch to list files from")
+    cursor: Optional[str] = Field(None, description=CURSOR_DESCRIPTION)
 
 
 class GithubListFilesTool(BaseTool):
     name: str = "GitHub List Files Tool"
-    description: str = "List files in a GitHub repository"
+    description: str = (
+        "List files in a GitHub repository. "
+        "Use recursive=True to get the whole project layout; files are grouped per "
+        "directory ('dir/: a.py, b.py', subdirectories end with '/'). Long listings are "
+        "split into pages, pass the returned cursor to get the next one."
+    )
     args_schema: Type[BaseModel] = ListFilesInput
 
-    def _run(self, path: str = ""):
-        github = Github(GH_REPO_KEY)
-        repo = github.get_repo("davidjaesch/osa")
-        contents = repo.get_contents(path)
-        return [file.path for file in contents]
+    @traced()
+    def _run(
+        self,
+        path: str = "",
+        recursive: bool = False,
+        pattern: Optional[str] = None,
+        ref: str = "main",
+        cursor: Optional[str] = None,
+    ) -> str:
+        return run_sync(self._list(path, recursive, pattern, ref, cursor))
+
+    @traced()
+    async def _arun(
+        self,
+        path: str = "",
+        recursive: bool = False,
+        pattern: Optional[str] = None,
+        ref: str = "main",
+        cursor: Optional[str] = None,
+    ) -> str:
+        return await self._list(path, recursive, pattern, ref, cursor)
+
+    @counted
+    async def _list(
+        self, path: str, recursive: bool, pattern: Optional[str], ref: str, cursor: Optional[str]
+    ) -> str:
+        truncated = False
+        if recursive or pattern:
+            index = await RepoTreeIndex.aload(GH_REPO_NAME, ref)
+            paths, truncated = index.files(path, pattern), index.truncated
+        else:
+            response = await github_request(
+                "GET", f"/repos/{GH_REPO_NAME}/contents/{path}", params={"ref": ref}
+            )
+            paths = [
+                file["path"] + ("/" if file["type"] == "dir" else "") for file in response.json()
+            ]
+        return self._format(paths, cursor, path, recursive, pattern, ref, truncated)
+
+    def _format(
+        self,
+        paths: list[str],
+        cursor: Optional[str],
+        path: str,
+        recursive: bool,
+        pattern: Optional[str],
+        ref: str,
+        truncated: bool = False,
+    ) -> str:
+        header = f"{len(paths)} entries"
+        if truncated:
+            # GitHub cuts recursive trees off at 100,000 entries or 7 MB.
+            header += " (GitHub truncated the tree, so some are missing; list subdirectories non-recursively)"
+        return paginate(
+            directory_tree(paths),
+            token_budget(type(self).__name__),
+            cursor,
+            query={"path": path, "recursive": recursive, "pattern": pattern, "ref": ref},
+            header=header,
+        )
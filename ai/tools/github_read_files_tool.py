@@ -0,0 +1,65 @@
+from typing import Optional, Type
+
+import httpx
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from tools.async_http import fan_out, github_request, run_sync
+from tools.github_client import GH_REPO_NAME, counted
+from tools.output_budget import (
+    CURSOR_DESCRIPTION,
+    TOOL_OUTPUT_TOKENS,
+    paginate,
+    token_budget,
+)
+from tools.tracing import traced
+
+# File contents are what the agents work on, so they get a larger default budget.
+READ_FILES_TOKENS = 3 * TOOL_OUTPUT_TOKENS
+
+
+class ReadFilesInput(BaseModel):
+    paths: list[str] = Field(..., description="Paths of the files to read")
+    ref: str = Field("main", description="Branch to read the files from")
+    cursor: Optional[str] = Field(None, description=CURSOR_DESCRIPTION)
+
+
+class GithubReadFilesTool(BaseTool):
+    name: str = "GitHub Read Files Tool"
+    description: str = (
+        "Reads the contents of one or more files from the GitHub repository in a single call. "
+        "Long results are split into pages, pass the returned cursor to get the next one."
+    )
+    args_schema: Type[BaseModel] = ReadFilesInput
+
+    @traced()
+    def _run(self, paths: list[str], ref: str = "main", cursor: Optional[str] = None) -> str:
+        return run_sync(self._read(paths, ref, cursor))
+
+    @traced()
+    async def _arun(self, paths: list[str], ref: str = "main", cursor: Optional[str] = None) -> str:
+        return await self._read(paths, ref, cursor)
+
+    @counted
+    async def _read(self, paths: list[str], ref: str, cursor: Optional[str] = None) -> str:
+        """Fetches all files concurrently on the shared async client."""
+        async def read(path: str) -> str:
+            try:
+                response = await github_request(
+                    "GET",
+                    f"/repos/{GH_REPO_NAME}/contents/{path.lstrip('/')}",
+                    params={"ref": ref},
+                    headers={"Accept": "application/vnd.github.raw+json"},
+                )
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 404:
+                    raise
+                return f"=== {path}\n(not found)"
+            return f"=== {path}\n{response.text}"
+
+        text = "\n\n".join(await fan_out(read, paths))
+        return paginate(
+            text.splitlines(),
+            token_budget(type(self).__name__, default=READ_FILES_TOKENS),
+            cursor,
+            query={"paths": paths, "ref": ref},
+        )
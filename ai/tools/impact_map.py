@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tools.env import load_env
+from tools.local_cache import cache_path
+
+load_env()
+# Every n-th run executes the whole suite, whatever changed.
+TEST_IMPACT_FULL_EVERY = int(os.getenv("TEST_IMPACT_FULL_EVERY", "5"))
+
+RUNNER = Path(__file__).with_name("impact_runner.py")
+# Changes to these files can affect any test.
+FULL_RUN_TRIGGERS = {"conftest.py", "pyproject.toml", "setup.cfg", "pytest.ini", "tox.ini", "uv.lock"}
+_SKIP_DIRS = {".git", ".venv", "venv", "__pycache__", ".cache", ".pytest_cache", "node_modules"}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Selection:
+    full: bool
+    reason: str
+    changed: list[str] = field(default_factory=list)
+    deselect: list[str] = field(default_factory=list)
+    saved_seconds: float = 0.0
+
+
+class ImpactMap:
+    """
+    Maps every test to the files it executed, recorded with per-test coverage
+    contexts, together with the content hashes of the files at that time.
+    A test is affected when one of its files, or its own test file, changed.
+    Files that ran while the session started up (conftest, plugins and what
+    they import) belong to no test, so a change to them runs the whole suite.
+    A module imported by several test files counts for the first one only,
+    which the periodic full run makes up for.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = cache_path(
+            "test_impact", hashlib.sha256(str(root).encode("utf-8")).hexdigest()[:16] + ".json"
+        )
+        self.data = json.loads(self.path.read_text()) if self.path.exists() else None
+
+    def snapshot(self) -> dict[str, str]:
+        """Content hashes of all Python and test configuration files below the root."""
+        hashes = {}
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in _SKIP_DIRS and not d.endswith(".egg-info")]
+            for name in files:
+                if name.endswith(".py") or name in FULL_RUN_TRIGGERS:
+                    path = Path(directory, name)
+                    hashes[str(path.relative_to(self.root))] = hashlib.sha1(path.read_bytes()).hexdigest()
+        return hashes
+
+    def select(self, snapshot: dict[str, str], full: bool = False) -> Selection:
+        if self.data is None:
+            return Selection(True, "no impact map yet")
+        old = self.data["files"]
+        changed = sorted(p for p in old.keys() | snapshot.keys() if old.get(p) != snapshot.get(p))
+        if full:
+            return Selection(True, "requested", changed)
+        if self.data["runs_since_full"] + 1 >= TEST_IMPACT_FULL_EVERY:
+            return Selection(True, f"periodic, every {TEST_IMPACT_FULL_EVERY} runs", changed)
+        triggers = [p for p in changed if Path(p).name in FULL_RUN_TRIGGERS]
+        if triggers:
+            return Selection(True, f"{triggers[0]} changed", changed)
+        setup = [p for p in changed if p in self.data.get("setup_files", ())]
+        if setup:
+            return Selection(True, f"{setup[0]} changed, it runs at startup", changed)
+
+        changed_set = set(changed)
+        selection = Selection(False, f"{len(changed)} changed files", changed)
+        for nodeid, test in self.data["tests"].items():
+            affected = (
+                test["outcome"] == "failed"
+                or nodeid.split("::")[0] in changed_set
+                or not changed_set.isdisjoint(test["files"])
+            )
+            if not affected:
+                selection.deselect.append(nodeid)
+                selection.saved_seconds += test["duration"]
+        return selection
+
+    def update(self, files: dict[str, str], tests: dict, setup_files: list[str], full_suite: bool) -> None:
+        """
+        Stores the coverage of the tests that just ran. Only a run of the whole
+        suite replaces the map, since only it can tell which tests no longer exist.
+        """
+        known = {} if full_suite or self.data is None else self.data["tests"]
+        if not full_suite and self.data is not None:
+            setup_files = sorted({*self.data.get("setup_files", ()), *setup_files})
+        runs = 0 if full_suite else (self.data or {}).get("runs_since_full", 0) + 1
+        self.data = {
+            "files": files,
+            "tests": {**known, **tests},
+            "setup_files": setup_files,
+            "runs_since_full": runs,
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data))
+        tmp.replace(self.path)
+
+
+def run_tests(pool, root: Path, args: list[str] | None = None, full: bool = False) -> str:
+    """
+    Runs pytest in the sandbox pool, restricted to the tests affected by the
+    files changed since the previous run, and reports what the selection saved.
+    The pool's environment provides pytest and coverage (see SANDBOX_PACKAGES).
+    """
+    impact = ImpactMap(root)
+    snapshot = impact.snapshot()
+    selection = impact.select(snapshot, full)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        request = {
+            "args": args or [],
+            "deselect": selection.deselect,
+            "result_path": str(Path(tmp) / "result.json"),
+        }
+        code = (
+            f"import runpy; runpy.run_path({str(RUNNER)!r}, "
+            f"init_globals={{'REQUEST': {json.dumps(request)!r}}}, run_name='__main__')"
+        )
+        result = pool.run(code)
+        result_path = Path(request["result_path"])
+        outcome = json.loads(result_path.read_text()) if result_path.exists() else None
+
+    # Exit codes 0, 1 and 5 mean the tests ran (or none were collected); only
+    # then the coverage reflects the current files.
+    if outcome is None or outcome["exit_code"] not in (0, 1, 5):
+        return f"{result}\nTest impact: run did not complete, impact map unchanged."
+    # A run restricted by args leaves other tests unchecked, so their files keep
+    # counting as changed until a run of the whole suite.
+    partial = bool(args) and impact.data is not None
+    impact.update(
+        impact.data["files"] if partial else snapshot,
+        outcome["tests"],
+        outcome.get("setup_files", []),
+        full_suite=selection.full and not args,
+    )
+
+    ran = len(outcome["tests"])
+    if selection.full:
+        summary = f"Test impact: full run ({selection.reason}), {ran} tests."
+    else:
+        summary = (
+            f"Test impact: ran {ran} affected tests, skipped {len(selection.deselect)} "
+            f"(~{selection.saved_seconds:.1f}s saved); {selection.reason}; "
+            f"next full run in {TEST_IMPACT_FULL_EVERY - impact.data['runs_since_full']} run(s)."
+        )
+    logger.info(summary)
+    return f"{result}\n{summary}"
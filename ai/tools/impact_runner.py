@@ -0,0 +1,94 @@
+"""
+Runs pytest inside a sandbox worker and records which files every test executed.
+tools.impact_map executes this file through runpy with a REQUEST global
+({"args", "deselect", "result_path"}) and reads back the exit code, the
+files of every test and the setup files run outside any test or test file.
+It needs pytest and coverage in the sandbox environment.
+"""
+
+import json
+import os
+
+import coverage
+import pytest
+
+
+class ImpactPlugin:
+    """
+    Deselects unaffected tests and switches the coverage context per test.
+    Lines run while a test file is imported are recorded under the file's
+    nodeid; lines run before or between files (conftest, plugins) stay in
+    the empty context.
+    """
+
+    def __init__(self, cov: coverage.Coverage, deselect: list[str]):
+        self.cov = cov
+        self.deselect = set(deselect)
+        self.tests: dict[str, dict] = {}
+
+    def pytest_collection_modifyitems(self, config, items):
+        dropped = [item for item in items if item.nodeid in self.deselect]
+        if dropped:
+            config.hook.pytest_deselected(items=dropped)
+            items[:] = [item for item in items if item.nodeid not in self.deselect]
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collectstart(self, collector):
+        if isinstance(collector, pytest.Module):
+            self.cov.switch_context(collector.nodeid)
+
+    def pytest_collectreport(self, report):
+        self.cov.switch_context("")
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        self.cov.switch_context(item.nodeid)
+
+    def pytest_runtest_logreport(self, report):
+        test = self.tests.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0})
+        test["duration"] += report.duration
+        if report.failed:
+            test["outcome"] = "failed"
+        elif report.skipped and test["outcome"] == "passed":
+            test["outcome"] = "skipped"
+
+
+def main(request: dict) -> None:
+    root = os.getcwd()
+    cov = coverage.Coverage(
+        data_file=None,
+        include=[os.path.join(root, "*")],
+        omit=["*/site-packages/*", "*/.venv/*"],
+    )
+    plugin = ImpactPlugin(cov, request["deselect"])
+    cov.start()
+    try:
+        exit_code = pytest.main([*request["args"], "-p", "no:cacheprovider"], plugins=[plugin])
+    finally:
+        cov.stop()
+
+    data = cov.get_data()
+    files_by_test: dict[str, set[str]] = {}
+    for path in data.measured_files():
+        relative = os.path.relpath(path, root)
+        for contexts in data.contexts_by_lineno(path).values():
+            for context in contexts:
+                files_by_test.setdefault(context, set()).add(relative)
+    for nodeid, test in plugin.tests.items():
+        # A test also depends on what its file ran at import time.
+        module = nodeid.split("::")[0]
+        test["files"] = sorted(files_by_test.get(nodeid, set()) | files_by_test.get(module, set()))
+
+    with open(request["result_path"], "w") as f:
+        json.dump(
+            {
+                "exit_code": int(exit_code),
+                "tests": plugin.tests,
+                "setup_files": sorted(files_by_test.get("", ())),
+            },
+            f,
+        )
+
+
+if __name__ == "__main__":
+    main(json.loads(REQUEST))  # noqa: F821 - injected by runpy
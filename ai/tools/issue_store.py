@@ -0,0 +1,227 @@
+import json
+import logging
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Generator
+
+from tools.local_cache import cache_path
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ["critical", "high", "medium", "low"]
+# Issues without a priority label sort after all labelled ones.
+UNPRIORITIZED = len(PRIORITIES)
+_PRIORITY_ALIASES = {
+    "p0": 0,
+    "critical": 0,
+    "p1": 1,
+    "high": 1,
+    "high-priority": 1,
+    "p2": 2,
+    "medium": 2,
+    "p3": 3,
+    "low": 3,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    number INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    state TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    html_url TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_by_priority ON issues (state, priority, updated_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+@dataclass
+class Issue:
+    number: int
+    title: str
+    body: str = ""
+    state: str = "open"
+    labels: list[str] = field(default_factory=list)
+    priority: int = UNPRIORITIZED
+    updated_at: str = ""
+    html_url: str | None = None
+
+    @property
+    def priority_name(self) -> str:
+        return PRIORITIES[self.priority] if self.priority < UNPRIORITIZED else "none"
+
+
+@dataclass
+class SyncResult:
+    requests: int = 0
+    not_modified: int = 0
+    updated: int = 0
+
+
+def priority_from_labels(labels: list[str]) -> int:
+    """
+    Maps labels like 'priority: high', 'P1' or 'high-priority' to a rank,
+    0 being the most urgent. The most urgent matching label wins.
+    """
+    ranks = [UNPRIORITIZED]
+    for label in labels:
+        name = label.lower().removeprefix("priority").strip(" :/-")
+        if name in _PRIORITY_ALIASES:
+            ranks.append(_PRIORITY_ALIASES[name])
+    return min(ranks)
+
+
+def priority_rank(name: str) -> int:
+    """Parses a priority name such as 'high' or 'P1' into its rank."""
+    rank = priority_from_labels([name])
+    if rank == UNPRIORITIZED:
+        raise ValueError(f"Unknown priority '{name}', expected one of {PRIORITIES}")
+    return rank
+
+
+class IssueStore:
+    """
+    Local SQLite copy of a repository's issues.
+    async_sync() only asks GitHub for issues updated since the last sync and
+    sends the stored ETag of every page, so an unchanged backlog costs one 304
+    response.
+    """
+
+    per_page = 100
+
+    def __init__(self, full_name: str):
+        self.full_name = full_name
+        self.path = cache_path("issues", full_name.replace("/", "__") + ".sqlite3")
+        with closing(self._connect()) as db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _meta(self, db, key: str) -> str | None:
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    async def async_sync(self) -> SyncResult:
+        """Pulls changed issues into the store through the shared GitHub client."""
+        from tools.async_http import github_request
+
+        steps = self._sync_steps()
+        try:
+            params, headers = next(steps)
+            while True:
+                response = await github_request(
+                    "GET", f"/repos/{self.full_name}/issues", params=params, headers=headers
+                )
+                data = None if response.status_code == 304 else response.json()
+                params, headers = steps.send((response.headers, data))
+        except StopIteration as done:
+            return done.value
+
+    def _sync_steps(self) -> Generator[tuple[dict, dict | None], tuple, SyncResult]:
+        """
+        The sync protocol without any I/O: yields (params, headers) for the next
+        page request and expects (response headers, JSON body or None on 304) back.
+        """
+        result = SyncResult()
+        with closing(self._connect()) as db, db:
+            since = self._meta(db, "since")
+            params = {
+                "state": "all",
+                "sort": "updated",
+                "direction": "asc",
+                "per_page": self.per_page,
+            }
+            if since:
+                params["since"] = since
+            page = 1
+            while True:
+                page_key = f"page:{since}:{page}"
+                cached = json.loads(self._meta(db, page_key) or "{}")
+                headers, data = yield (
+                    {**params, "page": page},
+                    {"If-None-Match": cached["etag"]} if cached else None,
+                )
+                result.requests += 1
+                if data is None:
+                    # 304: the page is unchanged since we last stored it.
+                    result.not_modified += 1
+                    count = cached["count"]
+                else:
+                    for item in data:
+                        if "pull_request" not in item:
+                            self._upsert(db, item)
+                            result.updated += 1
+                    count = len(data)
+                    if headers.get("etag"):
+                        db.execute(
+                            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                            (page_key, json.dumps({"etag": headers["etag"], "count": count})),
+                        )
+                if count < self.per_page:
+                    break
+                page += 1
+
+            latest = db.execute("SELECT MAX(updated_at) FROM issues").fetchone()[0]
+            if latest and latest != since:
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('since', ?)", (latest,))
+                db.execute("DELETE FROM meta WHERE key LIKE 'page:%' AND key NOT LIKE ?", (f"page:{latest}:%",))
+        logger.info(
+            "Synced %s issues: %d updated, %d of %d pages not modified",
+            self.full_name,
+            result.updated,
+            result.not_modified,
+            result.requests,
+        )
+        return result
+
+    def _upsert(self, db, item: dict) -> None:
+        labels = [label["name"] for label in item.get("labels", [])]
+        db.execute(
+            "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                item["number"],
+                item["title"],
+                item.get("body") or "",
+                item["state"],
+                json.dumps(labels),
+                priority_from_labels(labels),
+                item["updated_at"],
+                item.get("html_url"),
+            ),
+        )
+
+    def query(
+        self,
+        state: str = "open",
+        label: str | None = None,
+        max_priority: int | None = None,
+        limit: int | None = None,
+    ) -> list[Issue]:
+        """Returns issues sorted by priority, most recently updated first within a priority."""
+        sql = "SELECT * FROM issues WHERE state = ?"
+        args: list = [state]
+        if max_priority is not None:
+            sql += " AND priority <= ?"
+            args.append(max_priority)
+        sql += " ORDER BY priority ASC, updated_at DESC"
+        with closing(self._connect()) as db:
+            issues = [self._row_to_issue(row) for row in db.execute(sql, args)]
+        if label:
+            issues = [i for i in issues if label.lower() in (l.lower() for l in i.labels)]
+        return issues[:limit] if limit else issues
+
+    def get(self, number: int) -> Issue | None:
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT * FROM issues WHERE number = ?", (number,)).fetchone()
+        return self._row_to_issue(row) if row else None
+
+    @staticmethod
+    def _row_to_issue(row) -> Issue:
+        number, title, body, state, labels, priority, updated_at, html_url = row
+        return Issue(number, title, body, state, json.loads(labels), priority, updated_at, html_url)
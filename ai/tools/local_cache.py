@@ -0,0 +1,15 @@
+import os
+from pathlib import Path
+
+from tools.env import load_env
+
+load_env()
+# Resolved once, so the cache stays put when a worker changes its working directory.
+OSA_CACHE_DIR = Path(os.getenv("OSA_CACHE_DIR", ".cache/osa")).resolve()
+
+
+def cache_path(*parts: str) -> Path:
+    """Returns a path below the local cache directory, creating its parent."""
+    path = OSA_CACHE_DIR.joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
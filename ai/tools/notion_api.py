@@ -0,0 +1,29 @@
+import os
+import threading
+
+from notion_client import Client
+from tools.env import load_env
+
+load_env()
+NOTION_API_KEY = os.getenv("NOTION_API_KEY")
+NOTION_DB_ID = os.getenv("NOTION_DB_ID")
+NOTION_API_URL = os.getenv("NOTION_API_URL", "https://api.notion.com")
+NOTION_TIMEOUT_MS = int(os.getenv("NOTION_TIMEOUT_MS", "60000"))
+
+_lock = threading.Lock()
+_notion: Client | None = None
+
+
+def get_notion() -> Client:
+    """Returns the process-wide Notion client, so its HTTP session is reused."""
+    global _notion
+    if not NOTION_API_KEY or not NOTION_DB_ID:
+        raise ValueError("Missing NOTION_API_KEY or NOTION_DB_ID in environment.")
+    with _lock:
+        if _notion is None:
+            _notion = Client(
+                auth=NOTION_API_KEY,
+                base_url=NOTION_API_URL,
+                timeout_ms=NOTION_TIMEOUT_MS,
+            )
+        return _notion
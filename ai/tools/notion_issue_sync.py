@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+
+import httpx
+from tools.async_http import ASYNC_FAN_OUT, github_request, notion_async_client, run_sync
+from tools.env import load_env
+from tools.github_client import GH_REPO_NAME
+from tools.issue_store import Issue, IssueStore
+from tools.local_cache import cache_path
+from tools.notion_api import NOTION_DB_ID, get_notion
+from tools.notion_table_fetch_tool import aiter_new_ideas
+
+load_env()
+NOTION_SYNC_LABELS = [l for l in os.getenv("NOTION_SYNC_LABELS", "automated,from-notion").split(",") if l]
+
+# Hidden in the rendered issue body; identifies the Notion page an issue was created from.
+MARKER_RE = re.compile(r"<!-- notion-page-id: ([0-9A-Za-z-]+) -->")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS synced (
+    page_id TEXT PRIMARY KEY,
+    issue_number INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def marker(page_id: str) -> str:
+    return f"<!-- notion-page-id: {page_id} -->"
+
+
+def page_id_of(body: str) -> str | None:
+    found = MARKER_RE.search(body or "")
+    return found.group(1) if found else None
+
+
+def render(idea: dict) -> tuple[str, str]:
+    """Title and body of the issue for a Notion idea (see notion_table_fetch_tool._compact_idea)."""
+    details = [
+        f"**{name}:** {idea[key]}"
+        for name, key in (("Category", "category"), ("Complexity", "complexity"), ("TRL", "trl"), ("Tags", "tags"))
+        if idea.get(key)
+    ]
+    if idea.get("url"):
+        details.append(f"**Notion:** {idea['url']}")
+    body = "\n\n".join(part for part in (idea.get("description", ""), "\n".join(details)) if part)
+    return idea.get("title") or "Untitled idea", f"{body}\n\n{marker(idea['id'])}"
+
+
+def content_hash(title: str, body: str) -> str:
+    return hashlib.sha1(f"{title}\0{body}".encode("utf-8")).hexdigest()
+
+
+def issues_by_page(store: IssueStore) -> dict[str, Issue]:
+    """Page ID -> the oldest issue, open or closed, whose body carries the page's marker."""
+    pages: dict[str, Issue] = {}
+    for state in ("open", "closed"):
+        for issue in store.query(state=state):
+            page_id = page_id_of(issue.body)
+            if page_id and (page_id not in pages or issue.number < pages[page_id].number):
+                pages[page_id] = issue
+    return pages
+
+
+@dataclass
+class IdeaSyncResult:
+    ideas: int = 0
+    created: list[int] = field(default_factory=list)
+    updated: list[int] = field(default_factory=list)
+    unchanged: int = 0
+    failed: list[str] = field(default_factory=list)
+
+    @property
+    def writes(self) -> int:
+        return len(self.created) + len(self.updated)
+
+    def __str__(self) -> str:
+        text = (
+            f"Synced {self.ideas} Notion ideas: {len(self.created)} issues created "
+            f"{self.created or ''}, {len(self.updated)} updated {self.updated or ''}, "
+            f"{self.unchanged} unchanged"
+        )
+        if self.failed:
+            text += f", {len(self.failed)} failed:\n" + "\n".join(self.failed)
+        return text
+
+
+class NotionIssueSync:
+    """
+    Mirrors the new ideas of the Notion database into GitHub issues, one issue
+    per page. Issues are matched by the page ID hidden in their body, so a
+    page never gets a second issue, even if the local state is lost.
+    The state remembers which issue every page maps to and the hash of what
+    was written, and the newest edit time seen in Notion. A rerun only asks
+    Notion for pages edited since then and only writes what changed, so an
+    unchanged database costs no write calls at all.
+    """
+
+    def __init__(self, full_name: str = GH_REPO_NAME, database_id: str = NOTION_DB_ID):
+        self.full_name = full_name
+        self.database_id = database_id
+        self.store = IssueStore(full_name)
+        self.path = cache_path(
+            "notion_sync", f"{database_id}__{full_name.replace('/', '__')}.sqlite3"
+        )
+        with closing(self._connect()) as db:
+            db.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def run(self, full: bool = False) -> IdeaSyncResult:
+        return run_sync(self.arun(full))
+
+    async def arun(self, full: bool = False) -> IdeaSyncResult:
+        """
+        Syncs ideas edited since the previous run, or with `full` all of them.
+        Writes start while Notion is still being paged and run concurrently,
+        at most ASYNC_FAN_OUT at a time, within the GitHub rate limits.
+        """
+        get_notion()  # validates the configuration
+        await self.store.async_sync()
+        existing = issues_by_page(self.store)
+        result = IdeaSyncResult()
+        semaphore = asyncio.Semaphore(ASYNC_FAN_OUT)
+        writes = []
+        with closing(self._connect()) as db:
+            synced = {
+                page_id: (number, digest)
+                for page_id, number, digest in db.execute("SELECT * FROM synced")
+            }
+            row = db.execute("SELECT value FROM meta WHERE key = 'edited_after'").fetchone()
+            edited_after = None if full or row is None else row[0]
+            latest = edited_after or ""
+
+            async for idea in aiter_new_ideas(notion_async_client(), self.database_id, edited_after):
+                result.ideas += 1
+                latest = max(latest, idea["last_edited_time"])
+                title, body = render(idea)
+                digest = content_hash(title, body)
+                known = synced.get(idea["id"])
+                if known and known[1] == digest:
+                    result.unchanged += 1
+                    continue
+                issue = self.store.get(known[0]) if known else existing.get(idea["id"])
+                if issue is not None and (
+                    issue.state == "closed" or content_hash(issue.title, issue.body) == digest
+                ):
+                    # Already up to date, or done and not worth editing.
+                    self._remember(db, idea["id"], issue.number, digest)
+                    result.unchanged += 1
+                    continue
+                writes.append(
+                    asyncio.create_task(
+                        self._write(semaphore, db, idea["id"], issue, title, body, digest, result)
+                    )
+                )
+            await asyncio.gather(*writes)
+
+            # Failed pages are fetched again next time, since the watermark stays put.
+            if latest and not result.failed:
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('edited_after', ?)", (latest,))
+                db.commit()
+        logger.info("%s", result)
+        return result
+
+    async def _write(
+        self,
+        semaphore: asyncio.Semaphore,
+        db: sqlite3.Connection,
+        page_id: str,
+        issue: Issue | None,
+        title: str,
+        body: str,
+        digest: str,
+        result: IdeaSyncResult,
+    ) -> None:
+        async with semaphore:
+            try:
+                if issue is not None:
+                    try:
+                        await github_request(
+                            "PATCH",
+                            f"/repos/{self.full_name}/issues/{issue.number}",
+                            json={"title": title, "body": body},
+                        )
+                        number = issue.number
+                        result.updated.append(number)
+                    except httpx.HTTPStatusError as e:
+                        if e.response.status_code not in (404, 410):
+                            raise
+                        issue = None  # deleted on GitHub, create it again
+                if issue is None:
+                    response = await github_request(
+                        "POST",
+                        f"/repos/{self.full_name}/issues",
+                        json={"title": title, "body": body, "labels": NOTION_SYNC_LABELS},
+                    )
+                    number = response.json()["number"]
+                    result.created.append(number)
+            except httpx.HTTPError as e:
+                result.failed.append(f"{title}: {e}")
+                return
+            # Committed per write, so an interrupted run never writes the same page twice.
+            self._remember(db, page_id, number, digest)
+
+    @staticmethod
+    def _remember(db: sqlite3.Connection, page_id: str, number: int, digest: str) -> None:
+        db.execute("INSERT OR REPLACE INTO synced VALUES (?, ?, ?)", (page_id, number, digest))
+        db.commit()
@@ -0,0 +1,29 @@
+from typing import Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from tools.notion_issue_sync import NotionIssueSync
+from tools.tracing import traced
+
+
+class NotionIssueSyncInput(BaseModel):
+    full: bool = Field(
+        False, description="Check every idea, not only those edited since the last sync"
+    )
+
+
+class NotionIssueSyncTool(BaseTool):
+    name: str = "Notion Issue Sync Tool"
+    description: str = (
+        "Creates a GitHub issue for every new idea in the Notion table and updates the issues "
+        "of edited ideas. Ideas that already have an issue are never created twice."
+    )
+    args_schema: Type[BaseModel] = NotionIssueSyncInput
+
+    @traced()
+    def _run(self, full: bool = False) -> str:
+        return str(NotionIssueSync().run(full))
+
+    @traced()
+    async def _arun(self, full: bool = False) -> str:
+        return str(await NotionIssueSync().arun(full))
@@ -1,75 +1,293 @@
-import os
+import json
+from typing import AsyncIterator, Callable, Iterator, Optional, Type
 
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
-from notion_client import Client
+from pydantic import BaseModel, Field
+from tools.async_http import notion_async_client
+from tools.local_cache import cache_path
+from tools.notion_api import NOTION_DB_ID, get_notion
+from tools.output_budget import CURSOR_DESCRIPTION, clip, estimate_tokens, query_key, table, token_budget
+from tools.rate_limit import scheduler
+from tools.tracing import traced
 
-load_dotenv()
-NOTION_API_KEY = os.getenv("NOTION_API_KEY")
-NOTION_DB_ID = os.getenv("NOTION_DB_ID")
+# TRL (was Reifegrad) values that count as a new idea
+TRL_LEVELS = ["Idee", "Ausformuliert"]
+IDEA_PROPERTIES = ["Status", "Description", "Category", "Complexity", "Tags"]
+
+
+class NotionTableFetchInput(BaseModel):
+    incremental: bool = Field(
+        False, description="Only fetch ideas edited since the last incremental run"
+    )
+    cursor: Optional[str] = Field(None, description=CURSOR_DESCRIPTION)
+
+
+def _plain_text(props: dict, name: str) -> str:
+    prop = props.get(name, {})
+    parts = prop.get("rich_text") or prop.get("title") or []
+    return parts[0].get("plain_text", "") if parts else ""
+
+
+def _idea_filter(edited_after: str | None = None) -> dict:
+    """Status == 'Neu' and TRL in TRL_LEVELS, evaluated by Notion instead of locally."""
+    conditions = [
+        {"property": "Status", "rich_text": {"equals": "Neu"}},
+        {"or": [{"property": "TRL", "rich_text": {"equals": trl}} for trl in TRL_LEVELS]},
+    ]
+    if edited_after:
+        conditions.append(
+            {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": edited_after}}
+        )
+    return {"and": conditions}
+
+
+def _query(database_id: str, edited_after: str | None, page_size: int) -> dict:
+    """Oldest edits first, so that a watermark can follow the pages read so far."""
+    return {
+        "database_id": database_id,
+        "filter": _idea_filter(edited_after),
+        "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}],
+        "page_size": page_size,
+    }
+
+
+def iter_idea_pages(
+    notion,
+    database_id: str,
+    edited_after: str | None = None,
+    page_size: int = 100,
+    start_cursor: str | None = None,
+) -> Iterator[tuple[str | None, list[dict], str | None]]:
+    """
+    Streams the Notion database one response at a time, starting at
+    `start_cursor`, as (start cursor, compact ideas, next cursor). The raw
+    page payload is dropped.
+    """
+    query = _query(database_id, edited_after, page_size)
+    while True:
+        if start_cursor:
+            query["start_cursor"] = start_cursor
+        response = scheduler.call("notion", notion.databases.query, **query)
+        next_cursor = response.get("next_cursor") if response.get("has_more") else None
+        yield start_cursor, [_compact_idea(page) for page in response.get("results", [])], next_cursor
+        if next_cursor is None:
+            return
+        start_cursor = next_cursor
+
+
+async def aiter_idea_pages(
+    notion,
+    database_id: str,
+    edited_after: str | None = None,
+    page_size: int = 100,
+    start_cursor: str | None = None,
+) -> AsyncIterator[tuple[str | None, list[dict], str | None]]:
+    """Async counterpart of iter_idea_pages() for a notion_client.AsyncClient."""
+    query = _query(database_id, edited_after, page_size)
+    while True:
+        if start_cursor:
+            query["start_cursor"] = start_cursor
+        response = await scheduler.acall("notion", notion.databases.query, **query)
+        next_cursor = response.get("next_cursor") if response.get("has_more") else None
+        yield start_cursor, [_compact_idea(page) for page in response.get("results", [])], next_cursor
+        if next_cursor is None:
+            return
+        start_cursor = next_cursor
+
+
+def iter_new_ideas(
+    notion, database_id: str, edited_after: str | None = None, page_size: int = 100
+) -> Iterator[dict]:
+    """Streams compact idea records from the Notion database, following next_cursor."""
+    for _, ideas, _ in iter_idea_pages(notion, database_id, edited_after, page_size):
+        yield from ideas
+
+
+async def aiter_new_ideas(
+    notion, database_id: str, edited_after: str | None = None, page_size: int = 100
+) -> AsyncIterator[dict]:
+    """Async counterpart of iter_new_ideas() for a notion_client.AsyncClient."""
+    async for _, ideas, _ in aiter_idea_pages(notion, database_id, edited_after, page_size):
+        for idea in ideas:
+            yield idea
+
+
+def _compact_idea(page: dict) -> dict:
+    props = page["properties"]
+    idea = {
+        "id": page["id"],
+        "title": _plain_text(props, "Name"),
+        "trl": _plain_text(props, "TRL"),
+        "url": page.get("url"),
+        "last_edited_time": page.get("last_edited_time", ""),
+    }
+    for name in IDEA_PROPERTIES:
+        idea[name.lower()] = _plain_text(props, name)
+    return idea
+
+
+COLUMNS = ("title", "category", "complexity", "description")
+
+
+class _Page:
+    """
+    One page of tool output, filled from the Notion responses until the token
+    budget is used up. `resume` is where the next page starts: the Notion
+    cursor of a response and the offset of the next row in it, or None once
+    every response has been read.
+    """
+
+    def __init__(
+        self, budget: int, offset: int, seen: set[tuple[str, str]], row: Callable[[dict], tuple]
+    ):
+        self.header = table(COLUMNS, [])[0]
+        self.lines = [self.header]
+        self.used = estimate_tokens(self.header)
+        self.budget = budget
+        self.offset = offset
+        self.seen = seen
+        self.row = row
+        self.ideas: list[dict] = []
+        self.resume: tuple[str | None, int] | None = None
+
+    def add(self, start_cursor: str | None, ideas: list[dict], next_cursor: str | None) -> bool:
+        """Adds the rows of one Notion response; True once the page is full."""
+        offset, self.offset = self.offset, 0
+        for index in range(offset, len(ideas)):
+            idea = ideas[index]
+            if (idea["id"], idea["last_edited_time"]) in self.seen:
+                continue  # listed by the previous incremental run already
+            line = table(COLUMNS, [self.row(idea)])[1][0]
+            cost = estimate_tokens(line)
+            if self.used + cost > self.budget:
+                if not self.ideas:  # a single oversized row still gets shown, clipped
+                    self.lines.append(clip(line, self.budget - self.used))
+                    self.ideas.append(idea)
+                    index += 1
+                self.resume = (start_cursor, index) if index < len(ideas) else (next_cursor, 0)
+                if self.resume[0] is None and not self.resume[1]:
+                    self.resume = None
+                return True
+            self.lines.append(line)
+            self.used += cost
+            self.ideas.append(idea)
+        return False
 
 
 class NotionTableFetchTool(BaseTool):
     name: str = "Notion Table Fetch Tool"
-    description: str = "Fetches data from a Notion table."
+    description: str = (
+        "Fetches new ideas from a Notion table as one table row per idea. "
+        "Pass the returned cursor to get the next page."
+    )
+    args_schema: Type[BaseModel] = NotionTableFetchInput
 
-    def _run(self) -> str:
-        ideas = self._fetch_new_ideas_from_notion()
+    @traced()
+    def _run(self, incremental: bool = False, cursor: Optional[str] = None) -> str:
+        ideas = self._fetch_new_ideas_from_notion(incremental=incremental, cursor=cursor)
         return ideas
 
-    def _fetch_new_ideas_from_notion(self) -> str:
+    @traced()
+    async def _arun(self, incremental: bool = False, cursor: Optional[str] = None) -> str:
+        get_notion()  # validates the configuration
+        run, row, page = self._start(incremental, cursor)
+        full = False
+        async for response in aiter_idea_pages(
+            notion_async_client(), NOTION_DB_ID, run["edited_after"], start_cursor=run["start_cursor"]
+        ):
+            if full := page.add(*response):
+                break
+        return self._finish(run, row, page, incremental, full)
+
+    def _fetch_new_ideas_from_notion(
+        self, incremental: bool = False, cursor: Optional[str] = None
+    ) -> str:
         """
-        Fetches new ideas from Notion DB, filters by status and maturity (TRL), and formats for CrewAI.
-        Returns a list of dicts suitable for CrewAI tasks.
+        Fetches new ideas from Notion DB, filtered by status and maturity (TRL) on the server,
+        and formats them for CrewAI.
+        In incremental mode only ideas edited since the last incremental run are returned.
+        Notion is only read up to the end of the page, and a cursor resumes at the
+        Notion response that page stopped in.
         """
-        if not NOTION_API_KEY or not NOTION_DB_ID:
-            raise ValueError("Missing NOTION_API_KEY or NOTION_DB_ID in environment.")
-        notion = Client(auth=NOTION_API_KEY)
-        # Query for ideas with Status == 'Neu' (rich_text property)
-        query = {
-            "database_id": NOTION_DB_ID,
-            "filter": {"property": "Status", "rich_text": {"equals": "Neu"}},
-        }
-        response = notion.databases.query(**query)
-        # Filter by TRL (was Reifegrad)
-        ideas = []
-        for page in response.get("results", []):
-            props = page["properties"]
-            trl = ""
-            if props.get("TRL", {}).get("rich_text"):
-                trl = props["TRL"]["rich_text"][0].get("plain_text", "")
-            if trl in ["Idee", "Ausformuliert"]:
-                title = ""
-                if props.get("Name", {}).get("title"):
-                    title = props["Name"]["title"][0].get("plain_text", "")
-                idea = {
-                    "id": page["id"],
-                    "title": title,
-                    "trl": trl,
-                    "status": props.get("Status", {})
-                    .get("rich_text", [{}])[0]
-                    .get("plain_text", ""),
-                    "description": props.get("Description", {})
-                    .get("rich_text", [{}])[0]
-                    .get("plain_text", ""),
-                    "category": props.get("Category", {})
-                    .get("rich_text", [{}])[0]
-                    .get("plain_text", ""),
-                    "complexity": props.get("Complexity", {})
-                    .get("rich_text", [{}])[0]
-                    .get("plain_text", ""),
-                    "tags": props.get("Tags", {})
-                    .get("rich_text", [{}])[0]
-                    .get("plain_text", ""),
-                    "url": page.get("url"),
-                    "raw": page,
-                }
-                ideas.append(self._map_idea_to_task(idea))
-        idea_str = "\n".join(
-            f"{idea['title']}: {idea['description']} [Complexity: {idea['metadata'].get('Complexity', '')}, Category: {idea['metadata'].get('Category', '')}]"
-            for idea in ideas
+        notion = get_notion()
+        run, row, page = self._start(incremental, cursor)
+        full = False
+        for response in iter_idea_pages(
+            notion, NOTION_DB_ID, run["edited_after"], start_cursor=run["start_cursor"]
+        ):
+            if full := page.add(*response):
+                break
+        return self._finish(run, row, page, incremental, full)
+
+    def _state_path(self):
+        return cache_path("notion", f"{NOTION_DB_ID}.json")
+
+    def _load_state(self) -> dict:
+        path = self._state_path()
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def _start(self, incremental: bool, cursor: Optional[str]) -> tuple[dict, int, _Page]:
+        """
+        The run this call belongs to, the number of rows shown before it and an
+        empty page. An incremental run starts at the watermark and skips the
+        ideas already listed at exactly that time, since Notion edit times only
+        have minute precision. Its following pages keep that starting point.
+        """
+        state = self._load_state() if incremental else {}
+        run = state.get("run") if cursor else None
+        if run is None:
+            run = {"edited_after": state.get("last_edited_time"), "seen": state.get("seen", [])}
+        key = query_key({"incremental": incremental, "edited_after": run["edited_after"]})
+        row, offset, start_cursor = 0, 0, None
+        if cursor:
+            cursor_key, row_text, offset_text, notion_cursor = (cursor.split(":", 3) + ["", "", ""])[:4]
+            if cursor_key == key and row_text.isdigit() and offset_text.isdigit():
+                row, offset, start_cursor = int(row_text), int(offset_text), notion_cursor or None
+        run = {**run, "key": key, "start_cursor": start_cursor}
+        seen = {tuple(s) for s in run["seen"]}
+        return run, row, _Page(token_budget(type(self).__name__), offset, seen, self._row)
+
+    def _finish(self, run: dict, row: int, page: _Page, incremental: bool, full: bool) -> str:
+        """
+        Ends the page with a cursor if ideas are left. Ideas come sorted by edit
+        time, so an incremental run moves the watermark to the last idea shown
+        and the next run continues there even if this one stopped early.
+        """
+        if incremental:
+            state = self._load_state()
+            latest = state.get("last_edited_time") or ""
+            seen = [page_id for page_id, _ in state.get("seen", [])]
+            for idea in page.ideas:
+                if idea["last_edited_time"] > latest:
+                    latest, seen = idea["last_edited_time"], [idea["id"]]
+                elif idea["last_edited_time"] == latest:
+                    seen.append(idea["id"])
+            state = {
+                "last_edited_time": latest or None,
+                "seen": [[page_id, latest] for page_id in seen],
+                "run": {"edited_after": run["edited_after"], "seen": run["seen"]},
+            }
+            self._state_path().write_text(json.dumps(state))
+
+        lines = page.lines
+        end = row + len(page.ideas)
+        if full and page.resume:
+            start_cursor, offset = page.resume
+            lines.append(
+                f'[ideas {row + 1}-{end}; pass cursor="{run["key"]}:{end}:{offset}:{start_cursor or ""}" for more]'
+            )
+        elif row and not page.ideas:
+            lines.append(f"[no more ideas, all {row} shown]")
+        return "\n".join(lines)
+
+    def _row(self, idea: dict) -> tuple:
+        task = self._map_idea_to_task(idea)
+        return (
+            task["title"],
+            task["metadata"].get("Category", "") or "-",
+            task["metadata"].get("Complexity", "") or "-",
+            task["description"],
         )
-        return idea_str
 
     def _map_idea_to_task(self, idea: dict) -> dict:
         """
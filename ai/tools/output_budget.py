@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+from itertools import batched
+
+from tools.env import load_env
+
+load_env()
+# Default budget for one tool result; TOOL_OUTPUT_TOKENS_<TOOL CLASS> overrides it per tool.
+TOOL_OUTPUT_TOKENS = int(os.getenv("TOOL_OUTPUT_TOKENS", "2000"))
+# Rough ratio for English text and code; exact counts would need the model's tokenizer.
+CHARS_PER_TOKEN = 4
+
+CURSOR_DESCRIPTION = "Cursor from the end of a previous result to continue where it stopped"
+
+
+def token_budget(tool: str, default: int = TOOL_OUTPUT_TOKENS) -> int:
+    return int(os.getenv(f"TOOL_OUTPUT_TOKENS_{tool.upper()}", default))
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def query_key(query: dict | None) -> str:
+    return hashlib.sha1(json.dumps(query or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:8]
+
+
+def paginate(
+    lines: list[str],
+    budget: int,
+    cursor: str | None = None,
+    query: dict | None = None,
+    header: str | None = None,
+    max_rows: int | None = None,
+) -> str:
+    """
+    Returns as many lines as fit into `budget` tokens, starting at `cursor`,
+    and ends with a cursor for the next page if lines are left.
+    Cursors are bound to the query they came from; a cursor of another query
+    starts over at the first line.
+    """
+    key = query_key(query)
+    start = 0
+    if cursor:
+        cursor_key, _, offset = cursor.partition(":")
+        if cursor_key == key and offset.isdigit():
+            start = min(int(offset), len(lines))
+
+    out = [header] if header else []
+    used = estimate_tokens(header) if header else 0
+    end = start
+    while end < len(lines) and (max_rows is None or end - start < max_rows):
+        cost = estimate_tokens(lines[end])
+        if used + cost > budget:
+            if end == start:  # a single oversized line still gets shown, clipped
+                out.append(clip(lines[end], budget - used))
+                end += 1
+            break
+        out.append(lines[end])
+        used += cost
+        end += 1
+
+    if end < len(lines):
+        out.append(f'[lines {start + 1}-{end} of {len(lines)}; pass cursor="{key}:{end}" for more]')
+    elif start and start >= len(lines):
+        out.append(f"[no more lines, all {len(lines)} shown]")
+    return "\n".join(out)
+
+
+def clip(text: str, budget: int) -> str:
+    limit = max(budget, 1) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f" [... {len(text) - limit} characters cut]"
+
+
+def directory_tree(paths: list[str], per_line: int = 20) -> list[str]:
+    """
+    One line per directory with the names it contains, e.g.
+    'ai/tools/: a.py, b.py', which is far shorter than repeating every full path.
+    """
+    groups: dict[str, list[str]] = defaultdict(list)
+    for path in sorted(paths):
+        directory, _, name = path.rstrip("/").rpartition("/")
+        groups[directory].append(name + ("/" if path.endswith("/") else ""))
+    return [
+        f"{directory or '.'}/: {', '.join(chunk)}"
+        for directory, names in groups.items()
+        for chunk in batched(names, per_line)
+    ]
+
+
+def table(columns: tuple[str, ...], rows: list[tuple]) -> tuple[str, list[str]]:
+    """Pipe-separated rows with one header line, so field names are not repeated per row."""
+
+    def cell(value) -> str:
+        return " ".join(str(value).split()).replace("|", "/")
+
+    return " | ".join(columns), [" | ".join(cell(v) for v in row) for row in rows]
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Mapping
+
+from tools.env import load_env
+from tools.tracing import tracer
+
+load_env()
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))
+RATE_LIMIT_BASE_DELAY = float(os.getenv("RATE_LIMIT_BASE_DELAY", "1"))
+RATE_LIMIT_MAX_DELAY = float(os.getenv("RATE_LIMIT_MAX_DELAY", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServiceLimits:
+    rate: float  # sustained requests per second
+    burst: int  # bucket capacity
+    concurrency: int  # requests in flight at once
+
+    @classmethod
+    def from_env(cls, service: str, rate: float, burst: int, concurrency: int):
+        prefix = f"RATE_LIMIT_{service.upper()}_"
+        return cls(
+            rate=float(os.getenv(prefix + "RPS", rate)),
+            burst=int(os.getenv(prefix + "BURST", burst)),
+            concurrency=int(os.getenv(prefix + "CONCURRENCY", concurrency)),
+        )
+
+
+class TokenBucket:
+    """
+    Classic token bucket, additionally capped by the quota the server reports
+    and blocked entirely while the server asks us to back off.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns how long the caller has to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+
+    def seed(self, remaining: int, reset_in: float | None) -> None:
+        """Aligns the bucket with the remaining quota reported by the server."""
+        with self._lock:
+            self.tokens = min(self.tokens, float(remaining))
+        if remaining <= 0 and reset_in:
+            self.block_for(reset_in)
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+@dataclass
+class _Service:
+    limits: ServiceLimits
+    bucket: TokenBucket
+    threads: threading.BoundedSemaphore
+    loops: weakref.WeakKeyDictionary = field(default_factory=weakref.WeakKeyDictionary)
+    stats: Counter = field(default_factory=Counter)
+
+    def loop_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self.loops:
+            self.loops[loop] = asyncio.Semaphore(self.limits.concurrency)
+        return self.loops[loop]
+
+
+def _status_and_headers(exc: BaseException) -> tuple[int | None, dict]:
+    """Reads the HTTP status and headers from httpx and notion-client errors."""
+    response = getattr(exc, "response", None)
+    if response is not None and hasattr(response, "status_code"):
+        status, headers = response.status_code, response.headers
+    else:
+        status, headers = getattr(exc, "status", None), getattr(exc, "headers", None)
+    return status, {k.lower(): v for k, v in (headers or {}).items()}
+
+
+def _is_throttled(status: int | None, headers: dict, exc: BaseException) -> bool:
+    if status == 429:
+        return True
+    if status == 403:
+        return (
+            headers.get("x-ratelimit-remaining") == "0"
+            or "retry-after" in headers
+            or "rate limit" in str(exc).lower()
+        )
+    return False
+
+
+class RateLimitScheduler:
+    """
+    Single gate for all outbound API calls.
+    Every service gets its own token bucket and concurrency cap; throttled calls
+    (429, or 403 rate limits) are retried after Retry-After, after the quota
+    reset, or with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, ServiceLimits],
+        max_retries: int = RATE_LIMIT_MAX_RETRIES,
+        base_delay: float = RATE_LIMIT_BASE_DELAY,
+        max_delay: float = RATE_LIMIT_MAX_DELAY,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._services = {
+            name: _Service(
+                limits,
+                TokenBucket(limits.rate, limits.burst),
+                threading.BoundedSemaphore(limits.concurrency),
+            )
+            for name, limits in limits.items()
+        }
+
+    def call(self, service: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        state = self._services[service]
+        attempt = 0
+        while True:
+            with state.threads:
+                time.sleep(state.bucket.reserve())
+                state.stats["requests"] += 1
+                tracer.record(http_requests=1)
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    delay = self._retry_delay(service, state, e, attempt)
+                    if delay is None:
+                        raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(
+        self, service: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        state = self._services[service]
+        attempt = 0
+        while True:
+            async with state.loop_semaphore():
+                await asyncio.sleep(state.bucket.reserve())
+                state.stats["requests"] += 1
+                tracer.record(http_requests=1)
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as e:
+                    delay = self._retry_delay(service, state, e, attempt)
+                    if delay is None:
+                        raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def observe(self, service: str, headers: Mapping[str, str] | None) -> None:
+        """Feeds rate-limit headers of a successful response into the service's bucket."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        reset = headers.get("x-ratelimit-reset")
+        reset_in = float(reset) - time.time() if reset else None
+        self._services[service].bucket.seed(int(remaining), reset_in)
+
+    def limits(self, service: str) -> ServiceLimits:
+        return self._services[service].limits
+
+    def stats(self, service: str) -> Counter:
+        return self._services[service].stats
+
+    def _retry_delay(
+        self, service: str, state: _Service, exc: BaseException, attempt: int
+    ) -> float | None:
+        status, headers = _status_and_headers(exc)
+        if not _is_throttled(status, headers, exc):
+            return None
+        state.stats["throttled"] += 1
+        if attempt >= self.max_retries:
+            return None
+
+        if headers.get("retry-after"):
+            delay = float(headers["retry-after"])
+        elif headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+            delay = float(headers["x-ratelimit-reset"]) - time.time()
+        else:
+            cap = min(self.max_delay, self.base_delay * 2**attempt)
+            delay = cap / 2 + random.uniform(0, cap / 2)
+        delay = max(0.0, delay) + random.uniform(0, self.base_delay / 2)
+        state.bucket.block_for(delay)
+        state.stats["retries"] += 1
+        tracer.record(retries=1)
+        logger.warning(
+            "%s throttled (HTTP %s), retry %d/%d in %.1fs",
+            service,
+            status,
+            attempt + 1,
+            self.max_retries,
+            delay,
+        )
+        return delay
+
+
+scheduler = RateLimitScheduler(
+    {
+        # GitHub allows 5000 requests/hour but punishes bursts with secondary limits.
+        "github": ServiceLimits.from_env("github", rate=10, burst=20, concurrency=8),
+        # Notion documents an average of three requests per second.
+        "notion": ServiceLimits.from_env("notion", rate=3, burst=3, concurrency=3),
+    }
+)
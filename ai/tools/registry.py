@@ -0,0 +1,60 @@
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# name -> (module, class, constructor arguments). Modules are only imported
+# when a tool is first requested, so a run never pays for tools it doesn't use.
+TOOL_SPECS: dict[str, tuple[str, str, dict]] = {
+    "github_issue_fetch": ("tools.github_issue_fetch_tool", "GithubIssueFetchTool", {}),
+    "github_issue_create": ("tools.github_issue_create_tool", "GithubIssueCreateTool", {}),
+    "github_list_files": ("tools.github_list_files_tool", "GithubListFilesTool", {}),
+    "github_read_files": ("tools.github_read_files_tool", "GithubReadFilesTool", {}),
+    "github_create_branch": ("tools.github_create_branch_tool", "GithubCreateBranchTool", {}),
+    "github_commit_code": ("tools.github_commit_code_tool", "GithubCommitCodeTool", {}),
+    "github_create_pull_request": (
+        "tools.github_create_pull_request_tool",
+        "GithubCreatePullRequestTool",
+        {},
+    ),
+    "code_search": ("tools.code_search_tool", "CodeSearchTool", {}),
+    "notion_table_fetch": ("tools.notion_table_fetch_tool", "NotionTableFetchTool", {}),
+    "notion_issue_sync": ("tools.notion_issue_sync_tool", "NotionIssueSyncTool", {}),
+    "code_interpreter": ("tools.sandbox_code_tool", "SandboxCodeTool", {}),
+    "test_runner": ("tools.sandbox_test_tool", "SandboxTestTool", {}),
+}
+
+
+class ToolRegistry:
+    """
+    Builds every tool on first use and hands out the same instance afterwards.
+    """
+
+    def __init__(self, specs: dict[str, tuple[str, str, dict]] = TOOL_SPECS):
+        self.specs = specs
+        self._tools: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str):
+        with self._lock:
+            if name not in self._tools:
+                if name not in self.specs:
+                    raise KeyError(f"Unknown tool '{name}', expected one of {sorted(self.specs)}")
+                module, cls, kwargs = self.specs[name]
+                started = time.perf_counter()
+                self._tools[name] = getattr(importlib.import_module(module), cls)(**kwargs)
+                logger.debug("Built %s in %.0f ms", cls, (time.perf_counter() - started) * 1000)
+            return self._tools[name]
+
+    def build(self, names: list[str]) -> list:
+        return [self.get(name) for name in names]
+
+    def built(self) -> list[str]:
+        """Names of the tools constructed so far."""
+        with self._lock:
+            return list(self._tools)
+
+
+registry = ToolRegistry()
@@ -0,0 +1,125 @@
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Callable
+
+import numpy as np
+from tools.env import load_env
+from tools.local_cache import cache_path
+
+load_env()
+# Terms are hashed into this many dimensions; more means fewer collisions and larger matrices.
+RELEVANCE_DIM = int(os.getenv("RELEVANCE_DIM", "4096"))
+
+IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+# Splits identifiers like parseHTTPResponse or rate_limit into words.
+WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by def else false for from if import in is it none not of on or "
+    "return self that the this to true with".split()
+)
+
+logger = logging.getLogger(__name__)
+
+
+def terms(text: str) -> list[str]:
+    """Words of the text; compound identifiers count as a whole and as their words."""
+    found = []
+    for identifier in IDENTIFIER_RE.findall(text):
+        words = WORD_RE.findall(identifier)
+        if len(words) > 1:
+            found.append(identifier.lower())
+        found += (w.lower() for w in words)
+    return [t for t in found if len(t) > 1 and t not in STOP_WORDS]
+
+
+def hash_vector(text: str, dim: int = RELEVANCE_DIM) -> np.ndarray:
+    """Sublinear term frequencies (1 + log count) of the text's words, hashed into `dim` buckets."""
+    vector = np.zeros(dim, np.float32)
+    counts = Counter(terms(text))
+    if counts:
+        buckets = np.fromiter((zlib.crc32(t.encode("utf-8")) % dim for t in counts), np.int64, len(counts))
+        np.add.at(vector, buckets, 1 + np.log(np.fromiter(counts.values(), np.float32, len(counts))))
+    return vector
+
+
+class EmbeddingCache:
+    """
+    Hashed term vectors keyed by content hash and stored as one matrix per
+    namespace, so only documents whose content changed are vectorized again.
+    Vectors of contents that the last call did not ask for are dropped.
+    """
+
+    def __init__(self, name: str, dim: int = RELEVANCE_DIM):
+        self.path = cache_path("embeddings", f"{name}.npz")
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._rows: dict[str, np.ndarray] = {}
+        if self.path.exists():
+            with np.load(self.path, allow_pickle=False) as data:
+                if data["vectors"].shape[1:] == (dim,):
+                    self._rows = dict(zip(data["keys"].tolist(), data["vectors"]))
+
+    def matrix(
+        self, keys: list[str], texts: Callable[[list[int]], list[str]], prune: bool = True
+    ) -> np.ndarray:
+        """
+        One row per content hash in `keys`. `texts` gets the positions of the
+        keys that are not cached yet and returns their texts, so contents are
+        only loaded, in one batch, for documents that changed.
+        Pass prune=False when `keys` is only a part of the collection, to keep
+        the vectors of the rest.
+        """
+        with self._lock:
+            missing = [i for i, key in enumerate(keys) if key not in self._rows]
+            if missing:
+                for i, text in zip(missing, texts(missing)):
+                    self._rows[keys[i]] = hash_vector(text, self.dim)
+            stale = 0
+            if prune:
+                wanted = set(keys)
+                stale = len(self._rows) - len(wanted)
+                self._rows = {key: row for key, row in self._rows.items() if key in wanted}
+            if missing or stale:
+                self._save()
+            logger.debug("%s: %d cached, %d new", self.path.stem, len(keys) - len(missing), len(missing))
+            if not keys:
+                return np.zeros((0, self.dim), np.float32)
+            return np.stack([self._rows[key] for key in keys])
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp.npz")
+        keys = list(self._rows)
+        # Hashed vectors are mostly zeros and compress well.
+        np.savez_compressed(
+            tmp,
+            keys=np.array(keys, dtype=str),
+            vectors=np.stack([self._rows[k] for k in keys]) if keys else np.zeros((0, self.dim), np.float32),
+        )
+        tmp.replace(self.path)
+
+
+def tfidf(*matrices: np.ndarray) -> list[np.ndarray]:
+    """
+    Weights the term frequencies with inverse document frequencies over all
+    given matrices together and normalizes every row to unit length, so the
+    dot product of two rows is their cosine similarity.
+    """
+    corpus = np.vstack(matrices)
+    df = np.count_nonzero(corpus, axis=0)
+    idf = np.log((1 + len(corpus)) / (1 + df)).astype(np.float32) + 1
+    weighted = []
+    for matrix in matrices:
+        m = matrix * idf
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        weighted.append(m / np.where(norms == 0, 1, norms))
+    return weighted
+
+
+def similarity(queries: np.ndarray, documents: np.ndarray) -> np.ndarray:
+    """Cosine similarities of every query to every document (queries x documents)."""
+    queries, documents = tfidf(queries, documents)
+    return queries @ documents.T
@@ -0,0 +1,134 @@
+import base64
+import fcntl
+import logging
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from tools.env import load_env
+from tools.github_client import GH_REPO_KEY, GH_REPO_NAME
+from tools.local_cache import cache_path
+from tools.repo_tree_index import GH_TREE_HEAD_TTL
+
+load_env()
+# Any URL git can fetch from, e.g. a local bare repository for offline runs.
+GH_MIRROR_URL = os.getenv("GH_MIRROR_URL", f"https://github.com/{GH_REPO_NAME}.git")
+
+logger = logging.getLogger(__name__)
+
+
+class RepoMirror:
+    """
+    Shallow bare clone of one branch below the local cache.
+    sync() asks the remote for the branch head and only fetches, with depth 1,
+    when the head moved, so an unchanged branch costs one ls-remote round trip
+    every GH_TREE_HEAD_TTL seconds.
+    """
+
+    def __init__(self, url: str = GH_MIRROR_URL, ref: str = "main", path: Path | None = None):
+        self.url = url
+        self.ref = ref
+        self.path = path or cache_path("mirrors", _mirror_name(url) + ".git")
+        self._head: tuple[str, float] | None = None
+        self._lock = threading.Lock()
+
+    def _git(self, *args: str, input: bytes | None = None) -> bytes:
+        command = ["git", "-c", "gc.auto=0"]
+        if GH_REPO_KEY and self.url.startswith("https://"):
+            # Passed per command, so the token never ends up in the mirror's config.
+            token = base64.b64encode(f"x-access-token:{GH_REPO_KEY}".encode()).decode()
+            command += ["-c", f"http.extraHeader=Authorization: Basic {token}"]
+        result = subprocess.run(
+            [*command, "--git-dir", str(self.path), *args], input=input, capture_output=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git {args[0]} failed: {result.stderr.decode(errors='replace')[-2000:]}")
+        return result.stdout
+
+    @contextmanager
+    def _locked(self):
+        """Serializes fetches of all processes sharing the cache."""
+        with self._lock, open(self.path.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def remote_head(self) -> str:
+        """The branch head on the remote, remembered for GH_TREE_HEAD_TTL seconds."""
+        if self._head and self._head[1] > time.monotonic():
+            return self._head[0]
+        self._ensure_init()
+        refs = self._git("ls-remote", self.url, f"refs/heads/{self.ref}").split()
+        if not refs:
+            raise ValueError(f"Branch '{self.ref}' not found in {self.url}")
+        self._head = (refs[0].decode(), time.monotonic() + GH_TREE_HEAD_TTL)
+        return self._head[0]
+
+    def local_head(self) -> str | None:
+        try:
+            return self._git("rev-parse", "--verify", "-q", f"refs/heads/{self.ref}").decode().strip()
+        except RuntimeError:
+            return None
+
+    def sync(self) -> str:
+        """Brings the mirror to the remote head and returns its SHA."""
+        head = self.remote_head()
+        if self.local_head() == head:
+            return head
+        with self._locked():
+            if self.local_head() != head:
+                started = time.perf_counter()
+                self._git(
+                    "fetch", "-q", "--depth", "1", "--no-tags", self.url,
+                    f"+refs/heads/{self.ref}:refs/heads/{self.ref}",
+                )
+                logger.info(
+                    "Fetched %s@%s in %.2fs", self.ref, head[:7], time.perf_counter() - started
+                )
+        return self.local_head()
+
+    def _ensure_init(self) -> None:
+        if not (self.path / "HEAD").exists():
+            with self._locked():
+                if not (self.path / "HEAD").exists():
+                    subprocess.run(
+                        ["git", "init", "-q", "--bare", str(self.path)], check=True, capture_output=True
+                    )
+
+    def tree(self, sha: str) -> dict[str, tuple[str, int]]:
+        """path -> (blob SHA, size) for every file of the commit."""
+        files = {}
+        for entry in self._git("ls-tree", "-r", "-z", "-l", sha).split(b"\0"):
+            if not entry:
+                continue
+            meta, _, path = entry.partition(b"\t")
+            _, kind, blob, size = meta.split()
+            if kind == b"blob":
+                files[path.decode(errors="replace")] = (blob.decode(), int(size))
+        return files
+
+    def read_blobs(self, shas: list[str]) -> dict[str, bytes]:
+        """Reads many blobs with one `git cat-file --batch` process."""
+        if not shas:
+            return {}
+        output = self._git("cat-file", "--batch", input="".join(f"{s}\n" for s in shas).encode())
+        blobs, position = {}, 0
+        for sha in shas:
+            end = output.index(b"\n", position)
+            header = output[position:end].split()
+            position = end + 1
+            if header[-1] == b"missing":
+                continue
+            size = int(header[2])
+            blobs[sha] = output[position : position + size]
+            position += size + 1  # content is followed by a newline
+        return blobs
+
+
+def _mirror_name(url: str) -> str:
+    name = url.rstrip("/").removesuffix(".git")
+    for prefix in ("https://", "http://", "file://", "ssh://", "git@"):
+        name = name.removeprefix(prefix)
+    return name.strip("/").replace("/", "__").replace(":", "__")
@@ -0,0 +1,157 @@
+import bisect
+import fnmatch
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from tools import github_client
+from tools.env import load_env
+from tools.local_cache import cache_path
+
+load_env()
+GH_TREE_HEAD_TTL = float(os.getenv("GH_TREE_HEAD_TTL", "30"))
+
+_lock = threading.Lock()
+_indexes: dict[tuple[str, str], "RepoTreeIndex"] = {}
+_heads: dict[tuple[str, str], tuple[str, float]] = {}
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    path: str
+    type: str
+    sha: str
+    size: int | None = None
+
+
+class RepoTreeIndex:
+    """
+    Flat, sorted index of a whole repository tree at one commit.
+    Built from a single recursive tree request and cached on disk by commit SHA,
+    so prefix and glob lookups never touch the API.
+    """
+
+    def __init__(self, sha: str, entries: list[TreeEntry], truncated: bool = False):
+        self.sha = sha
+        self.truncated = truncated
+        self.entries = sorted(entries, key=lambda e: e.path)
+        self.paths = [e.path for e in self.entries]
+
+    @classmethod
+    async def aload(cls, full_name: str, ref: str = "main") -> "RepoTreeIndex":
+        """
+        Returns the index for the current head of `ref`, fetching the tree only
+        if the head moved. Requests answered by the head or tree cache are
+        counted as saved (see tools.github_client).
+        """
+        from tools.async_http import github_request
+
+        head_sha = _cached_head(full_name, ref)
+        if head_sha is None:
+            branch = await github_request("GET", f"/repos/{full_name}/branches/{ref}")
+            head_sha = _remember_head(full_name, ref, branch.json()["commit"]["sha"])
+        else:
+            github_client.record(saved_requests=1)
+        index = cls._cached(full_name, head_sha)
+        if index is not None:
+            github_client.record(saved_requests=1)
+        else:
+            response = await github_request(
+                "GET", f"/repos/{full_name}/git/trees/{head_sha}", params={"recursive": "1"}
+            )
+            tree = response.json()
+            index = cls._store(
+                full_name,
+                cls(
+                    head_sha,
+                    [
+                        TreeEntry(e["path"], e["type"], e["sha"], e.get("size"))
+                        for e in tree["tree"]
+                    ],
+                    bool(tree.get("truncated")),
+                ),
+            )
+        return index
+
+    @classmethod
+    def _cached(cls, full_name: str, sha: str) -> "RepoTreeIndex | None":
+        """Looks the index up in memory, then on disk."""
+        with _lock:
+            if (full_name, sha) in _indexes:
+                return _indexes[(full_name, sha)]
+        path = _index_path(full_name, sha)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text())
+        index = cls(
+            data["sha"], [TreeEntry(**e) for e in data["entries"]], data.get("truncated", False)
+        )
+        with _lock:
+            _indexes[(full_name, sha)] = index
+        return index
+
+    @staticmethod
+    def _store(full_name: str, index: "RepoTreeIndex") -> "RepoTreeIndex":
+        _index_path(full_name, index.sha).write_text(
+            json.dumps(
+                {
+                    "sha": index.sha,
+                    "truncated": index.truncated,
+                    "entries": [asdict(e) for e in index.entries],
+                }
+            )
+        )
+        with _lock:
+            _indexes[(full_name, index.sha)] = index
+        return index
+
+    def under(self, prefix: str = "") -> list[TreeEntry]:
+        """Entries below a directory prefix, found by binary search."""
+        prefix = prefix.strip("/")
+        if not prefix:
+            return list(self.entries)
+        prefix += "/"
+        start = bisect.bisect_left(self.paths, prefix)
+        end = bisect.bisect_left(self.paths, prefix[:-1] + chr(ord("/") + 1))
+        return self.entries[start:end]
+
+    def glob(self, pattern: str, prefix: str = "") -> list[TreeEntry]:
+        """Entries matching a shell-style pattern; '*' also matches across '/'."""
+        return [e for e in self.under(prefix) if fnmatch.fnmatchcase(e.path, pattern)]
+
+    def files(self, prefix: str = "", pattern: str | None = None) -> list[str]:
+        entries = self.glob(pattern, prefix) if pattern else self.under(prefix)
+        return [e.path for e in entries if e.type == "blob"]
+
+
+def _index_path(full_name: str, sha: str):
+    return cache_path("trees", full_name.replace("/", "__"), f"{sha}.json")
+
+
+def _cached_head(full_name: str, ref: str) -> str | None:
+    """The branch head seen within the last GH_TREE_HEAD_TTL seconds, if any."""
+    with _lock:
+        cached = _heads.get((full_name, ref))
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    return None
+
+
+def _remember_head(full_name: str, ref: str, sha: str) -> str:
+    with _lock:
+        _heads[(full_name, ref)] = (sha, time.monotonic() + GH_TREE_HEAD_TTL)
+    return sha
+
+
+def set_head(full_name: str, ref: str, sha: str | None = None) -> None:
+    """
+    Called after a write moved `ref`: caches the new head if the writer knows
+    it, otherwise drops the cached one so the next load asks GitHub again.
+    """
+    if sha is not None:
+        _remember_head(full_name, ref, sha)
+        return
+    with _lock:
+        _heads.pop((full_name, ref), None)
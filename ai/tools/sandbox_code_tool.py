@@ -0,0 +1,47 @@
+import asyncio
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from tools.sandbox_pool import get_pool, warm_up
+from tools.tracing import traced
+
+
+class SandboxCodeInput(BaseModel):
+    code: str = Field(
+        ..., description="Python 3 code to execute. Print everything you want to see."
+    )
+    libraries_used: Optional[list[str]] = Field(
+        None,
+        description="Packages to install before running that are not in the project's uv.lock",
+    )
+
+
+class SandboxCodeTool(BaseTool):
+    name: str = "Code Interpreter"
+    description: str = (
+        "Runs Python code in a warm, persistent sandbox whose environment already has the "
+        "project's locked dependencies from uv.lock installed. Files in the working directory "
+        "are re-imported on every run, so edit and rerun freely. "
+        "Run tests in-process with `import pytest; pytest.main(['-q'])`."
+    )
+    args_schema: Type[BaseModel] = SandboxCodeInput
+
+    def model_post_init(self, __context) -> None:
+        super().model_post_init(__context)
+        # Environment and workers get ready while the crew works on earlier tasks.
+        warm_up()
+
+    @traced()
+    def _run(self, code: str, libraries_used: Optional[list[str]] = None) -> str:
+        return self._execute(code, libraries_used)
+
+    @traced()
+    async def _arun(self, code: str, libraries_used: Optional[list[str]] = None) -> str:
+        return await asyncio.to_thread(self._execute, code, libraries_used)
+
+    def _execute(self, code: str, libraries_used: Optional[list[str]]) -> str:
+        pool = get_pool()
+        if libraries_used:
+            pool.install(libraries_used)
+        return str(pool.run(code))
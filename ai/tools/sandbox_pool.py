@@ -0,0 +1,312 @@
+import atexit
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from tools.env import load_env
+from tools.local_cache import OSA_CACHE_DIR, cache_path
+
+load_env()
+SANDBOX_POOL_SIZE = int(os.getenv("SANDBOX_POOL_SIZE", "2"))
+SANDBOX_TIMEOUT = float(os.getenv("SANDBOX_TIMEOUT", "300"))
+# Workers are replaced after this many runs to bound leaked state and memory.
+SANDBOX_MAX_RUNS = int(os.getenv("SANDBOX_MAX_RUNS", "50"))
+SANDBOX_MAX_OUTPUT = int(os.getenv("SANDBOX_MAX_OUTPUT", "20000"))
+# Modules every worker imports before it reports ready, e.g. "pytest,numpy".
+SANDBOX_PREIMPORT = [m for m in os.getenv("SANDBOX_PREIMPORT", "pytest").split(",") if m]
+# Project whose uv.lock defines the environment; defaults to the nearest directory
+# with a lockfile at or above the working directory.
+SANDBOX_PROJECT_DIR = os.getenv("SANDBOX_PROJECT_DIR")
+# Packages every environment gets on top of the lockfile; the test runner needs these.
+SANDBOX_PACKAGES = [p for p in os.getenv("SANDBOX_PACKAGES", "pytest,coverage").split(",") if p]
+
+WORKER = Path(__file__).with_name("sandbox_worker.py")
+LOCKFILES = ("uv.lock", "pyproject.toml")
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pools: dict[Path, "SandboxPool"] = {}
+_project: Path | None = None
+
+
+@dataclass
+class ExecResult:
+    output: str
+    error: str | None = None
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        output = self.output
+        if len(output) > SANDBOX_MAX_OUTPUT:
+            output = f"[... {len(output) - SANDBOX_MAX_OUTPUT} characters cut ...]\n" + output[-SANDBOX_MAX_OUTPUT:]
+        text = output if not self.error else f"{output}\n{self.error}".lstrip()
+        return text or "(no output)"
+
+
+def environment_key(project_dir: Path) -> str:
+    """Content address of an environment: the Python version, SANDBOX_PACKAGES and the project's lockfiles."""
+    digest = hashlib.sha256(platform.python_version().encode("utf-8"))
+    digest.update(",".join(sorted(SANDBOX_PACKAGES)).encode("utf-8"))
+    for name in LOCKFILES:
+        path = project_dir / name
+        if path.exists():
+            digest.update(name.encode("utf-8") + b"\0" + path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def ensure_environment(project_dir: Path) -> Path:
+    """
+    Returns the interpreter of the cached environment for the project's lockfile,
+    creating it first if no run built it before. Concurrent processes wait for
+    the one that builds it.
+    """
+    key = environment_key(project_dir)
+    env_dir = cache_path("envs", key)
+    ready = env_dir / ".ready"
+    if not ready.exists():
+        with open(cache_path("envs", f"{key}.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not ready.exists():
+                shutil.rmtree(env_dir, ignore_errors=True)  # leftovers of an interrupted build
+                started = time.perf_counter()
+                _create_environment(project_dir, env_dir)
+                ready.write_text(json.dumps({"project": str(project_dir), "created": time.time()}))
+                logger.info(
+                    "Created sandbox environment %s in %.1fs", key, time.perf_counter() - started
+                )
+    return _python(env_dir)
+
+
+def _create_environment(project_dir: Path, env_dir: Path) -> None:
+    uv = shutil.which("uv")
+    if uv is None:
+        logger.warning("uv not found, %s gets no locked dependencies", env_dir)
+        _check([sys.executable, "-m", "venv", str(env_dir)])
+    else:
+        _check([uv, "venv", "--python", sys.executable, str(env_dir)])
+        if (project_dir / "uv.lock").exists():
+            _check(
+                [uv, "sync", "--frozen", "--no-install-project"],
+                cwd=project_dir,
+                env={**os.environ, "UV_PROJECT_ENVIRONMENT": str(env_dir)},
+            )
+    if SANDBOX_PACKAGES:
+        _pip_install(_python(env_dir), SANDBOX_PACKAGES)
+
+
+def _pip_install(python: Path, packages: list[str], target: Path | None = None) -> None:
+    uv = shutil.which("uv")
+    target_args = ["--target", str(target)] if target else []
+    if uv:
+        _check([uv, "pip", "install", "--python", str(python), *target_args, *packages])
+    else:
+        _check([str(python), "-m", "pip", "install", *target_args, *packages])
+
+
+def _check(command: list[str], **kwargs) -> None:
+    result = subprocess.run(command, capture_output=True, text=True, **kwargs)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+
+
+def _python(env_dir: Path) -> Path:
+    return env_dir / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+
+
+class _Worker:
+    def __init__(self, python: Path, cwd: Path, overlay: Path):
+        self.runs = 0
+        pythonpath = os.pathsep.join(filter(None, [str(overlay), os.environ.get("PYTHONPATH")]))
+        self.process = subprocess.Popen(
+            [str(python), "-u", str(WORKER), *SANDBOX_PREIMPORT],
+            cwd=cwd,
+            # The worker keeps modules from the cache (its own environment and
+            # the pool's overlay) loaded between runs.
+            env={**os.environ, "OSA_CACHE_DIR": str(OSA_CACHE_DIR), "PYTHONPATH": pythonpath},
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self._responses: queue.Queue = queue.Queue()
+        self._ready = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            self._responses.put(json.loads(line))
+        self._responses.put(None)  # the worker exited
+
+    def _response(self, timeout: float) -> dict:
+        try:
+            response = self._responses.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Execution timed out after {timeout:.0f}s") from None
+        if response is None:
+            raise RuntimeError(f"Sandbox worker exited with code {self.process.wait()}")
+        return response
+
+    def run(self, code: str, timeout: float) -> ExecResult:
+        if not self._ready:
+            self._response(timeout)
+            self._ready = True
+        self.runs += 1
+        self.process.stdin.write(json.dumps({"code": code}) + "\n")
+        self.process.stdin.flush()
+        response = self._response(timeout)
+        return ExecResult(response["output"], response["error"])
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.wait()
+
+
+class SandboxPool:
+    """
+    Keeps `size` worker processes on one environment warm and reuses them
+    across executions, so a run only pays for interpreter startup and imports
+    once. Workers that time out, crash or reach SANDBOX_MAX_RUNS are replaced.
+    Packages installed with install() go to an overlay directory of this pool,
+    so the shared environment keeps matching its lockfile key.
+    """
+
+    def __init__(self, python: Path, cwd: Path, size: int = SANDBOX_POOL_SIZE):
+        self.python = python
+        self.cwd = cwd
+        overlays = cache_path("overlays")
+        overlays.mkdir(exist_ok=True)
+        self.overlay = Path(tempfile.mkdtemp(prefix="overlay-", dir=overlays))
+        self._installed: set[str] = set()
+        self._install_lock = threading.Lock()
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers: list[_Worker] = []
+        for _ in range(max(1, size)):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self.python, self.cwd, self.overlay)
+        self._workers.append(worker)
+        return worker
+
+    def run(self, code: str, timeout: float = SANDBOX_TIMEOUT) -> ExecResult:
+        """Runs code on an idle worker, waiting at most `timeout` seconds for one to become free."""
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No sandbox worker became free within {timeout:.0f}s; all {len(self._workers)} are busy"
+            ) from None
+        started = time.perf_counter()
+        healthy = True
+        try:
+            result = worker.run(code, timeout)
+        except (TimeoutError, RuntimeError) as e:
+            result, healthy = ExecResult("", str(e)), False
+        result.seconds = time.perf_counter() - started
+        logger.debug("Sandbox run finished in %.2fs", result.seconds)
+        if healthy and worker.alive and worker.runs < SANDBOX_MAX_RUNS:
+            self._idle.put(worker)
+        else:
+            self._replace(worker)
+        return result
+
+    def _replace(self, worker: _Worker) -> None:
+        if worker.alive:
+            worker.kill()
+        self._workers.remove(worker)
+        self._idle.put(self._spawn())
+
+    def install(self, packages: list[str]) -> None:
+        """
+        Installs packages the lockfile doesn't provide into the pool's overlay;
+        warm workers pick them up on their next run.
+        """
+        with self._install_lock:
+            missing = [p for p in packages if p not in self._installed]
+            if not missing:
+                return
+            _pip_install(self.python, missing, target=self.overlay)
+            self._installed.update(missing)
+
+    def close(self) -> None:
+        for worker in self._workers:
+            if worker.alive:
+                worker.kill()
+        self._workers.clear()
+        shutil.rmtree(self.overlay, ignore_errors=True)
+
+
+def resolve_project(project_dir: Path | None = None) -> Path:
+    """
+    The project whose lockfile defines the environment: `project_dir`, the one
+    given to set_project(), SANDBOX_PROJECT_DIR, or the nearest directory with
+    a lockfile at or above the working directory.
+    """
+    explicit = project_dir or _project or SANDBOX_PROJECT_DIR
+    if explicit:
+        return Path(explicit).resolve()
+    cwd = Path.cwd().resolve()
+    return next((d for d in (cwd, *cwd.parents) if any((d / name).exists() for name in LOCKFILES)), cwd)
+
+
+def set_project(project_dir: Path) -> None:
+    """
+    Makes get_pool() and close_pool() use this project by default, e.g. before
+    changing into a workspace that has no lockfile of its own.
+    """
+    global _project
+    _project = Path(project_dir).resolve()
+
+
+def get_pool(project_dir: Path | None = None) -> SandboxPool:
+    """Returns the warm pool for the project, building its environment on first use."""
+    project_dir = resolve_project(project_dir)
+    with _lock:
+        if project_dir not in _pools:
+            _pools[project_dir] = SandboxPool(ensure_environment(project_dir), Path(os.getcwd()))
+        return _pools[project_dir]
+
+
+def close_pool(project_dir: Path | None = None) -> None:
+    """Stops the workers of the project's pool; the next get_pool() starts a new one."""
+    project_dir = resolve_project(project_dir)
+    with _lock:
+        pool = _pools.pop(project_dir, None)
+    if pool is not None:
+        pool.close()
+
+
+def warm_up(project_dir: Path | None = None) -> None:
+    """Builds the environment and starts the workers in the background."""
+
+    def run():
+        try:
+            get_pool(project_dir)
+        except Exception:
+            logger.exception("Warming up the sandbox pool failed")
+
+    threading.Thread(target=run, name="sandbox-warm-up", daemon=True).start()
+
+
+@atexit.register
+def _close_pools() -> None:
+    with _lock:
+        for pool in _pools.values():
+            pool.close()
@@ -0,0 +1,37 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from tools.sandbox_pool import get_pool
+from tools.impact_map import run_tests
+from tools.tracing import traced
+
+
+class SandboxTestInput(BaseModel):
+    args: Optional[list[str]] = Field(
+        None, description="pytest arguments such as test paths or -k filters; default is the whole suite"
+    )
+    full: bool = Field(
+        False, description="Run every test instead of only those affected by the changed files"
+    )
+
+
+class SandboxTestTool(BaseTool):
+    name: str = "Test Runner"
+    description: str = (
+        "Runs the project's pytest suite in the warm sandbox. Only tests affected by files "
+        "changed since the last run are executed; new and previously failing tests always run "
+        "and every few runs the whole suite runs. Reports how many tests were selected and skipped."
+    )
+    args_schema: Type[BaseModel] = SandboxTestInput
+
+    @traced()
+    def _run(self, args: Optional[list[str]] = None, full: bool = False) -> str:
+        return run_tests(get_pool(), Path(os.getcwd()), args, full)
+
+    @traced()
+    async def _arun(self, args: Optional[list[str]] = None, full: bool = False) -> str:
+        return await asyncio.to_thread(run_tests, get_pool(), Path(os.getcwd()), args, full)
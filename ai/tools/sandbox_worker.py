@@ -0,0 +1,96 @@
+"""
+Long-lived sandbox worker, started by tools.sandbox_pool with the interpreter of
+a pooled environment. Reads one JSON request per line and answers with one JSON
+line on the original stdout. Everything the executed code prints, including the
+output of child processes, is captured and returned.
+Only the standard library is used, so the worker runs in any environment.
+"""
+
+import importlib
+import json
+import os
+import site
+import sys
+import tempfile
+import traceback
+
+
+def _installed_dirs() -> tuple[str, ...]:
+    """Directories of installed code: this environment, its site-packages and the cache it lives in."""
+    dirs = [sys.prefix, sys.exec_prefix, *site.getsitepackages(), site.getusersitepackages()]
+    if os.environ.get("OSA_CACHE_DIR"):
+        dirs.append(os.environ["OSA_CACHE_DIR"])
+    return tuple(os.path.join(os.path.realpath(d), "") for d in dirs)
+
+
+def _purge_project_modules(root: str, installed: tuple[str, ...]) -> None:
+    """
+    Forgets modules of the project's source tree so edited files are re-imported.
+    Installed packages stay loaded, even when the environment is below the project.
+    """
+    root = os.path.join(os.path.realpath(root), "")
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if not path:
+            continue
+        path = os.path.realpath(path)
+        if path.startswith(root) and not path.startswith(installed) and "site-packages" not in path.split(os.sep):
+            del sys.modules[name]
+
+
+def _execute(code: str) -> tuple[str, str | None]:
+    error = None
+    with tempfile.TemporaryFile() as out:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved = os.dup(1), os.dup(2)
+        os.dup2(out.fileno(), 1)
+        os.dup2(out.fileno(), 2)
+        try:
+            exec(compile(code, "<sandbox>", "exec"), {"__name__": "__main__"})
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                error = f"SystemExit: {e.code}"
+        except BaseException:
+            error = traceback.format_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+        out.seek(0)
+        return out.read().decode("utf-8", "replace"), error
+
+
+def main() -> None:
+    # The protocol gets private copies of stdin/stdout; the executed code sees
+    # /dev/null as stdin, so input() can't swallow requests.
+    requests = os.fdopen(os.dup(0), "r")
+    responses = os.fdopen(os.dup(1), "w", buffering=1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    sys.stdin = open(os.devnull)
+
+    root = os.getcwd()
+    installed = _installed_dirs()
+    sys.path[0] = root
+    for name in sys.argv[1:]:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    responses.write(json.dumps({"ready": True}) + "\n")
+
+    for line in requests:
+        request = json.loads(line)
+        _purge_project_modules(root, installed)
+        importlib.invalidate_caches()  # packages may have been installed since the last run
+        output, error = _execute(request["code"])
+        os.chdir(root)
+        responses.write(json.dumps({"output": output, "error": error}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
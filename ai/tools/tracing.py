@@ -0,0 +1,142 @@
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+# Counters every span carries; record() adds to the current span and all its parents.
+COUNTERS = ("http_requests", "retries", "prompt_tokens", "completion_tokens")
+
+_stack: contextvars.ContextVar[tuple["Span", ...]] = contextvars.ContextVar(
+    "trace_stack", default=()
+)
+
+
+@dataclass
+class Span:
+    kind: str  # task | agent | route | llm | tool
+    name: str
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_id: str | None = None
+    start: float = field(default_factory=time.time)
+    wall_ms: float | None = None
+    status: str = "ok"
+    counters: dict = field(default_factory=lambda: dict.fromkeys(COUNTERS, 0))
+    attrs: dict = field(default_factory=dict)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+
+class Tracer:
+    """
+    Collects spans for tasks, agent runs, LLM calls and tool calls.
+    Spans nest through a context variable, so tool and HTTP counts land on the
+    task that caused them, also across threads started with a copied context.
+    """
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def start(self, kind: str, name: str, **attrs) -> Span:
+        stack = _stack.get()
+        span = Span(kind, name, parent_id=stack[-1].span_id if stack else None, attrs=attrs)
+        _stack.set(stack + (span,))
+        return span
+
+    def finish(self, span: Span, error: BaseException | None = None) -> None:
+        span.wall_ms = round((time.perf_counter() - span._started) * 1000, 1)
+        if error is not None:
+            span.status = "error"
+            span.attrs["error"] = f"{type(error).__name__}: {error}"
+        _stack.set(tuple(s for s in _stack.get() if s is not span))
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attrs):
+        span = self.start(kind, name, **attrs)
+        try:
+            yield span
+        except BaseException as e:
+            self.finish(span, e)
+            raise
+        self.finish(span)
+
+    def current(self, kind: str) -> Span | None:
+        """The innermost open span of the given kind in the current context."""
+        return next((s for s in reversed(_stack.get()) if s.kind == kind), None)
+
+    def record(self, **counts: int) -> None:
+        """Adds counts (see COUNTERS) to the current span and all of its parents."""
+        for span in _stack.get():
+            for key, value in counts.items():
+                span.counters[key] += value
+
+    def export_jsonl(self, path: Path) -> None:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        with open(path, "a") as f:
+            for span in spans:
+                data = asdict(span)
+                data.pop("_started")
+                f.write(json.dumps(data, default=str) + "\n")
+
+    def reset(self) -> None:
+        """Forgets the finished spans."""
+        with self._lock:
+            self.spans.clear()
+
+    def summary(self) -> str:
+        """Per kind and name: calls, wall time and the summed counters."""
+        rows = defaultdict(lambda: {"calls": 0, "errors": 0, "wall_ms": 0.0, **dict.fromkeys(COUNTERS, 0)})
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            row = rows[(span.kind, span.name)]
+            row["calls"] += 1
+            row["errors"] += span.status == "error"
+            row["wall_ms"] += span.wall_ms or 0
+            for key in COUNTERS:
+                row[key] += span.counters[key]
+
+        header = f"{'kind':<6} {'name':<40} {'calls':>5} {'err':>4} {'wall s':>8} {'http':>5} {'retry':>5} {'tok in':>8} {'tok out':>8}"
+        lines = [header, "-" * len(header)]
+        for (kind, name), row in sorted(rows.items(), key=lambda r: -r[1]["wall_ms"]):
+            lines.append(
+                f"{kind:<6} {name[:40]:<40} {row['calls']:>5} {row['errors']:>4} "
+                f"{row['wall_ms'] / 1000:>8.1f} {row['http_requests']:>5} {row['retries']:>5} "
+                f"{row['prompt_tokens']:>8} {row['completion_tokens']:>8}"
+            )
+        return "\n".join(lines)
+
+
+tracer = Tracer()
+
+
+def traced(kind: str = "tool"):
+    """Records every call of the decorated method as a span named after its class."""
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def arun(self, *args, **kwargs):
+                with tracer.span(kind, type(self).__name__):
+                    return await fn(self, *args, **kwargs)
+
+            return arun
+
+        @functools.wraps(fn)
+        def run(self, *args, **kwargs):
+            with tracer.span(kind, type(self).__name__):
+                return fn(self, *args, **kwargs)
+
+        return run
+
+    return decorate